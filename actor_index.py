@@ -0,0 +1,173 @@
+# actor_index.py — Trigramm-Index über Schauspielernamen im Arbeitsspeicher
+
+import threading
+import time
+from collections import defaultdict
+
+# Sekunden zwischen zwei Prüfungen, ob sich die Tabelle actor geändert hat
+REFRESH_CHECK_INTERVAL = 60
+
+# Mindestähnlichkeit (Dice-Koeffizient der Trigramme) für unscharfe Treffer
+FUZZY_THRESHOLD = 0.5
+
+
+def normalize_name(name):
+    """
+    Vereinheitlicht einen Namen für den Vergleich (Kleinschreibung, einfache Leerzeichen).
+    """
+    return " ".join(name.lower().split())
+
+
+def trigrams(text):
+    """
+    Zerlegt einen Text in seine Trigramme (überlappende Teilstrings der Länge 3).
+    Returns:
+        set[str]: Menge der Trigramme; leer bei Texten mit weniger als 3 Zeichen.
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ActorIndex:
+    """
+    Trigramm-Index über "Vorname Nachname" aller Schauspieler/innen.
+
+    Wird einmal aus der Tabelle actor aufgebaut und neu geladen, sobald sich
+    COUNT(*) oder MAX(last_update) der Tabelle ändert. Löst Teilnamen und leicht
+    falsch geschriebene Namen in actor_ids auf, ohne die Datenbank zu befragen.
+    """
+
+    def __init__(self, execute, refresh_check_interval=REFRESH_CHECK_INTERVAL):
+        """
+        Args:
+            execute (callable): Funktion (query, params) -> list[tuple], z. B. search.execute_query.
+            refresh_check_interval (float, optional): Sekunden zwischen zwei Änderungsprüfungen.
+        """
+        self._execute = execute
+        self.refresh_check_interval = refresh_check_interval
+        self._lock = threading.Lock()
+        self._names = {}                    # actor_id -> normalisierter Name
+        self._grams = {}                    # Trigramm -> frozenset(actor_id)
+        self._version = None                # (Anzahl, MAX(last_update)) beim letzten Aufbau
+        self._checked_at = 0.0
+
+    def _table_version(self):
+        """
+        Liefert den Änderungsstand der Tabelle actor.
+        """
+        rows = self._execute("SELECT COUNT(*), MAX(last_update) FROM actor")
+        return tuple(rows[0]) if rows else (0, None)
+
+    def rebuild(self):
+        """
+        Lädt alle Namen aus der Tabelle actor und baut den Index neu auf.
+        """
+        version = self._table_version()
+        rows = self._execute("SELECT actor_id, first_name, last_name FROM actor")
+
+        names = {}
+        grams = defaultdict(set)
+        for actor_id, first_name, last_name in rows:
+            name = normalize_name(f"{first_name} {last_name}")
+            names[actor_id] = name
+            for gram in trigrams(name):
+                grams[gram].add(actor_id)
+
+        # Neuer Index wird vollständig aufgebaut und dann in einem Schritt ausgetauscht
+        with self._lock:
+            self._names = names
+            self._grams = {gram: frozenset(ids) for gram, ids in grams.items()}
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    def refresh_if_stale(self):
+        """
+        Baut den Index neu auf, falls er fehlt oder sich die Tabelle actor geändert hat.
+        Die Änderungsprüfung erfolgt höchstens alle refresh_check_interval Sekunden.
+        """
+        if self._version is None:
+            self.rebuild()
+            return
+        if time.monotonic() - self._checked_at < self.refresh_check_interval:
+            return
+        with self._lock:
+            self._checked_at = time.monotonic()
+        if self._table_version() != self._version:
+            self.rebuild()
+
+    def lookup(self, name, fuzzy=True):
+        """
+        Liefert die actor_ids, deren Name den Suchbegriff enthält.
+        Gibt es keinen exakten Teilstring-Treffer, werden (bei fuzzy=True) ähnliche Namen geliefert.
+        Args:
+            name (str): Vollständiger oder teilweiser Name.
+            fuzzy (bool, optional): Unscharfe Suche bei fehlenden exakten Treffern. Standard True.
+        Returns:
+            list[int]: Sortierte Liste der actor_ids.
+        """
+        self.refresh_if_stale()
+        query = normalize_name(name)
+        names, grams = self._names, self._grams
+        query_grams = trigrams(query)
+
+        if not query_grams:
+            # Zu kurz für Trigramme: direkter Vergleich (Tabelle actor ist klein)
+            return sorted(i for i, n in names.items() if query in n)
+
+        # Kandidaten müssen alle Trigramme enthalten, danach exakte Teilstring-Prüfung
+        candidate_sets = sorted((grams.get(g, frozenset()) for g in query_grams), key=len)
+        candidates = frozenset.intersection(*candidate_sets)
+        exact = sorted(i for i in candidates if query in names[i])
+        if exact or not fuzzy:
+            return exact
+
+        # Unscharfe Suche: alle Namen mit mindestens einem gemeinsamen Trigramm bewerten
+        candidates = set()
+        for gram in query_grams:
+            candidates.update(grams.get(gram, ()))
+        return sorted(
+            actor_id for actor_id in candidates
+            if self._similarity(query_grams, names[actor_id]) >= FUZZY_THRESHOLD
+        )
+
+    @staticmethod
+    def _similarity(query_grams, candidate):
+        """
+        Dice-Koeffizient der Trigramme. Bei Teilnamen zählt der beste Namensteil
+        (Vorname, Nachname oder ganzer Name).
+        """
+        best = 0.0
+        for part in [candidate] + candidate.split():
+            part_grams = trigrams(part)
+            if part_grams:
+                score = 2 * len(query_grams & part_grams) / (len(query_grams) + len(part_grams))
+                best = max(best, score)
+        return best
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_actor_index(execute):
+    """
+    Liefert den gemeinsamen Schauspieler-Index (wird beim ersten Aufruf erstellt).
+    Args:
+        execute (callable): Funktion (query, params) -> list[tuple].
+    Returns:
+        ActorIndex: Gemeinsamer Index.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ActorIndex(execute)
+    return _index
+
+
+def reset_actor_index():
+    """
+    Verwirft den gemeinsamen Index, z. B. wenn db_pool.set_pool auf eine andere Datenbank
+    umstellt; der nächste Aufruf von get_actor_index baut ihn aus der neuen Datenbank auf.
+    """
+    global _index
+    with _index_lock:
+        _index = None
@@ -0,0 +1,99 @@
+# async_query.py — Gleichzeitige Ausführung unabhängiger Datenbankabfragen mit asyncio
+#
+# pymysql blockiert; die Abfragen laufen daher in einem Thread-Pool, und asyncio
+# verteilt und sammelt sie (asyncio.gather). Für den synchronen Programmteil läuft
+# die Ereignisschleife in einem eigenen Hintergrund-Thread, gather_calls wartet
+# dort auf alle Ergebnisse. Mehrere Abfragen einer Bildschirmseite kosten so nur
+# eine Latenz statt der Summe aller Latenzen.
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from db_pool import get_pool
+
+_executor = None
+_executor_size = None
+_loop = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Liefert den gemeinsamen Thread-Pool. Er ist so groß wie der installierte Verbindungspool
+    (bei einem ReplicaRouter alle Server zusammen) und wird neu erstellt, wenn ein Pool anderer
+    Größe installiert wird (db_pool.set_pool, z. B. batch_search.init_worker mit --workers).
+    """
+    global _executor, _executor_size
+    size = get_pool().max_size
+    with _lock:
+        if _executor_size != size:
+            previous = _executor
+            _executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="async-query")
+            _executor_size = size
+            if previous is not None:
+                # Laufende Abfragen werden noch beendet
+                previous.shutdown(wait=False)
+    return _executor
+
+
+def _forget_after_fork():
+    """
+    Im Kindprozess (z. B. batch_search.py --mode process) laufen Ereignisschleife und
+    Worker-Threads des Elternprozesses nicht mehr: beim nächsten Aufruf neu erstellen.
+    """
+    global _executor, _executor_size, _loop, _lock
+    _executor = _executor_size = _loop = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_after_fork)
+
+
+def get_event_loop():
+    """
+    Liefert die Ereignisschleife im Hintergrund-Thread (wird beim ersten Aufruf gestartet).
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-query-loop", daemon=True).start()
+    return _loop
+
+
+async def run_blocking(function, *args):
+    """
+    Führt eine blockierende Funktion (z. B. search.execute_query) im Thread-Pool aus.
+    Die Kontextvariablen des Aufrufers (z. B. slow_query.current_search) gelten auch dort.
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), partial(context.run, function, *args))
+
+
+async def gather_calls_async(*calls):
+    """
+    Führt alle Funktionen ohne Argumente gleichzeitig aus.
+    Returns:
+        list: Ergebnisse in der Reihenfolge der Funktionen.
+    """
+    return await asyncio.gather(*(run_blocking(call) for call in calls))
+
+
+def gather_calls(*calls):
+    """
+    Synchroner Einstieg: führt alle Funktionen gleichzeitig aus und wartet auf alle Ergebnisse.
+    Der erste Fehler wird an den Aufrufer weitergegeben.
+    Args:
+        *calls (callable): Unabhängige Funktionen ohne Argumente.
+    Returns:
+        list: Ergebnisse in der Reihenfolge der Funktionen.
+    """
+    if len(calls) < 2:
+        return [call() for call in calls]
+    # Die Ereignisschleife läuft in einem anderen Thread: Kontext des Aufrufers je Funktion kopieren
+    calls = [partial(contextvars.copy_context().run, call) for call in calls]
+    return asyncio.run_coroutine_threadsafe(gather_calls_async(*calls), get_event_loop()).result()
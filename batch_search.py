@@ -0,0 +1,217 @@
+# batch_search.py — Stapelverarbeitung von Suchanfragen ohne Benutzerinteraktion
+#
+# Liest Suchaufträge aus einer JSONL-Datei (eine Zeile pro Suche), führt sie mit derselben
+# SQL-Logik wie die search_film_by_*-Funktionen parallel in Threads oder Prozessen aus und
+# schreibt die Ergebnisse fortlaufend als JSONL. Am Ende werden Durchsatz und Latenzen
+# (p50/p95/p99) ausgegeben.
+#
+# Format eines Auftrags:
+#   {"id": "a1", "type": "genre_year_range", "params": {"genre": "Action", "year_from": 2000, "year_to": 2010}}
+# type: keyword | genre | genre_year | genre_year_range | actor | films (beliebige Filter);
+# genre als category_id oder Genre-Name.
+#
+# Aufruf:
+#   python batch_search.py specs.jsonl --output results.jsonl --workers 8 --mode process
+#   python batch_search.py specs.jsonl --standin sakila.sqlite     (lokale Ersatzdatenbank)
+#   python batch_search.py specs.jsonl --standin sakila.sqlite --standin-replicas r1.sqlite r2.sqlite
+
+import argparse
+import json
+import math
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+
+def percentile(values, p):
+    """
+    Perzentil p (0–100) einer Liste von Messwerten (nächster Rang).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(latencies_ms):
+    """
+    Fasst Latenzen in Millisekunden zusammen (Anzahl, p50, p95, p99, Maximum).
+    """
+    return {
+        "count": len(latencies_ms),
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "max_ms": max(latencies_ms) if latencies_ms else None,
+    }
+
+
+def read_specs(path):
+    """
+    Liest die Suchaufträge zeilenweise (leere Zeilen werden übersprungen).
+    """
+    with open(path, encoding="utf-8") as source:
+        for number, line in enumerate(source, 1):
+            if line.strip():
+                spec = json.loads(line)
+                spec.setdefault("id", number)
+                yield spec
+
+
+def init_worker(max_connections, standin=None, standin_replicas=()):
+    """
+    Richtet pro Worker-Prozess bzw. für den Thread-Pool einen eigenen Verbindungspool ein.
+    Sind Lese-Replikate konfiguriert (MYSQL_REPLICAS bzw. standin_replicas), ist es ein
+    ReplicaRouter mit einem Pool je Server.
+    Args:
+        max_connections (int): Maximale Anzahl Verbindungen je Pool.
+        standin (str, optional): SQLite-Ersatzdatenbank (sakila_standin.py) statt MySQL.
+        standin_replicas (list[str], optional): Weitere Ersatzdatenbanken als Lese-Replikate.
+    """
+    import config
+    from db_pool import ConnectionPool, set_pool
+    from replica_router import create_replica_router
+
+    settings = {"min_size": 0, "max_size": max_connections}
+    if standin:
+        from sakila_standin import connect_standin
+        if standin_replicas:
+            pool = create_replica_router({"path": standin}, [{"name": path, "path": path} for path in standin_replicas],
+                                         settings, connect=connect_standin)
+        else:
+            pool = ConnectionPool({"path": standin}, **settings, connect=connect_standin)
+    elif getattr(config, "MYSQL_REPLICAS", None):
+        pool = create_replica_router(config.MYSQL_CONFIG, config.MYSQL_REPLICAS, settings)
+    else:
+        pool = ConnectionPool(config.MYSQL_CONFIG, **settings)
+    set_pool(pool)
+
+
+def resolve_params(params):
+    """
+    Ersetzt einen Genre-Namen durch die category_id (Genre-Liste aus dem Stammdaten-Cache).
+    """
+    from search import execute_query, get_reference_cache
+
+    genre = params.get("genre")
+    if isinstance(genre, str) and not genre.isdigit():
+        genres = {name.lower(): genre_id for genre_id, name in get_reference_cache(execute_query).get_genres()}
+        if genre.lower() not in genres:
+            raise ValueError(f"Unbekanntes Genre: {genre}")
+        return {**params, "genre": genres[genre.lower()]}
+    if isinstance(genre, str):
+        return {**params, "genre": int(genre)}
+    return params
+
+
+def run_spec(spec, include_rows=True):
+    """
+    Führt einen Suchauftrag aus (im Worker-Thread bzw. -Prozess).
+    Returns:
+        dict: id, type, params, count, columns, rows (optional), latency_ms, error.
+    """
+    from search import run_search
+
+    record = {"id": spec.get("id"), "type": spec.get("type"), "params": spec.get("params", {})}
+    started = time.perf_counter()
+    try:
+        rows, columns = run_search(spec["type"], resolve_params(spec.get("params", {})), paged=False)
+        record["count"] = len(rows)
+        record["columns"] = columns
+        if include_rows:
+            record["rows"] = [list(row) for row in rows]
+    except Exception as error:
+        record["error"] = f"{type(error).__name__}: {error}"
+    record["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return record
+
+
+def run_batch(specs, output, workers=4, mode="thread", include_rows=True, standin=None, standin_replicas=()):
+    """
+    Führt alle Suchaufträge parallel aus und schreibt jedes Ergebnis sofort nach output.
+    Es sind höchstens 4 × workers Aufträge gleichzeitig unterwegs.
+    Args:
+        specs (iterable[dict]): Suchaufträge.
+        output (file): Textdatei für die JSONL-Ergebnisse.
+        workers (int, optional): Anzahl der Worker.
+        mode (str, optional): "thread" (gemeinsamer Pool mit workers Verbindungen) oder
+            "process" (jeder Prozess mit eigener Verbindung).
+        include_rows (bool, optional): Ergebniszeilen mit ausgeben (sonst nur Anzahl).
+        standin (str, optional): SQLite-Ersatzdatenbank statt MySQL.
+        standin_replicas (list[str], optional): Ersatzdatenbanken als Lese-Replikate.
+    Returns:
+        dict: Zusammenfassung (Anzahl, Fehler, Dauer, Durchsatz, Latenzen gesamt und je Suchtyp).
+    """
+    if mode == "process":
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                       initargs=(1, standin, standin_replicas))
+    else:
+        init_worker(workers, standin, standin_replicas)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-search")
+
+    latencies, by_type, errors = [], {}, 0
+    started = time.perf_counter()
+    with executor:
+        pending = set()
+        specs = iter(specs)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 4:
+                spec = next(specs, None)
+                if spec is None:
+                    exhausted = True
+                else:
+                    pending.add(executor.submit(run_spec, spec, include_rows))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                if "error" in record:
+                    errors += 1
+                    continue
+                latencies.append(record["latency_ms"])
+                by_type.setdefault(record["type"], []).append(record["latency_ms"])
+    elapsed = time.perf_counter() - started
+    output.flush()
+
+    return {
+        "queries": len(latencies) + errors,
+        "errors": errors,
+        "workers": workers,
+        "mode": mode,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_qps": round((len(latencies) + errors) / elapsed, 1) if elapsed else None,
+        "latency": latency_summary(latencies),
+        "latency_by_type": {search_type: latency_summary(values) for search_type, values in sorted(by_type.items())},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suchaufträge aus einer JSONL-Datei parallel ausführen")
+    parser.add_argument("specs", help="JSONL-Datei mit Suchaufträgen")
+    parser.add_argument("--output", help="JSONL-Datei für die Ergebnisse (Standard: stdout)")
+    parser.add_argument("--workers", type=int, default=4, help="Anzahl paralleler Worker")
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+    parser.add_argument("--no-rows", action="store_true", help="Nur die Trefferanzahl ausgeben")
+    parser.add_argument("--standin", help="SQLite-Ersatzdatenbank (sakila_standin.py) statt MySQL")
+    parser.add_argument("--standin-replicas", nargs="+", default=(), metavar="PATH",
+                        help="Weitere Ersatzdatenbanken als Lese-Replikate (mit --standin)")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        summary = run_batch(read_specs(args.specs), output, args.workers, args.mode,
+                            include_rows=not args.no_rows, standin=args.standin,
+                            standin_replicas=args.standin_replicas)
+    finally:
+        if args.output:
+            output.close()
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,512 @@
+# benchmark.py — Laufzeitmessungen für die Such- und Protokollfunktionen
+#
+# Aufruf (Beispiele):
+#   python benchmark.py suite --scales 10000 100000 1000000 --output results.json
+#   python benchmark.py suite --scales 10000 --baseline results.json
+#   python benchmark.py last-unique --entries 1000000 --uri mongodb://localhost:27017/
+#   python benchmark.py last-unique --entries 100000 --mongomock
+#   python benchmark.py startup --max-ms 50
+#
+# Die Suite läuft vollständig lokal: SQLite-Ersatzdatenbank mit Sakila-Schema
+# (sakila_standin.py) statt MySQL und mongomock statt MongoDB.
+
+import argparse
+import builtins
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Beispielwerte für synthetische Log-Einträge
+GENRES = ["Action", "Animation", "Children", "Classics", "Comedy", "Documentary", "Drama", "Family",
+          "Foreign", "Games", "Horror", "Music", "New", "Sci-Fi", "Sports", "Travel"]
+KEYWORDS = ["love", "robot", "drama", "epic", "dog", "boat", "shark", "moon", "girl", "teacher"]
+ACTORS = ["PENELOPE GUINESS", "NICK WAHLBERG", "ED CHASE", "JENNIFER DAVIS", "JOHNNY LOLLOBRIGIDA",
+          "BETTE NICHOLSON", "GRACE MOSTEL", "MATTHEW JOHANSSON", "JOE SWANK", "CHRISTIAN GABLE"]
+
+
+def random_log_entry(rng, timestamp):
+    """
+    Erzeugt einen Log-Eintrag im Format von log_writer.log_search_query.
+    Die Werte sind ungleich verteilt (wenige sehr häufige Suchen), wie im echten Betrieb.
+    """
+    def pick(values):
+        return values[min(int(rng.paretovariate(1.2)) - 1, len(values) - 1)]
+
+    search_type = pick(["genre", "actor", "keyword", "genre_year", "genre_year_range"])
+    if search_type == "keyword":
+        params = {"keyword": pick(KEYWORDS)}
+    elif search_type == "genre":
+        params = {"genre": pick(GENRES)}
+    elif search_type == "genre_year":
+        params = {"genre": pick(GENRES), "year": 2006}
+    elif search_type == "genre_year_range":
+        params = {"genre": pick(GENRES), "year_from": 2006, "year_to": 2006}
+    else:
+        params = {"actor": pick(ACTORS)}
+    return {"timestamp": timestamp, "search_type": search_type, "params": params,
+            "results_count": rng.randint(0, 200)}
+
+
+def seed_search_log(collection, entries, seed=42, batch_size=10000, on_batch=None):
+    """
+    Füllt eine (leere) Log-Collection mit synthetischen Einträgen in aufsteigender Zeitfolge.
+    Args:
+        collection: Ziel-Collection (echte MongoDB oder mongomock).
+        entries (int): Anzahl der Einträge.
+        seed (int, optional): Startwert des Zufallsgenerators (reproduzierbare Daten).
+        batch_size (int, optional): Einträge pro insert_many.
+        on_batch (callable, optional): Wird mit jedem geschriebenen Stapel aufgerufen.
+    """
+    # Erst hier importiert: tests/conftest.py lädt benchmark (load_config) ohne pymongo zu brauchen
+    from pymongo import DESCENDING
+
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    batch = []
+    for i in range(entries):
+        batch.append(random_log_entry(rng, start + timedelta(seconds=i)))
+        if len(batch) >= batch_size or i == entries - 1:
+            collection.insert_many(batch)
+            if on_batch is not None:
+                on_batch(batch)
+            batch = []
+    collection.create_index([("timestamp", DESCENDING)])
+
+
+def time_call(function, repeat=5, warmup=0):
+    """
+    Misst die Laufzeit eines Funktionsaufrufs mehrfach.
+    Args:
+        function (callable): Funktion ohne Argumente.
+        repeat (int, optional): Anzahl der Messungen.
+        warmup (int, optional): Anzahl der vorherigen, nicht gemessenen Aufrufe.
+    Returns:
+        dict: min, median und mean in Millisekunden.
+    """
+    for _ in range(warmup):
+        function()
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - started) * 1000)
+    return {"min_ms": round(min(durations), 3),
+            "median_ms": round(statistics.median(durations), 3),
+            "mean_ms": round(statistics.mean(durations), 3)}
+
+
+def bench_last_unique_queries(collection, limit=5, repeat=5):
+    """
+    Vergleicht begrenzten Scan und Aggregation von show_last_unique_queries.
+    Returns:
+        dict: Messergebnisse je Variante.
+    """
+    from log_reader import find_last_unique_queries, find_last_unique_queries_aggregated
+
+    stream = find_last_unique_queries(collection, limit)
+    aggregated = find_last_unique_queries_aggregated(collection, limit)
+    return {
+        "bounded_scan": time_call(lambda: find_last_unique_queries(collection, limit), repeat),
+        "aggregation": time_call(lambda: find_last_unique_queries_aggregated(collection, limit), repeat),
+        "same_result": [(t, p) for t, p, _ in stream] == [(t, p) for t, p, _ in aggregated],
+    }
+
+
+def measure(function, repeat=5, warmup=1):
+    """
+    Wie time_call, aber Konsolenausgaben werden unterdrückt, input() liefert Enter
+    und ein Fehler (z. B. von mongomock nicht unterstützte Operatoren) wird als
+    Ergebnis festgehalten statt den Benchmark abzubrechen.
+    """
+    original_input = builtins.input
+    builtins.input = lambda prompt="": ""
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return time_call(function, repeat, warmup)
+    except Exception as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+    finally:
+        builtins.input = original_input
+
+
+def load_config():
+    """
+    Stellt sicher, dass das Modul config importierbar ist. Fehlt config.py, wird
+    config.example.py verwendet (die Suite nutzt ohnehin nur lokale Ersatzdatenbanken).
+    """
+    try:
+        import config  # noqa: F401
+    except ImportError:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.example.py")
+        spec = importlib.util.spec_from_file_location("config", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules["config"] = module
+
+
+def setup_standins(workdir, films, log_entries):
+    """
+    Richtet die Ersatzdatenbanken ein und leitet search.py und log_writer.py darauf um.
+    Returns:
+        mongomock.MongoClient: Client der Log-Ersatzdatenbank.
+    """
+    import mongomock
+    from db_pool import ConnectionPool, set_pool
+    from log_writer import get_log_collection, get_rollup_collection, set_mongo_client
+    from log_rollup import ensure_rollup_indexes, mark_rollups_complete, update_rollups
+    from sakila_standin import connect_standin, create_standin_database
+
+    path = os.path.join(workdir, f"sakila_{films}.sqlite")
+    if not os.path.exists(path):
+        create_standin_database(path, films)
+    set_pool(ConnectionPool({}, min_size=1, max_size=4, health_check_after=60,
+                            connect=lambda **_: connect_standin(path)))
+
+    client = mongomock.MongoClient()
+    set_mongo_client(client)
+    rollups = get_rollup_collection()
+    ensure_rollup_indexes(rollups)
+    seed_search_log(get_log_collection(), log_entries, on_batch=lambda batch: update_rollups(rollups, batch))
+    mark_rollups_complete(rollups)    # Zähler wurden für das gesamte synthetische Log gepflegt
+    return client
+
+
+# Suchfunktionen mit typischen Parametern für die synthetischen Daten
+SEARCH_CASES = [
+    ("search_film_by_title", ("love",)),
+    ("search_film_by_genre", (1,)),
+    ("search_film_by_genre_and_year", (1, 2006)),
+    ("search_film_by_genre_and_year_range", (1, 2000, 2010)),
+    ("search_film_by_actor", ("penelope",)),
+    ("search_films", ({"actor": "penelope", "genre": 1, "length_min": 90},)),
+]
+
+
+def bench_searches(repeat):
+    """
+    Misst alle search_film_by_*-Funktionen und eine kombinierte search_films-Suche ohne Ergebnis-Cache:
+    erste Seite (COUNT + eine Seite) und vollständiges Ergebnis (paged=False).
+    """
+    import search
+    from pagination import PAGE_SIZE
+    from result_cache import get_result_cache
+
+    cache = get_result_cache()
+    results = {}
+    for name, args in SEARCH_CASES:
+        function = getattr(search, name)
+
+        def first_page():
+            cache.invalidate()
+            rows, _ = function(*args)
+            return rows[0:PAGE_SIZE]
+
+        def all_rows():
+            cache.invalidate()
+            return function(*args, paged=False)
+
+        results[f"{name}.first_page"] = measure(first_page, repeat)
+        results[f"{name}.all"] = measure(all_rows, repeat)
+    return results
+
+
+def bench_rendering(repeat):
+    """
+    Misst print_rows_paginated über alle Seiten eines vollständigen Suchergebnisses
+    sowie das reine Rendern der Seiten mit tabulate und render_grid.
+    """
+    import search
+    from formatter import print_rows_paginated
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows, columns = search.search_film_by_actor("a", paged=False)
+    return {"print_rows_paginated": measure(lambda: print_rows_paginated(rows, columns), repeat),
+            "print_rows_paginated.rows": len(rows),
+            **bench_table_rendering(rows, columns, repeat)}
+
+
+def bench_table_rendering(rows, columns, repeat):
+    """
+    Vergleicht tabulate mit table_renderer.render_grid über alle Seiten eines Ergebnisses
+    und zählt die Seiten, deren Ausgabe nicht zeichengleich ist (muss 0 sein).
+    """
+    from tabulate import tabulate
+    from pagination import PAGE_SIZE
+    from table_renderer import render_grid
+
+    pages = [rows[i:i + PAGE_SIZE] for i in range(0, len(rows), PAGE_SIZE)]
+    mismatches = sum(1 for page in pages
+                     if render_grid(page, columns) not in (None, tabulate(page, headers=columns, tablefmt="grid")))
+    return {
+        "render_table.tabulate": measure(
+            lambda: [tabulate(page, headers=columns, tablefmt="grid") for page in pages], repeat),
+        "render_table.grid": measure(lambda: [render_grid(page, columns) for page in pages], repeat),
+        "render_table.mismatches": mismatches,
+    }
+
+
+def bench_log_reports(repeat):
+    """
+    Misst beide Statistik-Berichte aus log_reader (inkl. ihrer Varianten).
+    """
+    from log_reader import show_last_unique_queries, show_popular_queries
+
+    return {
+        "show_popular_queries.rollups": measure(lambda: show_popular_queries(5), repeat),
+        "show_popular_queries.aggregation": measure(lambda: show_popular_queries(5, use_rollups=False), repeat),
+        "show_last_unique_queries.scan": measure(lambda: show_last_unique_queries(5), repeat),
+        "show_last_unique_queries.aggregation": measure(
+            lambda: show_last_unique_queries(5, aggregated=True), repeat),
+    }
+
+
+def bench_log_writer(repeat, entries=1000):
+    """
+    Misst das Protokollieren von entries Suchanfragen einschließlich Leeren der Warteschlange.
+    Jeder Durchlauf schreibt in eigene, leere mongomock-Collections, damit die Messungen
+    vergleichbar bleiben und Log und Rollups der Berichts-Benchmarks unverändert sind.
+    """
+    import mongomock
+    from log_rollup import ensure_rollup_indexes, update_rollups
+    from log_writer import AsyncLogSink
+
+    rng = random.Random(7)
+    batch = [random_log_entry(rng, datetime(2024, 6, 1)) for _ in range(entries)]
+
+    def write():
+        database = mongomock.MongoClient().bench_log_writer
+        rollups = database.search_log_rollup
+        ensure_rollup_indexes(rollups)
+        sink = AsyncLogSink(lambda: database.search_log, flush_interval=0.01,
+                            on_written=lambda written: update_rollups(rollups, written))
+        for entry in batch:
+            sink.submit(dict(entry))
+        sink.close(timeout=60)
+
+    return {f"log_search_query.x{entries}": measure(write, repeat, warmup=0)}
+
+
+def run_suite(scales, log_entries, repeat, workdir):
+    """
+    Führt alle Benchmarks für jede Datenbankgröße aus.
+    Returns:
+        dict: Ergebnisse im JSON-Format (meta + scales).
+    """
+    load_config()
+    results = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "log_entries": log_entries, "repeat": repeat,
+                 "timestamp": datetime.now().isoformat(timespec="seconds")},
+        "scales": {},
+    }
+    for films in scales:
+        setup_standins(workdir, films, log_entries)
+        scale = {}
+        scale.update(bench_searches(repeat))
+        scale.update(bench_rendering(repeat))
+        scale.update(bench_log_reports(repeat))
+        scale.update(bench_log_writer(repeat))
+        results["scales"][str(films)] = scale
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance=1.2, min_delta_ms=1.0):
+    """
+    Vergleicht die Mediane mit einem gespeicherten Ergebnis.
+    Args:
+        results (dict): Aktuelle Ergebnisse aus run_suite.
+        baseline (dict): Früheres Ergebnis aus run_suite.
+        tolerance (float, optional): Erlaubter Faktor, bevor eine Messung als Regression gilt.
+        min_delta_ms (float, optional): Kleinere absolute Abweichungen gelten als Messrauschen.
+    Returns:
+        list[dict]: Vergleich je Messung (scale, name, baseline_ms, current_ms, ratio, regression).
+    """
+    comparison = []
+    for films, scale in results["scales"].items():
+        for name, current in scale.items():
+            previous = baseline.get("scales", {}).get(films, {}).get(name)
+            if not isinstance(current, dict) or not isinstance(previous, dict):
+                continue
+            if "median_ms" not in current or "median_ms" not in previous:
+                continue
+            ratio = current["median_ms"] / previous["median_ms"] if previous["median_ms"] else float("inf")
+            delta = current["median_ms"] - previous["median_ms"]
+            comparison.append({"scale": films, "name": name, "baseline_ms": previous["median_ms"],
+                               "current_ms": current["median_ms"], "ratio": round(ratio, 3),
+                               "regression": ratio > tolerance and delta > min_delta_ms})
+    return comparison
+
+
+def get_mongo_collection(args):
+    """
+    Liefert eine leere Benchmark-Collection (echte MongoDB oder mongomock).
+    """
+    if args.mongomock:
+        import mongomock
+        client = mongomock.MongoClient()
+    else:
+        from pymongo import MongoClient
+        client = MongoClient(args.uri)
+    collection = client[args.database][args.collection]
+    collection.drop()
+    return collection
+
+
+# Module, die beim Programmstart (Menü anzeigen und sofort mit "0" beenden) noch nicht
+# geladen werden dürfen
+DEFERRED_MODULES = ("pymysql", "pymongo", "bson", "tabulate", "search", "log_writer", "log_reader")
+
+# Startskript für den Kindprozess: config (notfalls config.example.py) laden, dann das Menü
+# wie in der README starten; die Eingabe "0" kommt über stdin. Danach wird auf Hintergrund-
+# Threads gewartet, damit auch deren Importe zählen. Letzte Ausgabezeile: Ergebnis als JSON.
+STARTUP_SCRIPT = """
+import importlib.util, json, sys, threading, time
+try:
+    import config
+except ImportError:
+    spec = importlib.util.spec_from_file_location("config", {example!r})
+    sys.modules["config"] = module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+started = time.perf_counter()
+from main_menu import main_menu
+imported = time.perf_counter()
+main_menu()
+finished = time.perf_counter()
+for thread in threading.enumerate():
+    if thread is not threading.main_thread():
+        thread.join(5)
+print(json.dumps({{"import_ms": (imported - started) * 1000, "total_ms": (finished - started) * 1000,
+                  "modules": sorted(sys.modules)}}))
+"""
+
+
+def parse_import_times(stderr, module):
+    """
+    Wertet die Ausgabe von python -X importtime aus.
+    Returns:
+        tuple: (Gesamtzeit des Moduls in µs, dict Untermodul -> (eigene µs, kumulierte µs))
+    """
+    subtree = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if not parts[0].strip().isdigit():
+            continue                                 # Kopfzeile
+        self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2]
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if depth == 0:
+            if name == module:
+                return cumulative_us, subtree
+            subtree = {}
+        else:
+            subtree[name] = (self_us, cumulative_us)
+    raise RuntimeError(f"Modul {module} nicht in der Ausgabe von -X importtime gefunden.")
+
+
+def bench_startup(repeat=5, top=10):
+    """
+    Misst den Kaltstart des Menüs in frischen Interpretern (python -X importtime): Import
+    von main_menu, Kopfzeile und Menü, Beenden mit "0". Prüft, dass danach keine der
+    DEFERRED_MODULES geladen ist (auch nicht von Hintergrund-Threads).
+    Returns:
+        dict: Median/Minimum in ms (gesamt und nur Import), langsamste Untermodule und
+        vorzeitig geladene Module.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    script = STARTUP_SCRIPT.format(example=os.path.join(directory, "config.example.py"))
+    totals, imports, subtree, loaded = [], [], {}, set()
+    # Erster Lauf erzeugt ggf. die .pyc-Dateien und wird nicht gewertet
+    for attempt in range(repeat + 1):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", script], cwd=directory,
+                                   input="0\n", capture_output=True, text=True, check=True)
+        _, subtree = parse_import_times(completed.stderr, "main_menu")
+        result = json.loads(completed.stdout.splitlines()[-1])
+        loaded.update(name.split(".")[0] for name in result["modules"])
+        if attempt:
+            totals.append(result["total_ms"])
+            imports.append(result["import_ms"])
+    slowest = sorted(subtree.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    return {
+        "median_ms": round(statistics.median(totals), 3),
+        "min_ms": round(min(totals), 3),
+        "import_median_ms": round(statistics.median(imports), 3),
+        "slowest": {name: {"self_ms": round(self_us / 1000, 3), "cumulative_ms": round(cumulative_us / 1000, 3)}
+                    for name, (self_us, cumulative_us) in slowest},
+        "loaded_too_early": sorted(loaded.intersection(DEFERRED_MODULES)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks für Such- und Protokollfunktionen")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    suite = subparsers.add_parser("suite", help="Alle Benchmarks gegen lokale Ersatzdatenbanken")
+    suite.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                       help="Anzahl der Filme je Durchlauf")
+    suite.add_argument("--log-entries", type=int, default=100_000, help="Anzahl der Log-Einträge")
+    suite.add_argument("--repeat", type=int, default=5, help="Wiederholungen pro Messung")
+    suite.add_argument("--workdir", default=None, help="Verzeichnis für die SQLite-Dateien (wiederverwendbar)")
+    suite.add_argument("--output", help="Ergebnisse zusätzlich in diese JSON-Datei schreiben")
+    suite.add_argument("--baseline", help="Gespeichertes Ergebnis zum Vergleich")
+    suite.add_argument("--tolerance", type=float, default=1.2, help="Erlaubter Faktor gegenüber der Baseline")
+
+    last_unique = subparsers.add_parser("last-unique", help="Begrenzter Scan vs. Aggregation")
+    last_unique.add_argument("--entries", type=int, default=1_000_000, help="Anzahl der Log-Einträge")
+    last_unique.add_argument("--repeat", type=int, default=5, help="Wiederholungen pro Messung")
+    last_unique.add_argument("--uri", default="mongodb://localhost:27017/", help="MongoDB für den Benchmark")
+    last_unique.add_argument("--database", default="benchmark")
+    last_unique.add_argument("--collection", default="search_log")
+    last_unique.add_argument("--mongomock", action="store_true", help="mongomock statt echter MongoDB verwenden")
+
+    startup = subparsers.add_parser("startup", help="Kaltstart des Menüs (python -X importtime)")
+    startup.add_argument("--repeat", type=int, default=5, help="Anzahl frischer Interpreter")
+    startup.add_argument("--max-ms", type=float, help="Obergrenze für den Median; Überschreitung = Exit-Code 1")
+    args = parser.parse_args(argv)
+
+    if args.benchmark == "startup":
+        report = bench_startup(args.repeat)
+        print(json.dumps(report, indent=2))
+        too_slow = args.max_ms is not None and report["median_ms"] > args.max_ms
+        return 1 if too_slow or report["loaded_too_early"] else 0
+
+    if args.benchmark == "suite":
+        workdir = args.workdir or tempfile.mkdtemp(prefix="sakila_bench_")
+        os.makedirs(workdir, exist_ok=True)
+        results = run_suite(args.scales, args.log_entries, args.repeat, workdir)
+        exit_code = 0
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as baseline_file:
+                comparison = compare_with_baseline(results, json.load(baseline_file), args.tolerance)
+            results["comparison"] = comparison
+            exit_code = 1 if any(row["regression"] for row in comparison) else 0
+        output = json.dumps(results, indent=2)
+        print(output)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as output_file:
+                output_file.write(output)
+        return exit_code
+
+    load_config()
+    collection = get_mongo_collection(args)
+    seed_search_log(collection, args.entries)
+    results = {"entries": args.entries,
+               "last_unique_queries": bench_last_unique_queries(collection, repeat=args.repeat)}
+    print(json.dumps(results, indent=2))
+    collection.drop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# cache_warmer.py — Vorwärmen des Ergebnis-Caches mit den häufigsten Suchen aus dem Protokoll
+#
+# Das MongoDB-Suchprotokoll zeigt, welche Kombinationen aus Suchtyp und Parametern am
+# häufigsten vorkommen. Beim Programmstart (und danach in festen Abständen) werden die
+# top_n Kombinationen der letzten window_days Tage im Hintergrund ausgeführt und in den
+# Ergebnis-Cache (result_cache.py) geladen — so wie das Menü sie abfragt: Trefferanzahl
+# und erste Seite. Die beliebtesten Suchen kommen zuerst; sobald das Speicherbudget
+# max_bytes erreicht ist, wird nicht weiter vorgewärmt.
+#
+# Die häufigsten Suchen anzeigen, ohne etwas zu laden:
+#   python cache_warmer.py top --limit 20
+
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+
+import config
+from batch_search import resolve_params
+
+
+# Standardwerte (können in config.py über CACHE_WARMER_CONFIG überschrieben werden)
+DEFAULT_CACHE_WARMER_CONFIG = {
+    "enabled": True,
+    "top_n": 20,                       # Anzahl der vorgewärmten Suchen (höchstens RESULT_CACHE_CONFIG['max_entries'])
+    "window_days": 7,                  # Nur Suchen aus diesem Zeitraum zählen (None = ganzes Protokoll)
+    "interval": 300,                   # Sekunden bis zum nächsten Vorwärmen (None = nur beim Start)
+    "max_bytes": 16 * 1024 * 1024,     # Speicherbudget der vorgewärmten Ergebnisse (geschätzt)
+}
+
+
+def top_searches_pipeline(limit=20, since=None):
+    """
+    Aggregations-Pipeline für die häufigsten Kombinationen aus Suchtyp und Parametern.
+    Args:
+        limit (int, optional): Anzahl der Kombinationen.
+        since (datetime, optional): Nur Suchen ab diesem Zeitpunkt.
+    Returns:
+        list[dict]: Pipeline für collection.aggregate.
+    """
+    match = {"search_type": {"$exists": True}}
+    if since is not None:
+        match["timestamp"] = {"$gte": since}
+    return [
+        {"$match": match},
+        {"$group": {"_id": {"search_type": "$search_type", "params": "$params"}, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": limit},
+    ]
+
+
+def find_top_searches(collection, limit=20, window_days=None):
+    """
+    Liefert die häufigsten Suchen aus dem Protokoll.
+    Args:
+        collection: Log-Collection (MongoDB oder mongomock).
+        limit (int, optional): Anzahl der Suchen.
+        window_days (float, optional): Nur die letzten so vielen Tage berücksichtigen.
+    Returns:
+        list[tuple]: (search_type, params, Anzahl), häufigste zuerst.
+    """
+    since = datetime.now() - timedelta(days=window_days) if window_days else None
+    return [(doc["_id"]["search_type"], doc["_id"].get("params") or {}, doc["count"])
+            for doc in collection.aggregate(top_searches_pipeline(limit, since))]
+
+
+class CacheWarmer:
+    """
+    Lädt die häufigsten Suchen aus dem Protokoll im Voraus in den Ergebnis-Cache.
+    """
+
+    def __init__(self, get_collection, enabled=True, top_n=20, window_days=7, interval=300,
+                 max_bytes=16 * 1024 * 1024):
+        """
+        Args:
+            get_collection (callable): Liefert die Log-Collection, z. B. log_writer.get_log_collection.
+            enabled (bool, optional): Vorwärmen aktiv.
+            top_n (int, optional): Anzahl der vorgewärmten Suchen.
+            window_days (float, optional): Betrachteter Zeitraum des Protokolls in Tagen.
+            interval (float, optional): Sekunden zwischen zwei Durchläufen (None = nur einmal).
+            max_bytes (int, optional): Speicherbudget der vorgewärmten Ergebnisse.
+        """
+        self._get_collection = get_collection
+        self.enabled = enabled
+        self.top_n = top_n
+        self.window_days = window_days
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.stats = {"runs": 0, "warmed": 0, "skipped_budget": 0, "errors": 0, "bytes": 0,
+                      "last_run_ms": None}
+
+    def warm_once(self):
+        """
+        Ein Durchlauf: häufigste Suchen ermitteln und neu in den Ergebnis-Cache laden.
+        Returns:
+            dict: warmed, skipped_budget, errors, bytes, elapsed_ms dieses Durchlaufs.
+        """
+        from result_cache import estimate_size
+        from search import run_search
+
+        started = time.perf_counter()
+        run = {"warmed": 0, "skipped_budget": 0, "errors": 0, "bytes": 0}
+        for search_type, params, _ in find_top_searches(self._get_collection(), self.top_n, self.window_days):
+            if run["bytes"] >= self.max_bytes:
+                run["skipped_budget"] += 1
+                continue
+            try:
+                # Lädt wie das Menü COUNT und erste Seite (PagedQuery.load_first_page)
+                rows, _ = run_search(search_type, resolve_params(params), paged=True, refresh=True)
+                run["bytes"] += estimate_size(rows)
+                run["warmed"] += 1
+            except Exception:
+                run["errors"] += 1
+        run["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        with self._lock:
+            self.stats["runs"] += 1
+            for name in ("warmed", "skipped_budget", "errors"):
+                self.stats[name] += run[name]
+            self.stats["bytes"] = run["bytes"]
+            self.stats["last_run_ms"] = run["elapsed_ms"]
+        return run
+
+    def _run(self):
+        while True:
+            try:
+                self.warm_once()
+            except Exception:
+                # z. B. MongoDB nicht erreichbar: beim nächsten Intervall erneut versuchen
+                with self._lock:
+                    self.stats["errors"] += 1
+            if self.interval is None or self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        """
+        Startet das Vorwärmen im Hintergrund (einmal bzw. alle interval Sekunden).
+        Mehrfache Aufrufe starten nur einen Thread.
+        """
+        with self._lock:
+            if not self.enabled or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Beendet das regelmäßige Vorwärmen nach dem laufenden Durchlauf.
+        """
+        self._stop.set()
+
+
+_cache_warmer = None
+_cache_warmer_lock = threading.Lock()
+
+
+def get_cache_warmer():
+    """
+    Liefert den gemeinsamen CacheWarmer (wird beim ersten Aufruf erstellt).
+    Returns:
+        CacheWarmer: Mit den Einstellungen aus CACHE_WARMER_CONFIG.
+    """
+    global _cache_warmer
+    with _cache_warmer_lock:
+        if _cache_warmer is None:
+            from log_writer import get_log_collection
+            settings = {**DEFAULT_CACHE_WARMER_CONFIG, **getattr(config, "CACHE_WARMER_CONFIG", {})}
+            _cache_warmer = CacheWarmer(get_log_collection, **settings)
+    return _cache_warmer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Häufigste Suchen aus dem Protokoll")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    top = subparsers.add_parser("top", help="Häufigste Kombinationen aus Suchtyp und Parametern anzeigen")
+    top.add_argument("--limit", type=int, default=DEFAULT_CACHE_WARMER_CONFIG["top_n"])
+    top.add_argument("--window-days", type=float, default=DEFAULT_CACHE_WARMER_CONFIG["window_days"],
+                     help="Zeitraum in Tagen (0 = ganzes Protokoll)")
+    args = parser.parse_args(argv)
+
+    from log_writer import get_log_collection
+    for search_type, params, count in find_top_searches(get_log_collection(), args.limit, args.window_days):
+        print(f"{count:>8}  {search_type:<18} {params}")
+
+
+if __name__ == "__main__":
+    main()
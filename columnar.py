@@ -0,0 +1,135 @@
+# columnar.py — Speichersparende, spaltenweise Ablage vollständiger Suchergebnisse
+#
+# Statt einer Liste von Tupeln wird jede Spalte einzeln gespeichert:
+#   - Ganzzahlen (Jahr, Laufzeit) in einem array mit dem kleinsten passenden Typ,
+#   - Texte mit wenigen verschiedenen Werten (Genre, Bewertung) als Wörterbuch
+#     (jeder Wert nur einmal) plus array mit den Indizes,
+#   - alle übrigen Werte als Liste.
+# Zeilen werden erst beim Zugriff wieder als Tupel zusammengesetzt, z. B. seitenweise
+# in formatter.print_rows_paginated. Verwendet nur für vollständige Ergebnisse
+# (paged=False: batch_search.py, benchmark.py); das Menü lädt seitenweise (PagedQuery).
+
+import sys
+from array import array
+
+# Typcodes für Ganzzahlen, vom kleinsten zum größten: (typecode, min, max)
+INT_TYPECODES = (("b", -2 ** 7, 2 ** 7 - 1), ("h", -2 ** 15, 2 ** 15 - 1),
+                 ("i", -2 ** 31, 2 ** 31 - 1), ("q", -2 ** 63, 2 ** 63 - 1))
+
+# Texte werden als Wörterbuch gespeichert, wenn höchstens dieser Anteil der Werte verschieden ist
+DICTIONARY_MAX_RATIO = 0.5
+
+
+class DictionaryColumn:
+    """
+    Textspalte mit wenigen verschiedenen Werten: jeder Wert einmal, pro Zeile nur ein Index.
+    """
+
+    def __init__(self, values, codes):
+        self.values = values      # list[str] — verschiedene Werte
+        self.codes = codes        # array — Index in values pro Zeile
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            values = self.values
+            return [values[code] for code in self.codes[index]]
+        return self.values[self.codes[index]]
+
+
+def encode_column(values):
+    """
+    Wählt die kompakteste Ablage für eine Spalte.
+    Args:
+        values (list): Werte der Spalte.
+    Returns:
+        array | DictionaryColumn | list: Spalte mit Index- und Slice-Zugriff.
+    """
+    if values and all(type(value) is int for value in values):
+        low, high = min(values), max(values)
+        for typecode, type_min, type_max in INT_TYPECODES:
+            if type_min <= low and high <= type_max:
+                return array(typecode, values)
+
+    if values and all(type(value) is str for value in values):
+        index = {}
+        codes = [index.setdefault(value, len(index)) for value in values]
+        if len(index) <= max(1, len(values) * DICTIONARY_MAX_RATIO) and len(index) <= 2 ** 16:
+            return DictionaryColumn(list(index), array("B" if len(index) <= 2 ** 8 else "H", codes))
+
+    return list(values)
+
+
+class ColumnarResult:
+    """
+    Unveränderliche Ergebnisliste in Spaltenform.
+
+    Unterstützt len(), Indexzugriff (liefert ein Tupel), Slicing (liefert eine Liste
+    von Tupeln nur für den angeforderten Bereich) und Iteration wie eine Liste.
+    """
+
+    def __init__(self, columns, length):
+        """
+        Args:
+            columns (list): Spalten aus encode_column.
+            length (int): Anzahl der Zeilen.
+        """
+        self._columns = columns
+        self._length = length
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Erstellt die spaltenweise Ablage aus einer Liste von Tupeln.
+        """
+        rows = list(rows)
+        columns = [encode_column(list(values)) for values in zip(*rows)] if rows else []
+        return cls(columns, len(rows))
+
+    def memory_size(self):
+        """
+        Schätzt den Speicherbedarf der Spalten in Bytes (für result_cache).
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self._columns)
+        for column in self._columns:
+            if isinstance(column, DictionaryColumn):
+                size += sys.getsizeof(column.codes) + sum(sys.getsizeof(value) for value in column.values)
+            elif isinstance(column, array):
+                size += sys.getsizeof(column)
+            else:
+                size += sys.getsizeof(column) + sum(sys.getsizeof(value) for value in column)
+        return size
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if not self._columns or stop <= start:
+                return []
+            return list(zip(*(column[start:stop] for column in self._columns)))
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Index außerhalb des Ergebnisbereichs")
+        return tuple(column[index] for column in self._columns)
+
+    def __iter__(self):
+        for start in range(0, self._length, 1000):
+            yield from self[start:start + 1000]
+
+    def __eq__(self, other):
+        if isinstance(other, (ColumnarResult, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    # Vergleich nach Inhalt wie bei list, daher wie list nicht hashbar
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ColumnarResult({self._length} Zeilen, {len(self._columns)} Spalten)"
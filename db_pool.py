@@ -0,0 +1,372 @@
+# db_pool.py — Verbindungspool für die MySQL-Datenbank
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pymysql
+import config
+
+
+# Standardwerte für den Pool (können in config.py über MYSQL_POOL_CONFIG überschrieben werden)
+DEFAULT_POOL_CONFIG = {
+    "min_size": 1,               # Anzahl der Verbindungen, die immer offen bleiben
+    "max_size": 5,               # Maximale Anzahl gleichzeitig offener Verbindungen
+    "max_idle": 300,             # Sekunden, nach denen unbenutzte Verbindungen geschlossen werden
+    "checkout_timeout": 10,      # Sekunden, die auf eine freie Verbindung gewartet wird
+    "health_check_after": 5,     # Verbindungen, die länger ruhen, werden vor der Ausgabe geprüft
+}
+
+# Fehler, nach denen eine Verbindung als defekt gilt und verworfen wird
+CONNECTION_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+
+class PoolTimeout(Exception):
+    """
+    Wird ausgelöst, wenn innerhalb von checkout_timeout keine Verbindung frei wird.
+    """
+
+
+class ConnectionPool:
+    """
+    Thread-sicherer Pool wiederverwendbarer pymysql-Verbindungen.
+
+    Verbindungen werden beim Ausleihen auf ihre Gesundheit geprüft (ping),
+    nach längerer Ruhezeit geschlossen und bei Fehlern durch neue ersetzt.
+    """
+
+    def __init__(self, connect_kwargs, min_size=1, max_size=5, max_idle=300,
+                 checkout_timeout=10, health_check_after=5, connect=pymysql.connect):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Ungültige Poolgröße: min_size <= max_size und max_size >= 1 erforderlich.")
+
+        # autocommit verhindert, dass wiederverwendete Verbindungen einen alten Snapshot sehen
+        self._connect_kwargs = {"autocommit": True, **connect_kwargs}
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.checkout_timeout = checkout_timeout
+        self.health_check_after = health_check_after
+
+        self._idle = deque()          # Einträge (connection, zeitpunkt_der_rückgabe)
+        self._size = 0                # Anzahl aller offenen Verbindungen (frei + ausgeliehen)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "creations": 0,
+            "closed": 0,
+            "evictions": 0,
+            "health_check_failures": 0,
+            "reconnects": 0,
+        }
+
+    def _create_connection(self):
+        """
+        Öffnet eine neue physische Verbindung zur Datenbank.
+        """
+        connection = self._connect(**self._connect_kwargs)
+        with self._cond:
+            self._stats["creations"] += 1
+        return connection
+
+    def _close_connections(self, connections):
+        """
+        Schließt Verbindungen, ohne Fehler weiterzugeben. Darf nicht mit gehaltener Sperre
+        aufgerufen werden: close() kann über das Netzwerk warten und würde sonst alle
+        anderen Ausleihen aufhalten.
+        """
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        if connections:
+            with self._cond:
+                self._stats["closed"] += len(connections)
+
+    def fill(self):
+        """
+        Öffnet so viele Verbindungen, bis min_size erreicht ist.
+        """
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                connection = self._create_connection()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((connection, time.monotonic()))
+                self._cond.notify()
+
+    def _evict_idle(self, now):
+        """
+        Nimmt Verbindungen aus dem Pool, die länger als max_idle unbenutzt sind (min_size
+        bleibt erhalten). Muss mit gehaltener Sperre aufgerufen werden.
+        Returns:
+            list: Zu schließende Verbindungen (siehe _close_connections).
+        """
+        expired = []
+        # Die ältesten Verbindungen stehen links in der Warteschlange
+        while self._idle and self._size > self.min_size:
+            connection, returned_at = self._idle[0]
+            if now - returned_at <= self.max_idle:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._stats["evictions"] += 1
+            expired.append(connection)
+        return expired
+
+    def _is_healthy(self, connection, returned_at):
+        """
+        Prüft eine Verbindung per ping, falls sie länger als health_check_after geruht hat.
+        """
+        if time.monotonic() - returned_at < self.health_check_after:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """
+        Leiht eine gesunde Verbindung aus dem Pool aus.
+        Returns:
+            pymysql.connections.Connection: Ausgeliehene Verbindung.
+        Raises:
+            PoolTimeout: Wenn innerhalb von checkout_timeout keine Verbindung frei wird.
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        waited = False
+
+        while True:
+            expired = []
+            try:
+                with self._cond:
+                    if self._closed:
+                        raise RuntimeError("Der Verbindungspool wurde bereits geschlossen.")
+                    # Warten kommt nur vor, wenn nichts ausgelaufen ist (sonst ist Platz frei)
+                    expired = self._evict_idle(time.monotonic())
+
+                    if self._idle:
+                        # Zuletzt zurückgegebene Verbindung zuerst (LIFO), damit alte Verbindungen auslaufen
+                        connection, returned_at = self._idle.pop()
+                    elif self._size < self.max_size:
+                        self._size += 1
+                        connection, returned_at = None, None
+                    else:
+                        if not waited:
+                            self._stats["waits"] += 1
+                            waited = True
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise PoolTimeout(f"Keine freie Verbindung nach {self.checkout_timeout} Sekunden.")
+                        self._cond.wait(remaining)
+                        continue
+            finally:
+                self._close_connections(expired)
+
+            if connection is None:
+                # Neue Verbindung außerhalb der Sperre öffnen (Handshake kann dauern)
+                try:
+                    connection = self._create_connection()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(connection, returned_at):
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                    self._stats["reconnects"] += 1
+                self._close_connections([connection])
+                try:
+                    connection = self._create_connection()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            with self._cond:
+                self._stats["checkouts"] += 1
+            return connection
+
+    def release(self, connection, discard=False):
+        """
+        Gibt eine ausgeliehene Verbindung an den Pool zurück.
+        Args:
+            connection: Zuvor mit acquire() ausgeliehene Verbindung.
+            discard (bool, optional): True, wenn die Verbindung defekt ist und geschlossen werden soll.
+        """
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                expired = [connection]
+            else:
+                self._idle.append((connection, time.monotonic()))
+                expired = []
+            expired += self._evict_idle(time.monotonic())
+            self._cond.notify()
+        self._close_connections(expired)
+
+    @contextmanager
+    def connection(self):
+        """
+        Kontextmanager zum Ausleihen einer Verbindung.
+        Bei Verbindungsfehlern wird die Verbindung verworfen statt zurückgegeben.
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        except CONNECTION_ERRORS:
+            self.release(connection, discard=True)
+            raise
+        except BaseException:
+            self.release(connection)
+            raise
+        else:
+            self.release(connection)
+
+    def probe(self, timeout=None):
+        """
+        Prüft den Datenbankserver mit einer eigenen, kurzlebigen Verbindung (SELECT 1),
+        unabhängig davon, wie viele Verbindungen des Pools gerade ausgeliehen sind.
+        Args:
+            timeout (float, optional): Verbindungs- und Lese-Timeout in Sekunden.
+        Returns:
+            bool: True, wenn der Server geantwortet hat.
+        """
+        kwargs = dict(self._connect_kwargs)
+        if timeout is not None:
+            kwargs.update(connect_timeout=timeout, read_timeout=timeout)
+        try:
+            connection = self._connect(**kwargs)
+        except Exception:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            return True
+        except Exception:
+            return False
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def get_stats(self):
+        """
+        Liefert die Kennzahlen des Pools.
+        Returns:
+            dict: Zähler (checkouts, waits, creations, ...) sowie aktuelle Größe und freie Verbindungen.
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._size - len(self._idle)
+        return stats
+
+    def close(self):
+        """
+        Schließt alle freien Verbindungen; ausgeliehene werden bei der Rückgabe geschlossen.
+        """
+        with self._cond:
+            self._closed = True
+            connections = [connection for connection, _ in self._idle]
+            self._size -= len(connections)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_connections(connections)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Liefert den gemeinsamen Verbindungspool (wird beim ersten Aufruf erstellt).
+    Sind in config.py Lese-Replikate (MYSQL_REPLICAS) eingetragen, ist das ein
+    ReplicaRouter (replica_router.py) mit derselben Schnittstelle.
+    Returns:
+        ConnectionPool | ReplicaRouter: Pool mit den Einstellungen aus MYSQL_CONFIG und MYSQL_POOL_CONFIG.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+        settings = {**DEFAULT_POOL_CONFIG, **getattr(config, "MYSQL_POOL_CONFIG", {})}
+        replicas = getattr(config, "MYSQL_REPLICAS", None)
+        if replicas:
+            from replica_router import create_replica_router
+            pool = create_replica_router(config.MYSQL_CONFIG, replicas, settings)
+        else:
+            pool = ConnectionPool(config.MYSQL_CONFIG, **settings)
+        atexit.register(pool.close)
+        _pool = pool
+    # Mindestanzahl Verbindungen nur beim Erstellen öffnen, nicht bei jeder Abfrage: mit
+    # Replikaten baut fill() Verbindungen zu allen Servern auf und würde bei einem nicht
+    # erreichbaren Server jede Suche bis zum Verbindungs-Timeout aufhalten
+    pool.fill()
+    return pool
+
+
+def _forget_after_fork():
+    """
+    Im Kindprozess gehören die geerbten Verbindungen weiterhin dem Elternprozess: nicht
+    schließen (das würde auch dessen Verbindungen beenden), nur vergessen.
+    """
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_after_fork)
+
+
+def set_pool(pool):
+    """
+    Ersetzt den gemeinsamen Pool, z. B. durch einen Pool auf eine lokale Ersatzdatenbank
+    (siehe sakila_standin.py). Der bisherige Pool wird geschlossen; Schauspieler-Index und
+    Stammdaten-Cache werden verworfen, Letzterer bleibt für den neuen Pool im Arbeitsspeicher.
+    Args:
+        pool (ConnectionPool | ReplicaRouter | None): Neuer Pool; None = beim nächsten
+            get_pool() wieder aus config.py erstellen.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            return
+        if _pool is not None:
+            _pool.close()
+        _pool = pool
+    # Schauspieler-Index und Stammdaten gehören zur bisherigen Datenbank; die Stammdaten-Datei
+    # nur zur Datenbank aus MYSQL_CONFIG (get_pool nach set_pool(None))
+    from actor_index import reset_actor_index
+    from reference_cache import reset_reference_cache
+    reset_actor_index()
+    reset_reference_cache(persistent=pool is None)
+
+
+def get_pool_stats():
+    """
+    Liefert die Kennzahlen des gemeinsamen Pools (leeres dict, falls noch nicht erstellt).
+    """
+    return _pool.get_stats() if _pool is not None else {}
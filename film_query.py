@@ -0,0 +1,187 @@
+# film_query.py — Filmsuche mit beliebiger Kombination von Filtern
+#
+# Jeder Filter liefert seine Bedingung; JOINs werden nur hinzugefügt, wenn eine Ausgabespalte
+# sie benötigt (Filter auf nicht ausgegebene Tabellen werden als EXISTS-Semi-Join geprüft und
+# vervielfachen so keine Zeilen). Die SQL-Teile werden pro Filterform (verwendete Filter,
+# Ausgabespalten, Anzahl der IN-Werte, Art der Schlüsselwortsuche) einmal erzeugt und
+# wiederverwendet; jede Kombination läuft als eine einzige Abfrage in der Datenbank.
+#
+# Im gruppierten Modus (group_films=True) liefert die Datenbank genau eine Zeile pro Film:
+# Genres und Schauspieler/innen werden per GROUP_CONCAT zusammengefasst, gezählt wird die
+# tatsächliche Anzahl der Filme.
+
+from functools import lru_cache
+
+from pagination import PagedQuery
+from keyword_search import build_keyword_search
+from actor_index import get_actor_index
+
+
+# Ausgabespalten: Name -> (SQL-Ausdruck, Überschrift, benötigter JOIN, Ausdruck im gruppierten Modus)
+COLUMNS = {
+    "actor": ("CONCAT(a.first_name, ' ', a.last_name)", "Name des Schauspielers/der Schauspielerin", "actor",
+              "GROUP_CONCAT(DISTINCT CONCAT(a.first_name, ' ', a.last_name) "
+              "ORDER BY a.last_name, a.first_name SEPARATOR ', ')"),
+    "title": ("f.title", "Titel", None, None),
+    "year": ("f.release_year", "Erscheinungsjahr", None, None),
+    "genre": ("c.name", "Genre", "category", "GROUP_CONCAT(DISTINCT c.name ORDER BY c.name SEPARATOR ', ')"),
+    "rating": ("f.rating", "Bewertung", None, None),
+    "length": ("f.length", "Laufzeit", None, None),
+}
+
+DEFAULT_COLUMNS = ("title", "year", "genre", "rating", "length")
+
+JOINS = {
+    "category": """
+        JOIN film_category fc ON f.film_id = fc.film_id
+        JOIN category c ON fc.category_id = c.category_id""",
+    "actor": """
+        JOIN film_actor fa ON f.film_id = fa.film_id
+        JOIN actor a ON fa.actor_id = a.actor_id""",
+}
+
+# Filter mit genau einem Wert, die nur Spalten der Tabelle film verwenden
+FILM_FILTERS = {
+    "year": "f.release_year = %s",
+    "year_from": "f.release_year >= %s",
+    "year_to": "f.release_year <= %s",
+    "rating": "f.rating = %s",
+    "length_min": "f.length >= %s",
+    "length_max": "f.length <= %s",
+}
+
+# Alle unterstützten Filter (keyword: Titel/Beschreibung, genre: category_id, actor: Name)
+FILTERS = ("keyword", "genre", "actor") + tuple(FILM_FILTERS)
+
+
+def build_conditions(filters, joins, actor_count, keyword_parts):
+    """
+    Liefert die Filterbedingungen in der Reihenfolge ihrer Parameter.
+    Filter auf Tabellen, die nicht in joins enthalten sind, werden als EXISTS geprüft.
+    """
+    conditions = []
+    if "genre" in filters:
+        conditions.append("fc.category_id = %s" if "category" in joins else
+                          "EXISTS (SELECT 1 FROM film_category fcf "
+                          "WHERE fcf.film_id = f.film_id AND fcf.category_id = %s)")
+    if "actor" in filters:
+        placeholders = ", ".join(["%s"] * actor_count)
+        conditions.append(f"fa.actor_id IN ({placeholders})" if "actor" in joins else
+                          "EXISTS (SELECT 1 FROM film_actor faf "
+                          f"WHERE faf.film_id = f.film_id AND faf.actor_id IN ({placeholders}))")
+    conditions.extend(FILM_FILTERS[name] for name in FILM_FILTERS if name in filters)
+    if keyword_parts is not None and keyword_parts[1]:
+        conditions.insert(0, keyword_parts[1])
+    return conditions
+
+
+@lru_cache(maxsize=256)
+def compile_film_query(shape):
+    """
+    Erzeugt die SQL-Teile für eine Filterform.
+    Args:
+        shape (tuple): (columns, filters, actor_count, keyword_parts, grouped) — siehe build_film_query.
+    Returns:
+        dict: select_sql, from_sql, where_sql, order_by, group_by_sql, count_sql und headers.
+    """
+    columns, filters, actor_count, keyword_parts, grouped = shape
+    joins = {COLUMNS[name][2] for name in columns} - {None}
+    conditions = build_conditions(filters, joins, actor_count, keyword_parts)
+
+    base_sql = "FROM film f"
+    order_by = []
+    if keyword_parts is not None:
+        base_sql += keyword_parts[0]
+        order_by.extend(keyword_parts[2])
+    from_sql = base_sql + "".join(JOINS[name] for name in ("actor", "category") if name in joins)
+
+    # Sortierung: Relevanz (Schlüsselwort), sonst Schauspieler/in bzw. Titel
+    if keyword_parts is None:
+        if "actor" in joins and not grouped:
+            order_by.extend([("a.last_name", "ASC"), ("a.first_name", "ASC"), ("f.release_year", "DESC")])
+        else:
+            order_by.append(("f.title", "ASC"))
+    # actor_id, film_id und category_id machen die Sortierung eindeutig (Keyset-Pagination)
+    if "actor" in joins and not grouped:
+        order_by.append(("a.actor_id", "ASC"))
+    order_by.append(("f.film_id", "ASC"))
+    if "category" in joins and not grouped:
+        order_by.append(("c.category_id", "ASC"))
+
+    group_by_sql = count_sql = ""
+    if grouped:
+        # Sortierschlüssel außerhalb von film (z. B. ft.relevance) gehören mit in GROUP BY
+        group_by_sql = ", ".join(["f.film_id"] + [expr for expr, _ in order_by if not expr.startswith("f.")])
+        # Gezählt wird ohne die JOINs der Ausgabespalten: genau eine Zeile pro Film
+        count_conditions = build_conditions(filters, set(), actor_count, keyword_parts)
+        count_where = " AND ".join(f"({c})" for c in count_conditions)
+        count_sql = f"SELECT COUNT(*) {base_sql} " + (f"WHERE {count_where}" if count_where else "")
+
+    return {
+        "select_sql": ", ".join((COLUMNS[name][3] if grouped else None) or COLUMNS[name][0] for name in columns),
+        "from_sql": from_sql,
+        "where_sql": " AND ".join(f"({c})" for c in conditions),
+        "order_by": order_by,
+        "group_by_sql": group_by_sql,
+        "count_sql": count_sql or None,
+        "headers": [COLUMNS[name][1] for name in columns],
+    }
+
+
+def build_film_query(execute, filters, columns=DEFAULT_COLUMNS, group_films=False):
+    """
+    Erstellt die Suchabfrage für eine beliebige Kombination von Filtern.
+    Args:
+        execute (callable): Funktion (query, params) -> list[tuple], z. B. search.execute_query.
+        filters (dict): Filterwerte nach Namen aus FILTERS; Werte None werden ignoriert.
+        columns (tuple[str], optional): Ausgabespalten aus COLUMNS in Ausgabereihenfolge.
+        group_films (bool, optional): True — genau eine Zeile pro Film (Genres und Namen
+            zusammengefasst), False — eine Zeile pro Film×Genre (bzw. ×Schauspieler/in).
+    Returns:
+        tuple: (PagedQuery | None, list[str] Spaltenüberschriften). None, wenn kein Film
+        passen kann (z. B. kein Schauspieler/keine Schauspielerin mit diesem Namen).
+    Raises:
+        ValueError: Bei unbekannten Filtern oder Spalten.
+    """
+    filters = {name: value for name, value in filters.items() if value is not None}
+    unknown = set(filters) - set(FILTERS) or set(columns) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unbekannte Filter oder Spalten: {', '.join(sorted(unknown))}")
+
+    keyword_parts = None
+    join_params, where_params = [], []
+    if "keyword" in filters:
+        # Volltextsuche über film_text (LIKE nur bei zu kurzen Schlüsselwörtern)
+        keyword_search = build_keyword_search(filters["keyword"], execute)
+        keyword_parts = (keyword_search["join_sql"], keyword_search["where_sql"],
+                         tuple(keyword_search["order_by"]))
+        n_join = keyword_search["join_sql"].count("%s")
+        join_params.extend(keyword_search["params"][:n_join])
+        where_params.extend(keyword_search["params"][n_join:])
+
+    actor_ids = ()
+    if "actor" in filters:
+        # Name über den Trigramm-Index in actor_ids auflösen (auch Teilnamen und Tippfehler)
+        actor_ids = tuple(get_actor_index(execute).lookup(filters["actor"]))
+
+    shape = (tuple(columns), frozenset(filters), len(actor_ids), keyword_parts, bool(group_films))
+    compiled = compile_film_query(shape)
+    if "actor" in filters and not actor_ids:
+        return None, compiled["headers"]
+
+    if "genre" in filters:
+        where_params.append(filters["genre"])
+    where_params.extend(actor_ids)
+    where_params.extend(filters[name] for name in FILM_FILTERS if name in filters)
+
+    query = PagedQuery(
+        execute,
+        select_sql=compiled["select_sql"],
+        from_sql=compiled["from_sql"],
+        where_sql=compiled["where_sql"],
+        params=tuple(join_params + where_params),
+        order_by=compiled["order_by"],
+        count_sql=compiled["count_sql"],
+        group_by_sql=compiled["group_by_sql"],
+    )
+    return query, compiled["headers"]
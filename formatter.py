@@ -1,6 +1,10 @@
 # formatter.py — Funktionen zur Formatierung der Ausgabe (z. B. Tabellen)
 
-from tabulate import tabulate
+import threading
+
+from table_renderer import render_grid
+from pagination import PAGE_SIZE
+from instrumentation import timed
 
 def print_header():
     """
@@ -19,25 +23,81 @@ def show_table(lst_2D, columns):
         lst_2D (list[tuple]): Liste der Zeilen, jede Zeile ist ein Tupel von Werten.
         columns (list[str]): Spaltenüberschriften.
     """
-    print(tabulate(lst_2D, headers=columns, tablefmt="grid"))
+    print(render_table(lst_2D, columns))
+
+
+@timed("render")
+def render_table(lst_2D, columns):
+    """
+    Erstellt die Tabelle als Text im Format "grid".
+    Suchergebnisse werden mit table_renderer.render_grid erstellt (gleiche Ausgabe,
+    deutlich schneller), alle anderen Tabellen mit tabulate.
+    
+    Args:
+        lst_2D (list[tuple]): Liste der Zeilen, jede Zeile ist ein Tupel von Werten.
+        columns (list[str]): Spaltenüberschriften.
+    Returns:
+        str: Fertig formatierte Tabelle.
+    """
+    table = render_grid(lst_2D, columns)
+    if table is None:
+        from tabulate import tabulate   # nur bei Sonderfällen benötigt, verzögert den Start nicht
+        table = tabulate(lst_2D, headers=columns, tablefmt="grid")
+    return table
 
 
-def print_rows_paginated(lst_2D, columns):
+def render_page(lst_2D, columns, start, cancelled=None):
+    """
+    Lädt eine Seite und erstellt ihren vollständigen Ausgabetext (Überschrift und Tabelle).
+
+    Args:
+        lst_2D (List[Row] | PagedQuery): Ergebniszeilen.
+        columns (list of str): Spaltenüberschriften.
+        start (int): Index der ersten Zeile der Seite.
+        cancelled (threading.Event, optional): Ist es gesetzt, wird nach dem Laden nicht mehr gerendert.
+    Returns:
+        str | None: Ausgabetext der Seite; None, wenn abgebrochen wurde.
+    """
+    batch = lst_2D[start:start + PAGE_SIZE]
+    if cancelled is not None and cancelled.is_set():
+        return None
+    return f'\nFilme {start + 1} bis {start + len(batch)} von {len(lst_2D)}:\n' + render_table(batch, columns)
+
+
+def print_rows_paginated(lst_2D, columns, prefetch=True):
     """
     Gibt die Tabelle seitenweise aus (standardmäßig 10 Einträge pro Seite).
+    Bei einer PagedQuery wird jede Seite erst beim Anzeigen aus der Datenbank geladen.
+    Während auf die Eingabe gewartet wird, lädt und rendert ein Hintergrund-Thread
+    bereits die nächste Seite; bei 'q' wird diese Vorarbeit sofort abgebrochen.
     
     Args:
-        lst_2D (List[Row]): Jede Zeile wird als Tupel dargestellt.
+        lst_2D (List[Row] | PagedQuery): Jede Zeile wird als Tupel dargestellt.
         columns (list of str): Spaltenüberschriften.
+        prefetch (bool, optional): Nächste Seite im Hintergrund vorbereiten. Standard True.
     """
-    for i in range(0, len(lst_2D), 10):
-        batch = lst_2D[i:i + 10]
-        print(f'\nFilme {i + 1} bis {i + len(batch)} von {len(lst_2D)}:')
-        show_table(batch, columns)
+    # Erst hier importiert: concurrent.futures lädt logging und verlängert sonst den Programmstart
+    from concurrent.futures import ThreadPoolExecutor
+
+    total = len(lst_2D)
+    cancelled = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch") if prefetch else None
+    next_page = None
+    try:
+        for i in range(0, total, PAGE_SIZE):
+            text = next_page.result() if next_page is not None else render_page(lst_2D, columns, i)
+            print(text)
 
-        if i + 10 < len(lst_2D):
-            cmd = input("\nEnter — weiter, q — beenden: ").lower()
-            if cmd == 'q':
-                print("Ausgabe gestoppt.")
-                break
+            if i + PAGE_SIZE < total:
+                if executor is not None:
+                    next_page = executor.submit(render_page, lst_2D, columns, i + PAGE_SIZE, cancelled)
+                cmd = input("\nEnter — weiter, q — beenden: ").lower()
+                if cmd == 'q':
+                    print("Ausgabe gestoppt.")
+                    break
+    finally:
+        # Nicht auf eine laufende Vorarbeit warten; ihr Ergebnis wird verworfen
+        cancelled.set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
     print('\n______________________________________________________________________________________')
@@ -0,0 +1,206 @@
+# instrumentation.py — Zeitmessung der einzelnen Phasen einer Suche (Histogramme)
+#
+# Phasen: connect (Verbindung aus dem Pool), execute (SQL inkl. Übertragung), fetch
+# (Umwandlung der Zeilen), render (tabulate), log_write (Übergabe an die Log-Senke).
+# Ausgabe als Prometheus-Textformat oder JSON. Ist die Messung ausgeschaltet, kostet
+# jeder Messpunkt nur eine Abfrage eines globalen Flags.
+
+import atexit
+import bisect
+import json
+import threading
+import time
+from functools import wraps
+
+import config
+
+
+# Standardwerte (können in config.py über INSTRUMENTATION_CONFIG überschrieben werden)
+DEFAULT_INSTRUMENTATION_CONFIG = {
+    "enabled": False,
+    "dump_path": None,     # Datei, in die die Messwerte beim Beenden geschrieben werden
+    "format": "json",      # "json" oder "prometheus"
+}
+
+# Obergrenzen der Histogramm-Buckets
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROWS_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """
+    Histogramm mit festen Buckets (kumulativ ausgegeben wie bei Prometheus).
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)   # letzter Eintrag: +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        """
+        Liefert die kumulierten Bucket-Zähler, Summe und Anzahl.
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, running = [], 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            cumulative.append((bound, running))
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+
+class Metrics:
+    """
+    Sammlung aller Histogramme, gruppiert nach Metrikname und Label (z. B. Phase).
+    """
+
+    # Metrikname -> (Beschreibung, Bucket-Grenzen, Labelname)
+    DEFINITIONS = {
+        "search_phase_seconds": ("Dauer der Phasen einer Suche in Sekunden", DURATION_BUCKETS, "phase"),
+        "search_rows_fetched": ("Anzahl der gelesenen Zeilen pro SQL-Abfrage", ROWS_BUCKETS, "source"),
+        "search_bytes_fetched": ("Geschätzte Nutzdaten pro SQL-Abfrage in Bytes", BYTES_BUCKETS, "source"),
+    }
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, metric, label):
+        key = (metric, label)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.DEFINITIONS[metric][1]))
+        return histogram
+
+    def observe(self, metric, label, value):
+        self.histogram(metric, label).observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def to_dict(self):
+        """
+        Liefert alle Messwerte als JSON-fähiges dict.
+        """
+        result = {}
+        for (metric, label), histogram in sorted(self._histograms.items()):
+            snapshot = histogram.snapshot()
+            result.setdefault(metric, {})[label] = {
+                "count": snapshot["count"],
+                "sum": snapshot["sum"],
+                "buckets": {("+Inf" if bound == float("inf") else repr(bound)): count
+                            for bound, count in snapshot["buckets"]},
+            }
+        return result
+
+    def to_prometheus(self):
+        """
+        Liefert alle Messwerte im Prometheus-Textformat.
+        """
+        lines = []
+        by_metric = {}
+        for (metric, label), histogram in sorted(self._histograms.items()):
+            by_metric.setdefault(metric, []).append((label, histogram.snapshot()))
+        for metric, series in by_metric.items():
+            description, _, label_name = self.DEFINITIONS[metric]
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} histogram")
+            for label, snapshot in series:
+                for bound, count in snapshot["buckets"]:
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{label_name}="{label}",le="{le}"}} {count}')
+                lines.append(f'{metric}_sum{{{label_name}="{label}"}} {snapshot["sum"]}')
+                lines.append(f'{metric}_count{{{label_name}="{label}"}} {snapshot["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+_settings = {**DEFAULT_INSTRUMENTATION_CONFIG, **getattr(config, "INSTRUMENTATION_CONFIG", {})}
+metrics = Metrics()
+enabled = bool(_settings["enabled"])
+
+
+def enable():
+    """
+    Schaltet die Messung ein.
+    """
+    global enabled
+    enabled = True
+
+
+def disable():
+    """
+    Schaltet die Messung aus.
+    """
+    global enabled
+    enabled = False
+
+
+def estimate_bytes(rows):
+    """
+    Schätzt die übertragenen Nutzdaten einer Ergebnismenge (Textlänge aller Werte).
+    """
+    return sum(len(str(value)) for row in rows for value in row if value is not None)
+
+
+def record_query(connect_seconds, execute_seconds, fetch_seconds, rows):
+    """
+    Erfasst die Phasen einer SQL-Abfrage sowie Zeilenanzahl und geschätzte Bytes.
+    """
+    metrics.observe("search_phase_seconds", "connect", connect_seconds)
+    metrics.observe("search_phase_seconds", "execute", execute_seconds)
+    metrics.observe("search_phase_seconds", "fetch", fetch_seconds)
+    metrics.observe("search_rows_fetched", "execute_query", len(rows))
+    metrics.observe("search_bytes_fetched", "execute_query", estimate_bytes(rows))
+
+
+def timed(phase):
+    """
+    Decorator: misst die Dauer jedes Aufrufs als Phase phase (nur wenn die Messung aktiv ist).
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.observe("search_phase_seconds", phase, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def dump(path=None, fmt=None):
+    """
+    Schreibt die Messwerte in eine Datei oder liefert sie als Text.
+    Args:
+        path (str, optional): Zieldatei; ohne Angabe wird der Text zurückgegeben.
+        fmt (str, optional): "json" oder "prometheus". Standard aus INSTRUMENTATION_CONFIG.
+    Returns:
+        str: Messwerte im gewünschten Format.
+    """
+    fmt = fmt or _settings["format"]
+    text = metrics.to_prometheus() if fmt == "prometheus" else json.dumps(metrics.to_dict(), indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as target:
+            target.write(text)
+    return text
+
+
+if _settings["dump_path"]:
+    atexit.register(dump, _settings["dump_path"])
@@ -0,0 +1,117 @@
+# keyword_search.py — Stichwortsuche über den FULLTEXT-Index der Tabelle film_text
+
+import re
+
+# Standardwerte von MySQL, falls die Servervariablen nicht gelesen werden können
+DEFAULT_MIN_TOKEN_SIZE = {"InnoDB": 3, "MyISAM": 4}
+
+# Wörter (Buchstaben/Ziffern); alle anderen Zeichen sind im BOOLEAN MODE Operatoren
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Zwischengespeicherte Servereinstellungen: (min_token_size, stopwords)
+_fulltext_settings = None
+
+
+def get_fulltext_settings(execute):
+    """
+    Ermittelt einmalig die minimale Tokenlänge und die Stoppwörter des FULLTEXT-Index.
+    Args:
+        execute (callable): Funktion (query, params) -> list[tuple], z. B. search.execute_query.
+    Returns:
+        tuple: (min_token_size, frozenset der Stoppwörter)
+    """
+    global _fulltext_settings
+    if _fulltext_settings is not None:
+        return _fulltext_settings
+
+    # Die Speicher-Engine von film_text bestimmt, welche Servervariable gilt
+    rows = execute("""
+        SELECT ENGINE FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'film_text'
+    """)
+    engine = rows[0][0] if rows else "InnoDB"
+
+    if engine == "MyISAM":
+        rows = execute("SELECT @@ft_min_word_len")
+    else:
+        rows = execute("SELECT @@innodb_ft_min_token_size")
+    min_token_size = int(rows[0][0]) if rows and rows[0][0] else DEFAULT_MIN_TOKEN_SIZE.get(engine, 3)
+
+    # Stoppwörter werden nicht indiziert und müssen wie zu kurze Wörter behandelt werden
+    stopwords = frozenset()
+    if engine != "MyISAM":
+        try:
+            rows = execute("SELECT value FROM information_schema.INNODB_FT_DEFAULT_STOPWORD")
+            stopwords = frozenset(row[0].lower() for row in rows)
+        except Exception:
+            pass
+
+    _fulltext_settings = (min_token_size, stopwords)
+    return _fulltext_settings
+
+
+def split_keyword(keyword, min_token_size, stopwords=frozenset()):
+    """
+    Teilt ein Schlüsselwort in indizierbare und nicht indizierbare Wörter auf.
+    Returns:
+        tuple: (Liste der Wörter für MATCH ... AGAINST, Liste der zu kurzen Wörter/Stoppwörter)
+    """
+    indexed, short = [], []
+    for word in _WORD_RE.findall(keyword.lower()):
+        if len(word) < min_token_size or word in stopwords:
+            short.append(word)
+        else:
+            indexed.append(word)
+    return indexed, short
+
+
+def build_keyword_search(keyword, execute):
+    """
+    Erstellt die Teile der SQL-Abfrage für die Stichwortsuche in Titel und Beschreibung.
+
+    Enthält das Schlüsselwort indizierbare Wörter, wird über MATCH ... AGAINST auf film_text
+    gesucht und nach Relevanz sortiert. Jedes Wort muss dabei als Wortanfang vorkommen:
+    "drama" findet "Dramatic", "rama" findet "Drama" aber nicht mehr (die frühere
+    LIKE-Suche fand beliebige Teilstrings). Nur wenn kein Wort die minimale Tokenlänge
+    erreicht, wird wie früher per LIKE '%...%' gesucht. Enthält das Schlüsselwort neben
+    indizierbaren auch zu kurze Wörter oder Stoppwörter, muss zusätzlich das ganze
+    Schlüsselwort per LIKE '%...%' vorkommen (geprüft auf der bereits gefilterten Treffermenge).
+    Args:
+        keyword (str): Schlüsselwort des Benutzers.
+        execute (callable): Funktion (query, params) -> list[tuple].
+    Returns:
+        dict: join_sql, where_sql, params (in dieser Reihenfolge) und order_by.
+    """
+    min_token_size, stopwords = get_fulltext_settings(execute)
+    indexed, short = split_keyword(keyword, min_token_size, stopwords)
+    like_pattern = '%' + keyword + '%'
+
+    if not indexed:
+        return {
+            "join_sql": "",
+            "where_sql": "f.title LIKE %s OR f.description LIKE %s",
+            "params": (like_pattern, like_pattern),
+            "order_by": [("f.title", "ASC")],
+        }
+
+    # BOOLEAN MODE: +wort* — Wort muss vorkommen, Präfixsuche
+    against = " ".join(f"+{word}*" for word in indexed)
+
+    # Relevanz als Ganzzahl, damit die Keyset-Pagination exakt vergleichen kann
+    join_sql = """
+        JOIN (
+            SELECT film_id,
+                   CAST(MATCH(title, description) AGAINST (%s IN BOOLEAN MODE) * 1000000 AS UNSIGNED) AS relevance
+            FROM film_text
+            WHERE MATCH(title, description) AGAINST (%s IN BOOLEAN MODE)
+        ) ft ON ft.film_id = f.film_id
+    """
+    where_sql = "f.title LIKE %s OR f.description LIKE %s" if short else ""
+    params = (against, against) + ((like_pattern, like_pattern) if short else ())
+
+    return {
+        "join_sql": join_sql,
+        "where_sql": where_sql,
+        "params": params,
+        "order_by": [("ft.relevance", "DESC"), ("f.title", "ASC")],
+    }
@@ -0,0 +1,233 @@
+# load_replay.py — Lastgenerator: spielt das Suchprotokoll erneut gegen die Suchschicht ab
+#
+# Liest die Einträge des MongoDB-Suchprotokolls in zeitlicher Reihenfolge und führt jede
+# Suche über search.run_search erneut aus — so wie das Menü: Anzahl der Treffer plus erste
+# Ergebnisseite. Die Abstände zwischen den Suchen bleiben erhalten (1x), werden um den
+# Faktor N verkürzt (Nx) oder entfallen (max). N virtuelle Benutzer (Threads) arbeiten die
+# Suchen gleichzeitig ab. Am Ende werden Durchsatz, Latenzen (p50/p95/p99) je Suchtyp und
+# die Verspätung gegenüber dem Zeitplan ausgegeben.
+#
+# Aufruf:
+#   python load_replay.py --users 8 --speed 10
+#   python load_replay.py --users 16 --speed max --limit 5000 --no-cache
+#   python load_replay.py --standin sakila.sqlite --standin-log 2000 --speed 20
+#       (lokale Ersatzdatenbanken: SQLite statt MySQL, mongomock statt MongoDB)
+#   python load_replay.py --standin sakila.sqlite --standin-replicas r1.sqlite r2.sqlite --standin-log 2000
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+from batch_search import init_worker, latency_summary, resolve_params
+
+
+def parse_speed(value):
+    """
+    Wandelt die Wiedergabegeschwindigkeit um: "1", "10x" oder "max".
+    Returns:
+        float | None: Faktor; None bedeutet ohne Wartezeiten.
+    """
+    value = value.strip().lower()
+    if value in ("max", "0"):
+        return None
+    speed = float(value[:-1] if value.endswith("x") else value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("Die Geschwindigkeit muss größer als 0 sein")
+    return speed
+
+
+def read_log(collection, since=None, limit=None):
+    """
+    Liest die protokollierten Suchen in aufsteigender Zeitfolge.
+    Args:
+        collection: Log-Collection (MongoDB oder mongomock).
+        since (datetime, optional): Nur Suchen ab diesem Zeitpunkt.
+        limit (int, optional): Höchstens so viele Suchen.
+    Returns:
+        Iterator[dict]: Einträge mit timestamp, search_type und params.
+    """
+    cursor = collection.find({"timestamp": {"$gte": since}} if since else {},
+                             {"_id": 0, "timestamp": 1, "search_type": 1, "params": 1})
+    cursor = cursor.sort("timestamp", 1)
+    if limit:
+        cursor = cursor.limit(limit)
+    return iter(cursor)
+
+
+def replay_search(search_type, params):
+    """
+    Führt eine protokollierte Suche wie das Menü aus: Trefferanzahl und erste Seite.
+    Returns:
+        int: Anzahl der Treffer.
+    """
+    from search import run_search
+
+    # run_search lädt wie das Menü COUNT und erste Seite (PagedQuery.load_first_page)
+    rows, _ = run_search(search_type, resolve_params(params or {}), paged=True)
+    return len(rows)
+
+
+def schedule(entries, speed, max_gap=None):
+    """
+    Berechnet für jede Suche den geplanten Startzeitpunkt relativ zum Beginn der Wiedergabe.
+    Args:
+        entries (iterable[dict]): Log-Einträge in Zeitfolge.
+        speed (float | None): Faktor der Wiedergabe; None ohne Wartezeiten.
+        max_gap (float, optional): Längere Pausen im Protokoll (z. B. nachts) werden auf
+            so viele Sekunden gekürzt, bevor der Faktor angewendet wird.
+    Returns:
+        Iterator[tuple]: (Sekunden ab Beginn | None, Eintrag).
+    """
+    offset, previous = 0.0, None
+    for entry in entries:
+        if speed is None:
+            yield None, entry
+            continue
+        timestamp = entry.get("timestamp")
+        if previous is not None and timestamp is not None:
+            gap = max(0.0, (timestamp - previous).total_seconds())
+            offset += (gap if max_gap is None else min(gap, max_gap)) / speed
+        if timestamp is not None:
+            previous = timestamp
+        yield offset, entry
+
+
+def run_replay(entries, users=4, speed=1.0, max_gap=None):
+    """
+    Spielt die Suchen mit users virtuellen Benutzern ab.
+    Ein Dispatcher legt jede Suche zu ihrem geplanten Zeitpunkt in eine Warteschlange
+    (höchstens 4 × users wartende Suchen); der nächste freie Benutzer führt sie aus.
+    Kommen die Benutzer nicht hinterher, wächst die Verspätung (lag).
+    Args:
+        entries (iterable[dict]): Log-Einträge in Zeitfolge (siehe read_log).
+        users (int, optional): Anzahl der virtuellen Benutzer.
+        speed (float | None, optional): Faktor der Wiedergabe; None ohne Wartezeiten.
+        max_gap (float, optional): Siehe schedule.
+    Returns:
+        dict: Zusammenfassung (Anzahl, Fehler, Dauer, Durchsatz, Latenzen gesamt und je
+        Suchtyp, Verspätung gegenüber dem Zeitplan).
+    """
+    pending = queue.Queue(maxsize=users * 4)
+    lock = threading.Lock()
+    latencies, by_type, lags, errors = [], {}, [], {}
+    started = time.perf_counter()
+
+    def virtual_user():
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            due, entry = item
+            search_type = entry.get("search_type")
+            begin = time.perf_counter()
+            try:
+                replay_search(search_type, entry.get("params"))
+                error = None
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            latency_ms = round((time.perf_counter() - begin) * 1000, 3)
+            with lock:
+                if due is not None:
+                    lags.append(round(max(0.0, begin - started - due) * 1000, 3))
+                if error is not None:
+                    errors[error] = errors.get(error, 0) + 1
+                    continue
+                latencies.append(latency_ms)
+                by_type.setdefault(search_type, []).append(latency_ms)
+
+    threads = [threading.Thread(target=virtual_user, name=f"replay-user-{i}", daemon=True)
+               for i in range(users)]
+    for thread in threads:
+        thread.start()
+    try:
+        for due, entry in schedule(entries, speed, max_gap):
+            if due is not None:
+                delay = started + due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            pending.put((due, entry))
+    finally:
+        for _ in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = len(latencies) + sum(errors.values())
+    return {
+        "queries": total,
+        "errors": sum(errors.values()),
+        "error_messages": dict(sorted(errors.items(), key=lambda item: -item[1])[:5]),
+        "users": users,
+        "speed": "max" if speed is None else speed,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_qps": round(total / elapsed, 1) if elapsed else None,
+        "latency": latency_summary(latencies),
+        "latency_by_type": {search_type: latency_summary(values) for search_type, values in sorted(by_type.items())},
+        "lag": latency_summary(lags) if speed is not None else None,
+    }
+
+
+def setup_log_standin(entries):
+    """
+    Ersetzt MongoDB durch mongomock mit entries synthetischen Log-Einträgen (wie benchmark.py).
+    Returns:
+        Collection: Log-Collection der Ersatzdatenbank.
+    """
+    import mongomock
+    from benchmark import seed_search_log
+    from log_writer import get_log_collection, set_mongo_client
+
+    set_mongo_client(mongomock.MongoClient())
+    collection = get_log_collection()
+    seed_search_log(collection, entries)
+    return collection
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suchprotokoll als Last erneut abspielen")
+    parser.add_argument("--users", type=int, default=4, help="Anzahl virtueller Benutzer")
+    parser.add_argument("--speed", type=parse_speed, default=1.0,
+                        help="Wiedergabegeschwindigkeit: 1 (Echtzeit), z. B. 10x, oder max")
+    parser.add_argument("--max-gap", type=float,
+                        help="Pausen im Protokoll auf höchstens so viele Sekunden kürzen")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Nur Suchen ab diesem Zeitpunkt (ISO-Format)")
+    parser.add_argument("--limit", type=int, help="Höchstens so viele Suchen abspielen")
+    parser.add_argument("--no-cache", action="store_true", help="Ergebnis-Cache abschalten (jede Suche an die Datenbank)")
+    parser.add_argument("--standin", help="SQLite-Ersatzdatenbank (sakila_standin.py) statt MySQL")
+    parser.add_argument("--standin-replicas", nargs="+", default=(), metavar="PATH",
+                        help="Weitere Ersatzdatenbanken als Lese-Replikate (Kopien von --standin)")
+    parser.add_argument("--films", type=int, default=1000,
+                        help="Anzahl Filme, falls die Ersatzdatenbank neu angelegt wird")
+    parser.add_argument("--standin-log", type=int, metavar="ENTRIES",
+                        help="mongomock mit so vielen synthetischen Log-Einträgen statt MongoDB")
+    args = parser.parse_args(argv)
+
+    if args.standin:
+        from sakila_standin import create_standin_database
+        if not os.path.exists(args.standin):
+            create_standin_database(args.standin, args.films)
+    # Jede Suche lädt Anzahl und erste Seite gleichzeitig (zwei Verbindungen)
+    init_worker(args.users * 2, args.standin, args.standin_replicas)
+    if args.no_cache:
+        from result_cache import ResultCache, set_result_cache
+        set_result_cache(ResultCache(max_entries=0))
+
+    if args.standin_log:
+        collection = setup_log_standin(args.standin_log)
+    else:
+        from log_writer import get_log_collection
+        collection = get_log_collection()
+
+    summary = run_replay(read_log(collection, args.since, args.limit), args.users, args.speed, args.max_gap)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,10 @@
 # log_reader.py
 
-from config import MONGO_CONFIG
-from pymongo import MongoClient
-from collections import Counter
+from pymongo import ASCENDING, DESCENDING
 from datetime import datetime
 from tabulate import tabulate
+from log_writer import get_log_collection, get_rollup_collection
+from log_rollup import bootstrap_rollups, read_popular_queries
 
 
 # Wörterbuch für Suchtypen
@@ -16,24 +16,120 @@ SEARCH_TYPE_LABELS = {
     "actor": "Suche nach Schauspieler/in",
 }
 
-def show_popular_queries(limit=5):
+# Wird gesetzt, sobald die Indizes der Log-Collection angelegt wurden
+_indexes_ready = False
+
+def ensure_indexes(collection):
+    """
+    Legt einmalig die Indizes auf search_type und timestamp an (idempotent).
+    """
+    global _indexes_ready
+    if not _indexes_ready:
+        collection.create_index([("search_type", ASCENDING)])
+        collection.create_index([("timestamp", DESCENDING)])
+        _indexes_ready = True
+
+
+def popular_queries_pipeline(limit=5):
+    """
+    Aggregations-Pipeline für die häufigsten Suchtypen und die vorkommenden Parameter.
+    Beide Teilergebnisse sind klein (ein Dokument je Suchtyp bzw. je Suchtyp und Parameter).
+    Args:
+        limit (int): Anzahl der Suchtypen.
+    Returns:
+        list[dict]: Pipeline für collection.aggregate.
+    """
+    return [
+        {"$match": {"search_type": {"$nin": [None, ""]}}},
+        {"$facet": {
+            # Häufigste Suchtypen
+            # ($group + $sort entspricht $sortByCount und läuft auch auf mongomock)
+            "types": [
+                {"$group": {"_id": "$search_type", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": limit},
+            ],
+            # Parameter je Suchtyp; pos erhält die Reihenfolge der Parameter
+            "keys": [
+                {"$match": {"params": {"$type": "object"}}},
+                {"$project": {"search_type": 1, "kv": {"$objectToArray": "$params"}}},
+                {"$unwind": {"path": "$kv", "includeArrayIndex": "pos"}},
+                {"$group": {"_id": {"type": "$search_type", "key": "$kv.k"}, "pos": {"$min": "$pos"}}},
+                {"$sort": {"pos": 1}},
+            ],
+        }},
+    ]
+
+
+def top_values_pipeline(keys, top_values=3):
+    """
+    Aggregations-Pipeline für die häufigsten Werte je (Suchtyp, Parameter).
+    Jeder Zweig von $facet sortiert und begrenzt selbst ($sort + $limit), sodass nie mehr
+    als top_values Werte je Parameter gesammelt werden — auch bei sehr vielen
+    verschiedenen Werten (z. B. Schlüsselwörtern).
+    Args:
+        keys (list[tuple[str, str]]): (Suchtyp, Parameter) in Ausgabereihenfolge.
+        top_values (int): Anzahl der häufigsten Werte pro Parameter.
+    Returns:
+        list[dict]: Pipeline für collection.aggregate; Zweig f"p{i}" gehört zu keys[i].
+    """
+    return [
+        {"$match": {"search_type": {"$in": sorted({search_type for search_type, _ in keys})}}},
+        {"$facet": {
+            f"p{i}": [
+                {"$match": {"search_type": search_type, f"params.{key}": {"$exists": True}}},
+                {"$group": {"_id": f"$params.{key}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": top_values},
+            ]
+            for i, (search_type, key) in enumerate(keys)
+        }},
+    ]
+
+
+def aggregate_popular_queries(collection, limit=5, top_values=3):
+    """
+    Berechnet die Statistik der häufigsten Suchanfragen per Aggregation aus dem Roh-Log.
+    Returns:
+        tuple: (Liste (search_type, count), dict search_type -> Liste (key, [(value, count), ...]))
+    """
+    ensure_indexes(collection)
+    result = next(collection.aggregate(popular_queries_pipeline(limit), allowDiskUse=True), {})
+    top = [(row["_id"], row["count"]) for row in result.get("types", [])]
+
+    # Nur die Parameter der angezeigten Suchtypen (Reihenfolge wie in den Log-Einträgen)
+    top_types = {search_type for search_type, _ in top}
+    keys = [(row["_id"]["type"], row["_id"]["key"]) for row in result.get("keys", [])
+            if row["_id"]["type"] in top_types]
+    params_by_type = {}
+    if keys:
+        values = next(collection.aggregate(top_values_pipeline(keys, top_values), allowDiskUse=True), {})
+        for i, (search_type, key) in enumerate(keys):
+            params_by_type.setdefault(search_type, []).append(
+                (key, [(row["_id"], row["count"]) for row in values.get(f"p{i}", [])]))
+    return top, params_by_type
+
+
+def show_popular_queries(limit=5, use_rollups=True):
     """
     Zeigt die Statistik der häufigsten Suchanfragen in Tabellenform an.
+    Die Zahlen stammen aus den vorberechneten Rollups (log_rollup). Solange diese noch
+    nicht aus dem gesamten Roh-Log aufgebaut wurden, wird per Aggregation aus dem Roh-Log
+    gezählt und der Neuaufbau im Hintergrund gestartet.
     
     Args:
         limit (int, optional): Anzahl der beliebtesten Suchtypen, die angezeigt werden sollen. Standardmäßig 5.
+        use_rollups (bool, optional): Rollups verwenden, falls vollständig. Standardmäßig True.
     Returns:
         None: Die Funktion druckt die Tabelle auf den Bildschirm.
         Für jeden Suchtyp wird dessen Bezeichnung, die Gesamtanzahl
         und die Top-3 Werte der Suchparameter (falls vorhanden) angezeigt.
     """
-    mongo_client = MongoClient(MONGO_CONFIG['uri'])
-    collection = mongo_client[MONGO_CONFIG['database']][MONGO_CONFIG['collection']]
-
-    docs = list(collection.find())
-    queries = [doc.get("search_type") for doc in docs if doc.get("search_type")]
-    counter = Counter(queries)
-    top = counter.most_common(limit)
+    log_collection, rollup_collection = get_log_collection(), get_rollup_collection()
+    if use_rollups and bootstrap_rollups(log_collection, rollup_collection):
+        top, params_by_type = read_popular_queries(rollup_collection, limit)
+    else:
+        top, params_by_type = aggregate_popular_queries(log_collection, limit)
 
     if not top:
         print("\nEs gibt bisher keine Suchanfragen.")
@@ -43,21 +139,11 @@ def show_popular_queries(limit=5):
     for i, (query_type, count) in enumerate(top, 1):
         label = SEARCH_TYPE_LABELS.get(query_type, query_type)  # ersetzt den Namen aus dem Wörterbuch
 
-        # Extrahieren der Parameter für diesen Suchtyp
-        params_list = [
-            doc.get("params", {})
-            for doc in docs
-            if doc.get("search_type") == query_type and isinstance(doc.get("params"), dict)
-        ]
-
         # Ermittlung der Top-Werte für jeden Parameter
         params_str = []
-        for key in params_list[0].keys() if params_list else []:
-            values = [p.get(key) for p in params_list if key in p]
-            if values:
-                sub_counter = Counter(values).most_common(3)
-                sub_label = ", ".join(f"{val} ({cnt})" for val, cnt in sub_counter)
-                params_str.append(f"{key}: {sub_label}")
+        for key, values in params_by_type.get(query_type, []):
+            sub_label = ", ".join(f"{val} ({cnt})" for val, cnt in values)
+            params_str.append(f"{key}: {sub_label}")
                
         table.append([i, label, count, "\n".join(params_str)])
 
@@ -66,37 +152,93 @@ def show_popular_queries(limit=5):
     print(tabulate(table, headers=["Nr.", "Suchtyp", "Anzahl", "Top-Parameter"], tablefmt="grid"))
 
 
-def show_last_unique_queries(limit=5):
+def find_last_unique_queries(collection, limit=5, batch_size=100):
+    """
+    Liefert die letzten eindeutigen Suchanfragen über einen begrenzten Scan.
+    Der Cursor läuft über den timestamp-Index, lädt nur die benötigten Felder stapelweise
+    und wird beendet, sobald limit eindeutige (search_type, params)-Kombinationen gefunden sind.
+    Args:
+        collection: Log-Collection in MongoDB.
+        limit (int, optional): Anzahl der eindeutigen Anfragen. Standardmäßig 5.
+        batch_size (int, optional): Dokumente pro Übertragung vom Server.
+    Returns:
+        list[tuple]: (search_type, params, timestamp) in absteigender Zeitfolge.
+    """
+    cursor = (collection.find({}, {"_id": 0, "search_type": 1, "params": 1, "timestamp": 1})
+              .sort("timestamp", DESCENDING)
+              .batch_size(batch_size))
+
+    # Nur eindeutige Kombinationen von search_type+params in Reihenfolge ihres Auftretens auswählen
+    seen = set()
+    unique_queries = []
+    try:
+        for doc in cursor:
+            search_type = doc.get("search_type")
+            params = doc.get("params", {})
+            ts = doc.get("timestamp")
+
+            if not isinstance(params, dict):  # falls versehentlich ein String, überspringen
+                params = {}
+            key = (search_type, tuple(sorted(params.items())))
+            if key not in seen:
+                seen.add(key)
+                unique_queries.append((search_type, params, ts))
+            if len(unique_queries) >= limit:
+                break
+    finally:
+        cursor.close()
+    return unique_queries
+
+
+def find_last_unique_queries_aggregated(collection, limit=5):
+    """
+    Variante von find_last_unique_queries mit serverseitiger Gruppierung: übertragen werden
+    nur limit Zeilen, der Server liest aber das gesamte Log ($group nutzt keinen Index,
+    der Aufwand wächst mit der Größe des Logs). Lohnt sich nur, wenn die neuesten Einträge
+    so viele Wiederholungen enthalten, dass der begrenzte Scan einen großen Teil des Logs
+    übertragen müsste (siehe python benchmark.py last-unique).
+    Hinweis: params-Dokumente gelten nur bei gleicher Feldreihenfolge als gleich
+    (log_search_query schreibt die Parameter je Suchtyp immer in derselben Reihenfolge).
+    Args:
+        collection: Log-Collection in MongoDB.
+        limit (int, optional): Anzahl der eindeutigen Anfragen. Standardmäßig 5.
+    Returns:
+        list[tuple]: (search_type, params, timestamp) in absteigender Zeitfolge.
+    """
+    pipeline = [
+        {"$group": {
+            "_id": {"search_type": "$search_type", "params": "$params"},
+            "timestamp": {"$max": "$timestamp"},
+        }},
+        {"$sort": {"timestamp": -1}},
+        {"$limit": limit},
+    ]
+    unique_queries = []
+    for row in collection.aggregate(pipeline, allowDiskUse=True):
+        params = row["_id"].get("params")
+        unique_queries.append((row["_id"].get("search_type"),
+                               params if isinstance(params, dict) else {},
+                               row.get("timestamp")))
+    return unique_queries
+
+
+def show_last_unique_queries(limit=5, aggregated=False):
     """
     Zeigt die letzten eindeutigen Suchanfragen aus dem Log an.
     
     Args:
         limit (int, optional): Anzahl der eindeutigen Anfragen, die angezeigt werden sollen. Standardmäßig 5.
+        aggregated (bool, optional): Serverseitige Aggregation statt begrenztem Scan. Standardmäßig False.
     Returns:
         None: Die Funktion druckt die Tabelle auf den Bildschirm.
     """
-    mongo_client = MongoClient(MONGO_CONFIG['uri'])
-    collection = mongo_client[MONGO_CONFIG['database']][MONGO_CONFIG['collection']]
-
-    # Abruf der letzten Einträge nach Zeitstempel (standardmäßig 5)
-    docs = list(collection.find().sort("timestamp", -1))
+    collection = get_log_collection()
+    ensure_indexes(collection)
 
-    # Nur eindeutige Kombinationen von search_type+params in Reihenfolge ihres Auftretens auswählen
-    seen = set()
-    unique_queries = []
-    for doc in docs:
-        search_type = doc.get("search_type")
-        params = doc.get("params", {})
-        ts = doc.get("timestamp")
-        
-        if isinstance(params, str):  # falls versehentlich ein String, überspringen
-            params = {}
-        key = (search_type, tuple(sorted(params.items())))
-        if key not in seen:
-            seen.add(key)
-            unique_queries.append((search_type, params, ts))
-        if len(unique_queries) >= limit:
-            break
+    if aggregated:
+        unique_queries = find_last_unique_queries_aggregated(collection, limit)
+    else:
+        unique_queries = find_last_unique_queries(collection, limit)
 
     if not unique_queries:
         print("\nEs gibt bisher keine eindeutigen Suchanfragen.")
@@ -0,0 +1,288 @@
+# log_rollup.py — Vorberechnete Zähler (Rollups) für die Suchstatistik
+#
+# Die Log-Senke erhöht die Zähler für jeden geschriebenen Eintrag. Ältere Einträge (z. B.
+# aus der Zeit vor der Einführung der Rollups) zählt nur der Neuaufbau; bis er einmal
+# gelaufen ist, liest die Statistik aus dem Roh-Log und startet ihn im Hintergrund
+# (bootstrap_rollups). Während des Neuaufbaus schreibt die Log-Senke dieses Prozesses in
+# den lokalen Spool (log_write_gate) und lädt ihn danach hoch. Manueller Neuaufbau aus dem
+# Roh-Log (solange kein anderer Prozess protokolliert, z. B. direkt nach dem Update):
+#   python log_rollup.py rebuild
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, InsertOne, UpdateOne
+
+# Felder, die einen Rollup-Zähler eindeutig bestimmen
+ROLLUP_KEY_FIELDS = ("kind", "search_type", "key", "value", "bucket")
+
+# Markierung: die Rollups wurden aus dem gesamten Roh-Log aufgebaut (siehe rollups_complete)
+COMPLETE_MARKER = ("meta", None, "complete", None, None)
+
+
+def rollup_keys(entry):
+    """
+    Liefert alle Rollup-Schlüssel, deren Zähler ein Log-Eintrag erhöht.
+    Arten: "type" (Suchtyp), "param" (Parameterwert je Suchtyp), "hour" und "day" (Zeitfenster).
+    Args:
+        entry (dict): Log-Eintrag wie von log_search_query geschrieben.
+    Returns:
+        list[tuple]: Schlüssel (kind, search_type, key, value, bucket, pos).
+    """
+    search_type = entry.get("search_type")
+    if not search_type:
+        return []
+    keys = [("type", search_type, None, None, None, None)]
+
+    params = entry.get("params")
+    if isinstance(params, dict):
+        # pos erhält die Reihenfolge der Parameter für die Ausgabe
+        for pos, (key, value) in enumerate(params.items()):
+            keys.append(("param", search_type, key, value, None, pos))
+
+    timestamp = entry.get("timestamp")
+    if timestamp is not None:
+        hour = timestamp.replace(minute=0, second=0, microsecond=0)
+        keys.append(("hour", search_type, None, None, hour, None))
+        keys.append(("day", search_type, None, None, hour.replace(hour=0), None))
+    return keys
+
+
+def rollup_document(key, count):
+    """
+    Wandelt einen Rollup-Schlüssel mit Zähler in ein Dokument der Rollup-Collection um.
+    """
+    document = dict(zip(ROLLUP_KEY_FIELDS, key[:5]))
+    document["count"] = count
+    if key[5] is not None:
+        document["pos"] = key[5]
+    return document
+
+
+def ensure_rollup_indexes(rollup_collection):
+    """
+    Legt den eindeutigen Schlüsselindex und den Index für Top-Abfragen an (idempotent).
+    """
+    rollup_collection.create_index([(field, ASCENDING) for field in ROLLUP_KEY_FIELDS], unique=True)
+    rollup_collection.create_index([("kind", ASCENDING), ("search_type", ASCENDING), ("count", DESCENDING)])
+
+
+def update_rollups(rollup_collection, entries):
+    """
+    Erhöht die Rollup-Zähler für neu geschriebene Log-Einträge (ein Upsert pro Schlüssel).
+    Args:
+        rollup_collection: Rollup-Collection in MongoDB.
+        entries (list[dict]): Erfolgreich ins Log geschriebene Einträge.
+    """
+    counts = Counter()
+    positions = {}
+    for entry in entries:
+        for key in rollup_keys(entry):
+            counts[key[:5]] += 1
+            positions[key[:5]] = key[5]
+    if not counts:
+        return
+
+    operations = []
+    for key, count in counts.items():
+        update = {"$inc": {"count": count}}
+        if positions[key] is not None:
+            update["$setOnInsert"] = {"pos": positions[key]}
+        operations.append(UpdateOne(dict(zip(ROLLUP_KEY_FIELDS, key)), update, upsert=True))
+    rollup_collection.bulk_write(operations, ordered=False)
+
+
+def read_popular_queries(rollup_collection, limit=5, top_values=3):
+    """
+    Liest die häufigsten Suchtypen und ihre häufigsten Parameterwerte aus den Rollups.
+    Args:
+        rollup_collection: Rollup-Collection in MongoDB.
+        limit (int, optional): Anzahl der Suchtypen.
+        top_values (int, optional): Anzahl der Werte pro Parameter.
+    Returns:
+        tuple: (Liste (search_type, count), dict search_type -> Liste (key, [(value, count), ...]))
+    """
+    top = [(doc["search_type"], doc["count"])
+           for doc in rollup_collection.find({"kind": "type"}, {"_id": 0, "search_type": 1, "count": 1})
+           .sort("count", DESCENDING).limit(limit)]
+
+    params_by_type = {}
+    for search_type, _ in top:
+        # Parameter des Suchtyps (ein Dokument je Parameter), danach je Parameter nur die
+        # top_values häufigsten Werte über den Index (kind, search_type, count)
+        keys = rollup_collection.aggregate([
+            {"$match": {"kind": "param", "search_type": search_type}},
+            {"$group": {"_id": "$key", "pos": {"$min": "$pos"}}},
+            {"$sort": {"pos": 1}},
+        ])
+        params_by_type[search_type] = [
+            (row["_id"], [(doc["value"], doc["count"]) for doc in
+                          rollup_collection.find({"kind": "param", "search_type": search_type, "key": row["_id"]},
+                                                 {"_id": 0, "value": 1, "count": 1})
+                          .sort([("count", DESCENDING), ("value", ASCENDING)]).limit(top_values)])
+            for row in keys
+        ]
+    return top, params_by_type
+
+
+def mark_rollups_complete(rollup_collection, rebuilt_at=None):
+    """
+    Vermerkt in der Rollup-Collection, dass die Zähler das gesamte Roh-Log abdecken.
+    Args:
+        rollup_collection: Rollup-Collection.
+        rebuilt_at (datetime, optional): Zeitpunkt des Neuaufbaus. Standard jetzt.
+    """
+    rollup_collection.replace_one(dict(zip(ROLLUP_KEY_FIELDS, COMPLETE_MARKER)),
+                                  {**dict(zip(ROLLUP_KEY_FIELDS, COMPLETE_MARKER)),
+                                   "rebuilt_at": rebuilt_at or datetime.now()},
+                                  upsert=True)
+
+
+def rollups_complete(rollup_collection):
+    """
+    True, wenn die Rollups aus dem gesamten Roh-Log aufgebaut wurden (siehe rebuild_rollups).
+    Fehlt die Markierung (z. B. direkt nach einem Update auf einem bestehenden Log), decken
+    die Zähler nur die seither geschriebenen Einträge ab.
+    """
+    return rollup_collection.find_one(dict(zip(ROLLUP_KEY_FIELDS, COMPLETE_MARKER))) is not None
+
+
+_rebuilding = False
+_rebuild_lock = threading.Lock()
+
+
+@contextmanager
+def log_write_gate():
+    """
+    Umschließt einen Schreibvorgang ins Roh-Log samt Rollup-Update (write_gate der Log-Senke).
+    Liefert False, solange rebuild_rollups in diesem Prozess läuft: die Einträge gehören dann
+    in den Spool, sonst landeten ihre Zähler in der Collection, die gleich ersetzt wird.
+    Ein Neuaufbau beginnt erst, wenn ein laufender Schreibvorgang abgeschlossen ist.
+    """
+    with _rebuild_lock:
+        yield not _rebuilding
+
+
+def _bucket(parts, unit):
+    """
+    Baut den Zeitstempel eines Zeitfensters aus den Teilen der Aggregation ($year, $month, ...).
+    """
+    return datetime(parts["y"], parts["m"], parts["d"], parts["h"] if unit == "hour" else 0)
+
+
+def rebuild_rollups(log_collection, rollup_collection, batch_size=1000):
+    """
+    Baut alle Rollups aus dem Roh-Log neu auf.
+    Die Zähler werden serverseitig gruppiert, in eine temporäre Collection geschrieben und
+    anschließend per rename gegen die bestehende Rollup-Collection ausgetauscht; die
+    Markierung rollups_complete wird mitgeschrieben. Solange der Neuaufbau läuft, schreibt
+    die Log-Senke dieses Prozesses nicht ins Roh-Log (log_write_gate), sondern in den Spool;
+    dessen Einträge zählt update_rollups nach dem Austausch in der neuen Collection.
+    Args:
+        log_collection: Collection mit dem Roh-Log.
+        rollup_collection: Rollup-Collection, die ersetzt wird.
+        batch_size (int, optional): Dokumente pro insert_many.
+    Returns:
+        int: Anzahl der geschriebenen Rollup-Dokumente.
+    """
+    global _rebuilding
+    with _rebuild_lock:
+        _rebuilding = True
+    try:
+        return _rebuild_rollups(log_collection, rollup_collection, batch_size)
+    finally:
+        with _rebuild_lock:
+            _rebuilding = False
+
+
+def _rebuild_rollups(log_collection, rollup_collection, batch_size):
+    started = datetime.now()
+    valid_type = {"$match": {"search_type": {"$nin": [None, ""]}}}
+    # Zeitfenster über $year/$month/... statt $dateTrunc (erst ab MongoDB 5.0, nicht in mongomock)
+    hour = {"y": {"$year": "$timestamp"}, "m": {"$month": "$timestamp"},
+            "d": {"$dayOfMonth": "$timestamp"}, "h": {"$hour": "$timestamp"}}
+    day = {"y": {"$year": "$timestamp"}, "m": {"$month": "$timestamp"}, "d": {"$dayOfMonth": "$timestamp"}}
+    pipelines = {
+        "type": [valid_type, {"$group": {"_id": {"search_type": "$search_type"}, "count": {"$sum": 1}}}],
+        "param": [
+            valid_type,
+            {"$match": {"params": {"$type": "object"}}},
+            {"$project": {"search_type": 1, "kv": {"$objectToArray": "$params"}}},
+            {"$unwind": {"path": "$kv", "includeArrayIndex": "pos"}},
+            {"$group": {"_id": {"search_type": "$search_type", "key": "$kv.k", "value": "$kv.v"},
+                        "count": {"$sum": 1}, "pos": {"$min": "$pos"}}},
+        ],
+        "hour": [valid_type, {"$match": {"timestamp": {"$type": "date"}}},
+                 {"$group": {"_id": {"search_type": "$search_type", "bucket": hour}, "count": {"$sum": 1}}}],
+        "day": [valid_type, {"$match": {"timestamp": {"$type": "date"}}},
+                {"$group": {"_id": {"search_type": "$search_type", "bucket": day}, "count": {"$sum": 1}}}],
+    }
+
+    target = rollup_collection.database[rollup_collection.name + "_rebuild"]
+    target.drop()
+    written = 0
+    for kind, pipeline in pipelines.items():
+        batch = []
+        for row in log_collection.aggregate(pipeline, allowDiskUse=True):
+            group = row["_id"]
+            bucket = _bucket(group["bucket"], kind) if "bucket" in group else None
+            key = (kind, group["search_type"], group.get("key"), group.get("value"), bucket, row.get("pos"))
+            batch.append(InsertOne(rollup_document(key, row["count"])))
+            if len(batch) >= batch_size:
+                target.bulk_write(batch, ordered=False)
+                written += len(batch)
+                batch = []
+        if batch:
+            target.bulk_write(batch, ordered=False)
+            written += len(batch)
+
+    ensure_rollup_indexes(target)
+    mark_rollups_complete(target, started)
+    target.rename(rollup_collection.name, dropTarget=True)
+    ensure_rollup_indexes(rollup_collection)
+    return written
+
+
+_bootstrap_started = False
+_bootstrap_lock = threading.Lock()
+
+
+def bootstrap_rollups(log_collection, rollup_collection):
+    """
+    Startet einmalig pro Prozess den Neuaufbau im Hintergrund, falls die Rollups noch nicht
+    das gesamte Roh-Log abdecken (z. B. beim ersten Start nach einem Update).
+    Returns:
+        bool: True, wenn die Rollups bereits vollständig sind.
+    """
+    global _bootstrap_started
+    if rollups_complete(rollup_collection):
+        return True
+    with _bootstrap_lock:
+        if _bootstrap_started:
+            return False
+        _bootstrap_started = True
+
+    def run():
+        global _bootstrap_started
+        try:
+            rebuild_rollups(log_collection, rollup_collection)
+        except Exception:
+            # z. B. MongoDB nicht erreichbar: beim nächsten Aufruf erneut versuchen
+            with _bootstrap_lock:
+                _bootstrap_started = False
+
+    threading.Thread(target=run, name="rollup-bootstrap", daemon=True).start()
+    return False
+
+
+if __name__ == "__main__":
+    import sys
+    from log_writer import get_log_collection, get_rollup_collection
+
+    if sys.argv[1:] != ["rebuild"]:
+        print("Aufruf: python log_rollup.py rebuild")
+        sys.exit(1)
+    count = rebuild_rollups(get_log_collection(), get_rollup_collection())
+    print(f"Rollups neu aufgebaut: {count} Zähler.")
@@ -0,0 +1,228 @@
+# log_spool.py — Lokaler Zwischenspeicher (Spool) für Log-Einträge bei nicht erreichbarer MongoDB
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+# Fehlercode von MongoDB für doppelte Schlüssel (_id bereits vorhanden)
+DUPLICATE_KEY_ERROR = 11000
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+# Segmente mit beschädigten Zeilen werden nach dem Hochladen umbenannt statt gelöscht
+CORRUPT_SUFFIX = ".bad"
+
+
+def encode_entry(entry):
+    """
+    Wandelt einen Log-Eintrag in eine JSON-Zeile um (datetime und ObjectId werden markiert).
+    """
+    def default(value):
+        if isinstance(value, datetime):
+            return {"$date": value.isoformat()}
+        if isinstance(value, ObjectId):
+            return {"$oid": str(value)}
+        raise TypeError(f"Nicht serialisierbarer Typ: {type(value).__name__}")
+    return json.dumps(entry, default=default, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_entry(line):
+    """
+    Stellt einen Log-Eintrag aus einer JSON-Zeile wieder her.
+    """
+    def object_hook(obj):
+        if len(obj) == 1 and "$date" in obj:
+            return datetime.fromisoformat(obj["$date"])
+        if len(obj) == 1 and "$oid" in obj:
+            return ObjectId(obj["$oid"])
+        return obj
+    return json.loads(line, object_hook=object_hook)
+
+
+class LogSpool:
+    """
+    Append-only Spool aus nummerierten JSONL-Segmenten.
+
+    Einträge werden an das aktuelle Segment angehängt und gebündelt mit fsync gesichert.
+    replay() lädt abgeschlossene Segmente in Reihenfolge hoch und löscht sie danach.
+    Enthält ein Segment beschädigte Zeilen, wird es stattdessen zur Prüfung in
+    *.jsonl.bad umbenannt (corrupt_lines zählt die betroffenen Zeilen). Doppelte Uploads (z. B. nach einem Absturz mitten im Hochladen) werden über die
+    _id der Einträge erkannt und ignoriert.
+    """
+
+    def __init__(self, directory, segment_max_bytes=1_000_000, fsync_every=50, fsync_interval=1.0):
+        """
+        Args:
+            directory (str): Verzeichnis der Segmentdateien (wird bei Bedarf angelegt).
+            segment_max_bytes (int): Größe, ab der ein neues Segment begonnen wird.
+            fsync_every (int): fsync spätestens nach so vielen Einträgen ...
+            fsync_interval (float): ... oder nach so vielen Sekunden.
+        """
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+        self.corrupt_lines = 0          # Beschädigte Zeilen in bisher hochgeladenen Segmenten
+        self.corrupt_segments = []      # Pfade der beiseitegelegten Segmente (*.bad)
+        os.makedirs(directory, exist_ok=True)
+        self._next_seq = max(self._segment_numbers(), default=0) + 1
+
+    def _segment_numbers(self):
+        """
+        Liefert die Nummern aller vorhandenen Segmente in aufsteigender Reihenfolge.
+        """
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    numbers.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(numbers)
+
+    def _segment_path(self, seq):
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{seq:08d}{SEGMENT_SUFFIX}")
+
+    def _sync(self):
+        """
+        Schreibt gepufferte Daten des aktuellen Segments auf die Platte.
+        Muss mit gehaltener Sperre aufgerufen werden.
+        """
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def _seal(self):
+        """
+        Schließt das aktuelle Segment ab. Muss mit gehaltener Sperre aufgerufen werden.
+        """
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def append(self, entries):
+        """
+        Hängt Log-Einträge an den Spool an.
+        Args:
+            entries (list[dict]): Einträge mit gesetzter _id.
+        """
+        data = "".join(encode_entry(entry) + "\n" for entry in entries).encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                self._file = open(self._segment_path(self._next_seq), "ab")
+                self._next_seq += 1
+            self._file.write(data)
+            self._unsynced += len(entries)
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._synced_at >= self.fsync_interval):
+                self._sync()
+            if self._file.tell() >= self.segment_max_bytes:
+                self._seal()
+
+    def flush(self):
+        """
+        Erzwingt fsync des aktuellen Segments.
+        """
+        with self._lock:
+            self._sync()
+
+    def has_pending(self):
+        """
+        True, wenn noch nicht hochgeladene Segmente vorhanden sind.
+        """
+        with self._lock:
+            return self._file is not None or bool(self._segment_numbers())
+
+    @staticmethod
+    def read_segment(path):
+        """
+        Liest alle vollständigen Einträge eines Segments. Eine abgeschnittene letzte Zeile
+        (Absturz während des Schreibens) wird ignoriert; andere nicht lesbare Zeilen werden
+        übersprungen und gezählt.
+        Returns:
+            tuple: (Liste der Einträge, Anzahl beschädigter Zeilen)
+        """
+        entries, corrupt = [], 0
+        with open(path, "rb") as segment:
+            for raw in segment:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    entries.append(decode_entry(raw.decode("utf-8")))
+                except ValueError:
+                    corrupt += 1
+        return entries, corrupt
+
+    def replay(self, collection, batch_size=500, on_inserted=None):
+        """
+        Lädt alle Segmente in Reihenfolge mit insert_many hoch und löscht sie danach;
+        Segmente mit beschädigten Zeilen werden nach dem Hochladen der lesbaren Einträge
+        in *.jsonl.bad umbenannt. Bei einem Verbindungsfehler bricht der Vorgang ab; die restlichen Segmente bleiben erhalten.
+        Args:
+            collection: Ziel-Collection in MongoDB.
+            batch_size (int, optional): Einträge pro insert_many.
+            on_inserted (callable, optional): Wird mit der Liste der tatsächlich neu
+                eingefügten Einträge aufgerufen (ohne Duplikate).
+        Returns:
+            int: Anzahl der hochgeladenen (neuen) Einträge.
+        """
+        with self._lock:
+            self._seal()
+            numbers = self._segment_numbers()
+
+        uploaded = 0
+        for seq in numbers:
+            path = self._segment_path(seq)
+            entries, corrupt = self.read_segment(path)
+            for i in range(0, len(entries), batch_size):
+                inserted = self._insert_ignoring_duplicates(collection, entries[i:i + batch_size])
+                uploaded += len(inserted)
+                if on_inserted is not None and inserted:
+                    on_inserted(inserted)
+            if corrupt:
+                # Nicht lesbare Einträge nicht stillschweigend verwerfen: Segment aufbewahren
+                os.replace(path, path + CORRUPT_SUFFIX)
+                with self._lock:
+                    self.corrupt_lines += corrupt
+                    self.corrupt_segments.append(path + CORRUPT_SUFFIX)
+            else:
+                os.remove(path)
+        return uploaded
+
+    @staticmethod
+    def _insert_ignoring_duplicates(collection, batch):
+        """
+        insert_many, bei dem bereits vorhandene _id-Werte nicht als Fehler gelten.
+        Returns:
+            list[dict]: Tatsächlich neu eingefügte Einträge.
+        """
+        try:
+            collection.insert_many(batch, ordered=False)
+            return batch
+        except BulkWriteError as error:
+            details = error.details or {}
+            write_errors = details.get("writeErrors", [])
+            other_errors = [e for e in write_errors if e.get("code") != DUPLICATE_KEY_ERROR]
+            if other_errors or details.get("writeConcernErrors"):
+                raise
+            duplicates = {e.get("index") for e in write_errors}
+            return [entry for i, entry in enumerate(batch) if i not in duplicates]
+
+    def close(self):
+        """
+        Sichert und schließt das aktuelle Segment.
+        """
+        with self._lock:
+            self._seal()
@@ -1,36 +1,357 @@
 # log_writer.py
 
+import atexit
+import queue
+import threading
+import time
+from contextlib import nullcontext
+
+import config
 from config import MONGO_CONFIG
+from bson import ObjectId
 from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
 from datetime import datetime
+from log_spool import LogSpool
+from log_rollup import ensure_rollup_indexes, log_write_gate, update_rollups
+from instrumentation import timed
+
+
+# Standardwerte (können in config.py über LOG_WRITER_CONFIG überschrieben werden)
+DEFAULT_LOG_WRITER_CONFIG = {
+    "queue_size": 10000,          # Maximale Anzahl wartender Log-Einträge
+    "batch_size": 100,            # insert_many, sobald so viele Einträge anstehen
+    "flush_interval": 1.0,        # ... oder spätestens nach so vielen Sekunden
+    "enqueue_timeout": 0.05,      # Wartezeit bei voller Warteschlange, danach wird verworfen
+    "server_selection_timeout_ms": 2000,
+    "socket_timeout_ms": 5000,
+    "replay_interval": 30,        # Sekunden zwischen zwei Versuchen, den Spool hochzuladen
+}
+
+# Standardwerte für den lokalen Spool (können über LOG_SPOOL_CONFIG überschrieben werden)
+DEFAULT_LOG_SPOOL_CONFIG = {
+    "directory": "log_spool",
+    "segment_max_bytes": 1_000_000,
+    "fsync_every": 50,
+    "fsync_interval": 1.0,
+}
+
+
+class AsyncLogSink:
+    """
+    Nicht blockierende Protokollierung in MongoDB.
+
+    Einträge landen in einer begrenzten Warteschlange; ein Hintergrund-Thread schreibt sie
+    mit insert_many, sobald batch_size erreicht oder flush_interval abgelaufen ist.
+    Alle Schreibvorgänge teilen sich einen MongoClient.
+
+    Ist MongoDB langsam oder nicht erreichbar, landen die Einträge im lokalen Spool
+    und werden später in Reihenfolge nachgeladen, sodass keine Einträge verloren gehen.
+    """
+
+    def __init__(self, collection_factory, queue_size=10000, batch_size=100,
+                 flush_interval=1.0, enqueue_timeout=0.05, spool=None, replay_interval=30,
+                 on_written=None, write_gate=None):
+        """
+        Args:
+            collection_factory (callable): Funktion ohne Argumente, die die Ziel-Collection liefert.
+            queue_size (int): Maximale Länge der Warteschlange.
+            batch_size (int): Anzahl der Einträge pro insert_many.
+            flush_interval (float): Maximale Wartezeit eines Eintrags in Sekunden.
+            enqueue_timeout (float): Wartezeit bei voller Warteschlange, bevor verworfen
+                (bzw. mit Spool: in den Spool geschrieben) wird.
+            spool (LogSpool, optional): Lokaler Spool für nicht schreibbare Einträge.
+            replay_interval (float): Sekunden zwischen zwei Versuchen, den Spool hochzuladen.
+            on_written (callable, optional): Wird mit jedem erfolgreich geschriebenen Stapel
+                aufgerufen (z. B. zur Pflege der Rollups).
+            write_gate (callable, optional): Liefert einen Kontextmanager um jeden Schreibvorgang
+                (insert_many bzw. Hochladen des Spools samt on_written); ergibt er False, wird
+                in den Spool geschrieben (z. B. log_rollup.log_write_gate).
+        """
+        self._collection_factory = collection_factory
+        self._collection = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._spool = spool
+        self.replay_interval = replay_interval
+        self._replayed_at = None
+        self._on_written = on_written
+        self._write_gate = write_gate or (lambda: nullcontext(True))
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {"enqueued": 0, "written": 0, "batches": 0, "failed": 0,
+                       "dropped": 0, "backpressured": 0, "spooled": 0, "replayed": 0,
+                       "callback_errors": 0}
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def submit(self, entry):
+        """
+        Stellt einen Log-Eintrag in die Warteschlange, ohne auf MongoDB zu warten.
+        Returns:
+            bool: False, wenn der Eintrag wegen voller Warteschlange verworfen wurde.
+        """
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # Gegendruck: kurz warten, danach verwerfen statt die Oberfläche zu blockieren
+            self._count("backpressured")
+            try:
+                self._queue.put(entry, timeout=self.enqueue_timeout)
+            except queue.Full:
+                if self._spool is not None:
+                    self._spool_entries([entry])
+                    return True
+                self._count("dropped")
+                return False
+        self._count("enqueued")
+        return True
+
+    def _drain(self, first):
+        """
+        Sammelt bis zu batch_size Einträge aus der Warteschlange (beginnend mit first).
+        """
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _get_collection(self):
+        if self._collection is None:
+            self._collection = self._collection_factory()
+        return self._collection
+
+    def _notify_written(self, entries):
+        """
+        Ruft on_written für geschriebene Einträge auf; Fehler dort blockieren das Log nicht.
+        """
+        if self._on_written is None:
+            return
+        try:
+            self._on_written(entries)
+        except Exception:
+            self._count("callback_errors")
+
+    def _spool_entries(self, entries):
+        """
+        Schreibt Einträge in den lokalen Spool; schlägt auch das fehl (Plattenfehler, nicht
+        serialisierbarer Wert), gelten sie als verloren. Wird auch im Thread der Oberfläche
+        aufgerufen (submit) und darf daher keine Ausnahme weitergeben.
+        """
+        try:
+            self._spool.append(entries)
+            self._count("spooled", len(entries))
+        except Exception:
+            self._count("failed", len(entries))
+
+    def _try_replay(self, force=False):
+        """
+        Lädt den Spool hoch, höchstens alle replay_interval Sekunden.
+        Returns:
+            bool: True, wenn der Spool danach leer ist.
+        """
+        now = time.monotonic()
+        if not force and self._replayed_at is not None and now - self._replayed_at < self.replay_interval:
+            return False
+        self._replayed_at = now
+        try:
+            self._count("replayed", self._spool.replay(self._get_collection(),
+                                                       on_inserted=self._notify_written))
+            return True
+        except Exception:
+            return False
+
+    def _write(self, batch):
+        """
+        Schreibt einen Stapel mit insert_many (ungeordnet, damit ein Fehler den Rest nicht stoppt).
+        Solange der Spool nicht leer ist, werden neue Einträge hinten angehängt, damit die
+        Reihenfolge beim Nachladen erhalten bleibt; ebenso, solange write_gate es nicht erlaubt.
+        """
+        with self._write_gate() as allowed:
+            if self._spool is not None and (not allowed or self._spool.has_pending()):
+                self._spool_entries(batch)
+                if allowed:
+                    self._try_replay()
+                return
+            try:
+                self._get_collection().insert_many(batch, ordered=False)
+            except Exception:
+                # PyMongoError, aber z. B. auch bson.errors.InvalidDocument
+                if self._spool is not None:
+                    self._spool_entries(batch)
+                else:
+                    self._count("failed", len(batch))
+                return
+            self._count("written", len(batch))
+            self._count("batches")
+            self._notify_written(batch)
+
+    def _run(self):
+        """
+        Hintergrund-Thread: wartet auf Einträge und schreibt sie stapelweise.
+        """
+        while not self._stop.is_set() or not self._queue.empty():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # Leerlauf nutzen, um gespoolte Einträge nachzuladen
+                if self._spool is not None and self._spool.has_pending():
+                    with self._write_gate() as allowed:
+                        if allowed:
+                            self._try_replay()
+                continue
+            # Bis zu flush_interval warten, damit sich ein Stapel füllen kann
+            deadline = time.monotonic() + self.flush_interval
+            while (self._queue.qsize() + 1 < self.batch_size and time.monotonic() < deadline
+                   and not self._stop.is_set()):
+                time.sleep(min(0.01, self.flush_interval))
+            batch = self._drain(first)
+            try:
+                self._write(batch)
+            except Exception:
+                # Unerwarteter Fehler: Stapel als verloren zählen, der Thread läuft weiter
+                self._count("failed", len(batch))
+
+    def close(self, timeout=5.0):
+        """
+        Schreibt alle wartenden Einträge und beendet den Hintergrund-Thread.
+        Args:
+            timeout (float, optional): Maximale Wartezeit in Sekunden.
+        """
+        self._stop.set()
+        self._thread.join(timeout)
+        if self._spool is not None:
+            self._spool.close()
+
+    def get_stats(self):
+        """
+        Liefert die Zähler der Protokollierung (enqueued, written, dropped, backpressured, ...).
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        if self._spool is not None:
+            stats["spool_corrupt_lines"] = self._spool.corrupt_lines
+        return stats
+
+
+_mongo_client = None
+_rollup_indexes_ready = False
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_mongo_client():
+    """
+    Liefert den gemeinsamen MongoClient (wird beim ersten Aufruf erstellt).
+    """
+    global _mongo_client
+    with _sink_lock:
+        if _mongo_client is None:
+            settings = {**DEFAULT_LOG_WRITER_CONFIG, **getattr(config, "LOG_WRITER_CONFIG", {})}
+            _mongo_client = MongoClient(
+                MONGO_CONFIG['uri'],
+                serverSelectionTimeoutMS=settings["server_selection_timeout_ms"],
+                socketTimeoutMS=settings["socket_timeout_ms"],
+            )
+    return _mongo_client
+
+
+def set_mongo_client(client):
+    """
+    Ersetzt den gemeinsamen MongoClient, z. B. durch mongomock für Benchmarks.
+    """
+    global _mongo_client
+    with _sink_lock:
+        _mongo_client = client
+
+
+def get_log_collection():
+    """
+    Liefert die Collection für das Suchprotokoll.
+    """
+    return get_mongo_client()[MONGO_CONFIG['database']][MONGO_CONFIG['collection']]
 
 
+def get_rollup_collection():
+    """
+    Liefert die Collection mit den vorberechneten Zählern der Suchstatistik.
+    Name aus MONGO_CONFIG['rollup_collection'], sonst "<collection>_rollup".
+    """
+    name = MONGO_CONFIG.get('rollup_collection', MONGO_CONFIG['collection'] + "_rollup")
+    return get_mongo_client()[MONGO_CONFIG['database']][name]
+
+
+def write_rollups(entries):
+    """
+    Aktualisiert die Rollups für geschriebene Log-Einträge (Callback der Log-Senke).
+    """
+    global _rollup_indexes_ready
+    collection = get_rollup_collection()
+    if not _rollup_indexes_ready:
+        ensure_rollup_indexes(collection)
+        _rollup_indexes_ready = True
+    update_rollups(collection, entries)
+
+
+def get_log_sink():
+    """
+    Liefert die gemeinsame Log-Senke (wird beim ersten Aufruf erstellt und beim Beenden geleert).
+    """
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            settings = {**DEFAULT_LOG_WRITER_CONFIG, **getattr(config, "LOG_WRITER_CONFIG", {})}
+            spool_settings = {**DEFAULT_LOG_SPOOL_CONFIG, **getattr(config, "LOG_SPOOL_CONFIG", {})}
+            _sink = AsyncLogSink(
+                get_log_collection,
+                queue_size=settings["queue_size"],
+                batch_size=settings["batch_size"],
+                flush_interval=settings["flush_interval"],
+                enqueue_timeout=settings["enqueue_timeout"],
+                spool=LogSpool(**spool_settings),
+                replay_interval=settings["replay_interval"],
+                on_written=write_rollups,
+                write_gate=log_write_gate,
+            )
+            atexit.register(_sink.close)
+    return _sink
+
+
+def get_log_stats():
+    """
+    Liefert die Zähler der Log-Senke (leeres dict, falls noch nichts protokolliert wurde).
+    """
+    return _sink.get_stats() if _sink is not None else {}
+
+
+@timed("log_write")
 def log_search_query(search_type: str, params: dict, results_count: int):
     """
     Protokolliert Suchanfragen in MongoDB zur Sammlung von Statistiken.
-    
+    Der Eintrag wird im Hintergrund geschrieben, die Suche wartet nicht auf MongoDB.
+
     Args:
         search_type (str): Suchtyp (z. B. "keyword", "genre", "actor", "year").
         params (dict): Suchparameter (z. B. {"keyword": "matrix"}).
         results_count (int): Anzahl der gefundenen Ergebnisse.
     """
-    
-    # Einrichtung der Verbindung zu MongoDB
-    try:
-        mongo_client = MongoClient(MONGO_CONFIG['uri'])
-        searches_collection = mongo_client[MONGO_CONFIG['database']][MONGO_CONFIG['collection']]
-
-        log_entry = {
-            "timestamp": datetime.now(),
-            "search_type": search_type,
-            "params": params,
-            "results_count": results_count
-        }
-
-        searches_collection.insert_one(log_entry)
-        
-    except ConnectionFailure as e:
-        print(f"Fehler beim Schreiben des Logs: {e}")
-    finally:
-        mongo_client.close()
\ No newline at end of file
+    # Eigene _id, damit ein erneut hochgeladener Spool-Eintrag als Duplikat erkannt wird
+    log_entry = {
+        "_id": ObjectId(),
+        "timestamp": datetime.now(),
+        "search_type": search_type,
+        "params": params,
+        "results_count": results_count
+    }
+
+    if not get_log_sink().submit(log_entry):
+        print("Fehler beim Schreiben des Logs: Warteschlange voll, Eintrag verworfen.")
@@ -1,9 +1,36 @@
 # main_menu.py
+#
+# Schwere Module (search mit pymysql, log_writer/log_reader mit pymongo) werden erst beim
+# ersten Menüpunkt geladen, der sie braucht, damit die Kopfzeile sofort erscheint. Auch das
+# Vorwärmen der Caches beginnt erst mit dem ersten Such- bzw. Statistik-Menüpunkt.
+# Ladezeiten prüfen: python benchmark.py startup
 
-from search import *
-from log_reader import *
-from log_writer import *
-from formatter import *
+import threading
+
+from formatter import print_header, print_rows_paginated
+
+
+_warm_started = threading.Event()
+
+
+def warm_caches():
+    """
+    Lädt search im Hintergrund, prüft dort Genres und Jahresbereich (siehe reference_cache.py)
+    und lädt die häufigsten Suchen aus dem Protokoll in den Ergebnis-Cache (siehe cache_warmer.py).
+    Wird beim ersten Such- bzw. Statistik-Menüpunkt aufgerufen, nicht beim Start: wer das
+    Programm gleich wieder beendet, lädt weder pymysql noch pymongo. Weitere Aufrufe tun nichts.
+    """
+    if _warm_started.is_set():
+        return
+    _warm_started.set()
+
+    def run():
+        from search import execute_query, get_reference_cache
+        from cache_warmer import get_cache_warmer
+        get_reference_cache(execute_query).warm()
+        get_cache_warmer().start()
+
+    threading.Thread(target=run, name="cache-warm", daemon=True).start()
 
 
 def main_menu():
@@ -18,8 +45,13 @@ def main_menu():
 
         choice = input("\nWählen Sie einen Menüpunkt (1, 2, 3, 4 oder 0): ")
 
+        if choice in ('1', '2', '3', '4'):
+            warm_caches()  # Genres, Jahresbereich und häufigste Suchen im Hintergrund laden
+
         if choice == '1':
             # Suche nach Stichwort
+            from search import get_search_keyword, search_film_by_title
+            from log_writer import log_search_query
             keyword = get_search_keyword()
             films, columns = search_film_by_title(keyword)  
             print_rows_paginated(films, columns)
@@ -31,6 +63,10 @@ def main_menu():
         
         elif choice == '2':
             # Suche nach Genre und Jahresbereich
+            from search import (get_all_genres, get_year_range, get_valid_genre_num, get_valid_year,
+                                get_valid_year_range, search_film_by_genre, search_film_by_genre_and_year,
+                                search_film_by_genre_and_year_range)
+            from log_writer import log_search_query
             genres = get_all_genres() 
             min_year, max_year = get_year_range() 
             while True:
@@ -96,6 +132,8 @@ def main_menu():
 
         elif choice == '3':
             # Suche nach Schauspieler/in (oder Teile des Namens)
+            from search import get_search_actor, search_film_by_actor
+            from log_writer import log_search_query
             actor = get_search_actor()
             films, columns = search_film_by_actor(actor)
             print_rows_paginated(films, columns)
@@ -107,6 +145,7 @@ def main_menu():
 
         elif choice == '4':
             # Beliebteste Suchanfragen anzeigen
+            from log_reader import show_popular_queries, show_last_unique_queries
             while True:
                 print("\n" + "=" * 60)
                 print(" " * 16 + "STATISTIK DER SUCHANFRAGEN")
@@ -0,0 +1,209 @@
+# pagination.py — Seitenweises Laden von Suchergebnissen direkt aus der Datenbank
+
+import contextvars
+import sys
+
+# Anzahl der Filme pro Seite
+PAGE_SIZE = 10
+
+
+class PagedQuery:
+    """
+    Lazy-Ergebnisliste für eine SQL-Abfrage, die nur die gerade angezeigte Seite lädt.
+
+    Die Gesamtanzahl wird über eine separate COUNT-Abfrage ermittelt, die Seiten
+    selbst per Keyset-Pagination über die ORDER-BY-Spalten (Fallback: OFFSET).
+    Unterstützt len(), Indexzugriff, Slicing und Iteration wie eine Liste, damit
+    formatter.print_rows_paginated sie unverändert verwenden kann.
+
+    Voraussetzung: die ORDER-BY-Spalten sind zusammen eindeutig und nicht NULL.
+
+    Alle Abfragen laufen im Kontext (contextvars) der Erstellung, auch wenn eine Seite
+    später oder in einem anderen Thread geladen wird (z. B. slow_query.current_search).
+    """
+
+    def __init__(self, execute, select_sql, from_sql, where_sql="", params=(),
+                 order_by=(), count_sql=None, group_by_sql=""):
+        """
+        Args:
+            execute (callable): Funktion (query, params) -> list[tuple], z. B. search.execute_query.
+            select_sql (str): Spaltenliste der Ausgabe (ohne SELECT).
+            from_sql (str): FROM-Teil inkl. JOINs (ohne WHERE).
+            where_sql (str, optional): Filterbedingung ohne WHERE.
+            params (tuple, optional): Parameter für die Platzhalter in from_sql und where_sql (in dieser Reihenfolge).
+            order_by (list[tuple[str, str]]): Sortierschlüssel [(ausdruck, "ASC" | "DESC"), ...].
+            count_sql (str, optional): Eigene COUNT-Abfrage; Standard COUNT(*) über FROM/WHERE.
+            group_by_sql (str, optional): GROUP-BY-Teil ohne GROUP BY.
+        """
+        if not order_by:
+            raise ValueError("Für die Keyset-Pagination ist mindestens eine Sortierspalte erforderlich.")
+        self._execute = execute
+        self.select_sql = select_sql
+        self.from_sql = from_sql
+        self.where_sql = where_sql
+        self.params = tuple(params)
+        self.order_by = [(expr, direction.upper()) for expr, direction in order_by]
+        self.group_by_sql = group_by_sql
+        self.count_sql = count_sql
+        self._count = None
+        self._pages = {}          # (start, stop) -> Zeilen
+        self._keys = {0: None}    # Startindex -> Schlüssel der vorherigen Zeile
+        self._context = contextvars.copy_context()
+        # Wird mit der geschätzten Größe jeder neu geladenen Seite aufgerufen (z. B. vom
+        # Ergebnis-Cache, damit dessen Speicherbudget auch für später geladene Seiten gilt)
+        self.on_page_loaded = None
+
+    def _run(self, query, params):
+        """
+        Führt eine Abfrage im Kontext der Erstellung aus (je Aufruf eine Kopie, da mehrere
+        Threads gleichzeitig Seiten laden können).
+        """
+        return self._context.copy().run(self._execute, query, params)
+
+    def _where(self, extra=""):
+        """
+        Setzt die WHERE-Klausel aus Filter und optionaler Keyset-Bedingung zusammen.
+        """
+        conditions = [f"({c})" for c in (self.where_sql, extra) if c]
+        return "WHERE " + " AND ".join(conditions) if conditions else ""
+
+    def _keyset_condition(self, key):
+        """
+        Baut die Bedingung "Zeile liegt in Sortierreihenfolge hinter key" samt Parametern.
+        """
+        clauses = []
+        params = []
+        for i, (expr, direction) in enumerate(self.order_by):
+            operator = "<" if direction == "DESC" else ">"
+            parts = [f"{prev} = %s" for prev, _ in self.order_by[:i]]
+            parts.append(f"{expr} {operator} %s")
+            clauses.append("(" + " AND ".join(parts) + ")")
+            params.extend(key[:i + 1])
+        return " OR ".join(clauses), params
+
+    def _select(self, where, limit_sql=""):
+        """
+        Liefert die vollständige SELECT-Abfrage inklusive Sortierschlüsseln am Zeilenende.
+        """
+        key_columns = ", ".join(expr for expr, _ in self.order_by)
+        order_sql = ", ".join(f"{expr} {direction}" for expr, direction in self.order_by)
+        group_sql = f"GROUP BY {self.group_by_sql}" if self.group_by_sql else ""
+        return (f"SELECT {self.select_sql}, {key_columns} {self.from_sql} {where} "
+                f"{group_sql} ORDER BY {order_sql} {limit_sql}")
+
+    def _strip_keys(self, rows):
+        """
+        Trennt die angehängten Sortierschlüssel von den Ausgabespalten.
+        Returns:
+            tuple: (Zeilen ohne Schlüssel, Schlüssel der letzten Zeile oder None)
+        """
+        n_keys = len(self.order_by)
+        last_key = tuple(rows[-1][-n_keys:]) if rows else None
+        return [tuple(row[:-n_keys]) for row in rows], last_key
+
+    def count(self):
+        """
+        Liefert die Gesamtanzahl der Treffer (COUNT-Abfrage, Ergebnis wird zwischengespeichert).
+        """
+        if self._count is None:
+            query = self.count_sql or f"SELECT COUNT(*) {self.from_sql} {self._where()}"
+            result = self._run(query, self.params)
+            self._count = result[0][0] if result else 0
+        return self._count
+
+    def fetch(self, start, stop):
+        """
+        Lädt die Zeilen im Bereich [start, stop) aus der Datenbank.
+        Schließt start direkt an eine bereits geladene Seite an, wird Keyset-Pagination
+        verwendet, sonst OFFSET.
+        Returns:
+            list[tuple]: Ergebniszeilen.
+        """
+        if stop <= start:
+            return []
+        if (start, stop) in self._pages:
+            return self._pages[(start, stop)]
+        # Letzte Seite: bereits als volle Seite angefordert, aber kürzer geliefert
+        page = self._pages.get((start, start + PAGE_SIZE))
+        if page is not None and (len(page) < PAGE_SIZE or stop - start <= len(page)):
+            return page[:stop - start]
+
+        size = stop - start
+        if start in self._keys:
+            key = self._keys[start]
+            if key is None:
+                where, params = self._where(), list(self.params)
+            else:
+                condition, key_params = self._keyset_condition(key)
+                where, params = self._where(condition), list(self.params) + key_params
+            query = self._select(where, "LIMIT %s")
+            params.append(size)
+        else:
+            query = self._select(self._where(), "LIMIT %s OFFSET %s")
+            params = list(self.params) + [size, start]
+
+        rows, last_key = self._strip_keys(self._run(query, params))
+        if last_key is not None:
+            self._keys[start + len(rows)] = last_key
+        self._pages[(start, stop)] = rows
+        if self.on_page_loaded is not None:
+            self.on_page_loaded(self._rows_size(rows))
+        return rows
+
+    def load_first_page(self, gather=None):
+        """
+        Lädt Gesamtanzahl und erste Seite im Voraus.
+        Args:
+            gather (callable, optional): Funktion, die mehrere Funktionen gleichzeitig ausführt
+                (z. B. async_query.gather_calls); ohne Angabe nacheinander.
+        """
+        calls = (self.count, lambda: self.fetch(0, PAGE_SIZE))
+        if gather is not None:
+            gather(*calls)
+        else:
+            for call in calls:
+                call()
+
+    def fetch_all(self):
+        """
+        Lädt alle Zeilen auf einmal (ohne Pagination).
+        """
+        rows, _ = self._strip_keys(self._run(self._select(self._where()), self.params))
+        self._count = len(rows)
+        return rows
+
+    @staticmethod
+    def _rows_size(rows):
+        """
+        Schätzt den Speicherbedarf einer Seite in Bytes.
+        """
+        size = sys.getsizeof(rows)
+        for row in rows:
+            size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+        return size
+
+    def memory_size(self):
+        """
+        Schätzt den Speicherbedarf der bisher geladenen Seiten in Bytes (für result_cache).
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self._pages) + sys.getsizeof(self._keys)
+        return size + sum(self._rows_size(rows) for rows in list(self._pages.values()))
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            rows = self.fetch(start, stop)
+            return rows if step == 1 else rows[::step]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Index außerhalb des Ergebnisbereichs")
+        page_start = index - index % PAGE_SIZE
+        return self.fetch(page_start, min(page_start + PAGE_SIZE, len(self)))[index - page_start]
+
+    def __iter__(self):
+        for start in range(0, len(self), PAGE_SIZE):
+            yield from self.fetch(start, min(start + PAGE_SIZE, len(self)))
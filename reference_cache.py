@@ -0,0 +1,218 @@
+# reference_cache.py — Dauerhafter Cache für Stammdaten (Genres, Jahresbereich)
+#
+# Die Daten werden in einer lokalen JSON-Datei gespeichert und beim Start geladen (nur für
+# die Datenbank aus MYSQL_CONFIG; nach db_pool.set_pool, z. B. auf eine Ersatzdatenbank,
+# bleiben sie nur im Arbeitsspeicher).
+# Ob sie noch aktuell sind, wird über MAX(last_update) der Tabellen category und film
+# im Hintergrund geprüft; der Aufruf selbst wartet nie auf die Datenbank, solange
+# bereits Daten vorhanden sind.
+
+import json
+import os
+import threading
+import time
+
+import config
+from async_query import gather_calls
+
+
+# Standardwerte (können in config.py über REFERENCE_CACHE_CONFIG überschrieben werden)
+DEFAULT_REFERENCE_CACHE_CONFIG = {
+    "path": "reference_cache.json",
+    "check_interval": 60,        # Sekunden zwischen zwei Prüfungen auf Änderungen
+}
+
+VERSION_QUERY = """
+    SELECT (SELECT COUNT(*) FROM category), (SELECT MAX(last_update) FROM category),
+           (SELECT MAX(last_update) FROM film)
+"""
+
+
+class ReferenceCache:
+    """
+    Genres und Jahresbereich der Filme, gespeichert in einer lokalen Datei.
+
+    Fehlen die Daten, werden sie einmal synchron geladen. Danach liefern get_genres()
+    und get_year_range() sofort die gespeicherten Werte und stoßen höchstens alle
+    check_interval Sekunden eine Prüfung im Hintergrund an, die bei geändertem
+    Stand neu lädt und die Datei ersetzt.
+    """
+
+    def __init__(self, execute, path, check_interval=60):
+        """
+        Args:
+            execute (callable): Funktion (query, params) -> list[tuple], z. B. search.execute_query.
+            path (str | None): JSON-Datei für die gespeicherten Daten (None = nur im Arbeitsspeicher).
+            check_interval (float, optional): Sekunden zwischen zwei Änderungsprüfungen.
+        """
+        self._execute = execute
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._data = self._load_file()
+        self._checked_at = None            # Zeitpunkt der letzten Prüfung (None = noch nie)
+        self._refreshing = False
+        self.stats = {"hits": 0, "loads": 0, "checks": 0, "refresh_errors": 0}
+
+    def _load_file(self):
+        """
+        Liest die gespeicherten Daten (None, wenn die Datei fehlt oder unlesbar ist).
+        """
+        if self.path is None:
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as source:
+                data = json.load(source)
+            return {
+                "version": data["version"],
+                "genres": [tuple(genre) for genre in data["genres"]],
+                "year_range": tuple(data["year_range"]),
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_file(self, data):
+        """
+        Schreibt die Daten atomar (temporäre Datei, danach umbenennen).
+        """
+        if self.path is None:
+            return
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as target:
+            json.dump(data, target, ensure_ascii=False, default=str)
+        os.replace(temp_path, self.path)
+
+    def _table_version(self):
+        """
+        Liefert den Änderungsstand von category und film als JSON-fähige Liste.
+        """
+        rows = self._execute(VERSION_QUERY)
+        return [str(value) if value is not None else None for value in rows[0]] if rows else None
+
+    def reload(self, version=None):
+        """
+        Lädt Genres und Jahresbereich aus der Datenbank und speichert sie in der Datei.
+        """
+        # Stand, Genres und Jahresbereich gleichzeitig abfragen
+        version_call = (lambda: version) if version else self._table_version
+        version, genres, year_rows = gather_calls(
+            version_call,
+            lambda: self._execute("SELECT category_id, name FROM category ORDER BY name"),
+            lambda: self._execute("SELECT MIN(release_year), MAX(release_year) FROM film"),
+        )
+        data = {
+            "version": version,
+            "genres": [tuple(genre) for genre in genres],
+            "year_range": tuple(year_rows[0]) if year_rows else (None, None),
+        }
+        with self._lock:
+            self._data = data
+            self._checked_at = time.monotonic()
+            self.stats["loads"] += 1
+        try:
+            self._save_file(data)
+        except OSError:
+            pass    # Ohne Datei funktioniert der Cache weiterhin im Arbeitsspeicher
+        return data
+
+    def refresh_if_stale(self):
+        """
+        Vergleicht den gespeicherten Stand mit der Datenbank und lädt bei Änderungen neu.
+        """
+        version = self._table_version()
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self.stats["checks"] += 1
+            current = self._data["version"] if self._data else None
+        if version != current:
+            self.reload(version)
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh_if_stale()
+        except Exception:
+            with self._lock:
+                self.stats["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _get(self):
+        """
+        Liefert die aktuellen Daten und startet bei Bedarf die Prüfung im Hintergrund.
+        """
+        with self._lock:
+            data = self._data
+            due = self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval
+            start_check = data is not None and due and not self._refreshing
+            if start_check:
+                self._refreshing = True
+            if data is not None:
+                self.stats["hits"] += 1
+        if data is None:
+            return self.reload()
+        if start_check:
+            threading.Thread(target=self._refresh_in_background, name="reference-cache", daemon=True).start()
+        return data
+
+    def warm(self):
+        """
+        Beim Programmstart: lädt fehlende Daten bzw. prüft vorhandene, ohne den Start zu verzögern.
+        """
+        def run():
+            try:
+                self._get()
+            except Exception:
+                with self._lock:
+                    self.stats["refresh_errors"] += 1
+
+        threading.Thread(target=run, name="reference-cache-warm", daemon=True).start()
+
+    def get_genres(self):
+        """
+        Returns:
+            list[tuple[int, str]]: Genres (category_id, name), sortiert nach Name.
+        """
+        return list(self._get()["genres"])
+
+    def get_year_range(self):
+        """
+        Returns:
+            tuple: (min_year, max_year) oder (None, None), wenn es keine Filme gibt.
+        """
+        return self._get()["year_range"]
+
+
+_reference_cache = None
+_reference_cache_persistent = True
+_reference_cache_lock = threading.Lock()
+
+
+def get_reference_cache(execute):
+    """
+    Liefert den gemeinsamen Stammdaten-Cache (wird beim ersten Aufruf erstellt).
+    Args:
+        execute (callable): Funktion (query, params) -> list[tuple].
+    Returns:
+        ReferenceCache: Cache mit den Einstellungen aus REFERENCE_CACHE_CONFIG.
+    """
+    global _reference_cache
+    with _reference_cache_lock:
+        if _reference_cache is None:
+            settings = {**DEFAULT_REFERENCE_CACHE_CONFIG, **getattr(config, "REFERENCE_CACHE_CONFIG", {})}
+            if not _reference_cache_persistent:
+                settings["path"] = None
+            _reference_cache = ReferenceCache(execute, **settings)
+    return _reference_cache
+
+
+def reset_reference_cache(persistent=True):
+    """
+    Verwirft den gemeinsamen Cache, z. B. wenn db_pool.set_pool auf eine andere Datenbank
+    umstellt. Die Datei aus REFERENCE_CACHE_CONFIG gehört zur Datenbank aus MYSQL_CONFIG;
+    für andere Datenbanken (persistent=False) wird sie weder gelesen noch geschrieben.
+    """
+    global _reference_cache, _reference_cache_persistent
+    with _reference_cache_lock:
+        _reference_cache = None
+        _reference_cache_persistent = persistent
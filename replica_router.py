@@ -0,0 +1,253 @@
+# replica_router.py — Verteilung der Suchabfragen auf MySQL-Lese-Replikate
+#
+# Alle Abfragen der Anwendung lesen nur (Sakila-Suchen, Stammdaten, EXPLAIN). Sind in
+# config.py Lese-Replikate eingetragen (MYSQL_REPLICAS), liefert db_pool.get_pool() statt
+# eines einzelnen Pools einen ReplicaRouter mit derselben Schnittstelle (connection(),
+# fill(), get_stats(), close()). Jede Abfrage geht an das gesunde Replikat mit den
+# wenigsten laufenden Abfragen (least outstanding requests); der Primärserver
+# (MYSQL_CONFIG) wird nur verwendet, wenn kein Replikat verfügbar ist.
+#
+# Gesundheit: Ein Hintergrund-Thread prüft alle Replikate im Abstand probe_interval
+# (ConnectionPool.probe). Nach eject_after Fehlern in Folge (Prüfungen oder
+# Verbindungsfehler bei Abfragen) wird ein Replikat ausgeschlossen, nach
+# readmit_after erfolgreichen Prüfungen in Folge wieder aufgenommen.
+#
+# Beispiel für config.py:
+#   MYSQL_REPLICAS = [
+#       {'name': 'replica-1', 'host': 'replica1.example'},    # übrige Werte wie MYSQL_CONFIG
+#       {'name': 'replica-2', 'host': 'replica2.example', 'port': 3307},
+#   ]
+
+import threading
+from contextlib import contextmanager
+
+import config
+from db_pool import CONNECTION_ERRORS, ConnectionPool
+
+
+# Standardwerte (können in config.py über REPLICA_ROUTING_CONFIG überschrieben werden)
+DEFAULT_REPLICA_ROUTING_CONFIG = {
+    "probe_interval": 5,     # Sekunden zwischen zwei Gesundheitsprüfungen
+    "probe_timeout": 2,      # Verbindungs- und Lese-Timeout einer Prüfung in Sekunden
+    "eject_after": 3,        # Fehler in Folge, nach denen ein Replikat ausgeschlossen wird
+    "readmit_after": 2,      # Erfolgreiche Prüfungen in Folge bis zur Wiederaufnahme
+}
+
+
+class Backend:
+    """
+    Ein Datenbankserver (Primärserver oder Replikat) mit eigenem Pool und Zustand.
+    """
+
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.healthy = True
+        self.outstanding = 0       # Laufende Abfragen
+        self.failures = 0          # Fehler in Folge
+        self.successes = 0         # Erfolgreiche Prüfungen in Folge
+        self.stats = {"requests": 0, "errors": 0, "ejections": 0, "readmissions": 0}
+
+
+class ReplicaRouter:
+    """
+    Verteilt Verbindungen auf gesunde Lese-Replikate (least outstanding requests)
+    mit Rückfall auf den Primärserver.
+    """
+
+    def __init__(self, primary, replicas, probe_interval=5, probe_timeout=2, eject_after=3, readmit_after=2):
+        """
+        Args:
+            primary (ConnectionPool): Pool des Primärservers.
+            replicas (dict[str, ConnectionPool]): Pools der Replikate nach Name.
+            probe_interval (float, optional): Sekunden zwischen zwei Prüfungen (None = keine).
+            probe_timeout (float, optional): Timeout einer Prüfung in Sekunden.
+            eject_after (int, optional): Fehler in Folge bis zum Ausschluss.
+            readmit_after (int, optional): Erfolgreiche Prüfungen in Folge bis zur Wiederaufnahme.
+        """
+        self._primary = Backend("primary", primary)
+        self._replicas = [Backend(name, pool) for name, pool in replicas.items()]
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.eject_after = eject_after
+        self.readmit_after = readmit_after
+        self._lock = threading.Lock()
+        self._turn = 0             # Rotation bei gleicher Auslastung
+        self._stop = threading.Event()
+        if self._replicas and probe_interval:
+            threading.Thread(target=self._probe_loop, name="replica-probe", daemon=True).start()
+
+    def _candidates(self):
+        """
+        Reihenfolge der Server für die nächste Abfrage: gesunde Replikate nach Anzahl
+        laufender Abfragen (bei Gleichstand reihum), zuletzt der Primärserver.
+        """
+        with self._lock:
+            healthy = [backend for backend in self._replicas if backend.healthy]
+            self._turn += 1
+            count = len(healthy)
+            order = sorted(range(count), key=lambda i: (healthy[i].outstanding, (i - self._turn) % count))
+            return [healthy[i] for i in order] + [self._primary]
+
+    def _record(self, backend, ok, probe=False):
+        """
+        Aktualisiert den Zustand nach einer Abfrage oder Prüfung; schließt ein Replikat
+        nach eject_after Fehlern aus und nimmt es nach readmit_after Prüfungen wieder auf.
+        Muss mit gehaltener Sperre aufgerufen werden.
+        """
+        if ok:
+            backend.failures = 0
+            if probe:
+                backend.successes += 1
+                if not backend.healthy and backend.successes >= self.readmit_after:
+                    backend.healthy = True
+                    backend.stats["readmissions"] += 1
+            return
+        backend.failures += 1
+        backend.successes = 0
+        backend.stats["errors"] += 1
+        if backend is not self._primary and backend.healthy and backend.failures >= self.eject_after:
+            backend.healthy = False
+            backend.stats["ejections"] += 1
+
+    def _finish(self, backend, ok):
+        with self._lock:
+            backend.outstanding -= 1
+            self._record(backend, ok)
+
+    def _acquire(self):
+        """
+        Leiht eine Verbindung vom ersten erreichbaren Server aus _candidates aus.
+        Returns:
+            tuple: (Backend, Verbindung)
+        """
+        candidates = self._candidates()
+        for backend in candidates:
+            with self._lock:
+                backend.outstanding += 1
+                backend.stats["requests"] += 1
+            try:
+                return backend, backend.pool.acquire()
+            except CONNECTION_ERRORS:
+                # Server nicht erreichbar: nächsten Kandidaten versuchen, zuletzt den Primärserver
+                self._finish(backend, ok=False)
+                if backend is candidates[-1]:
+                    raise
+            except BaseException:
+                with self._lock:
+                    backend.outstanding -= 1
+                raise
+
+    @contextmanager
+    def connection(self):
+        """
+        Kontextmanager wie ConnectionPool.connection, aber mit Auswahl des Servers.
+        Bei Verbindungsfehlern wird die Verbindung verworfen und der Fehler dem Server angerechnet.
+        """
+        backend, connection = self._acquire()
+        ok = True
+        try:
+            yield connection
+        except CONNECTION_ERRORS:
+            ok = False
+            backend.pool.release(connection, discard=True)
+            raise
+        except BaseException:
+            backend.pool.release(connection)
+            raise
+        else:
+            backend.pool.release(connection)
+        finally:
+            self._finish(backend, ok)
+
+    def probe(self):
+        """
+        Prüft alle Replikate einmal und aktualisiert ihren Zustand. Ein wieder
+        aufgenommenes Replikat erhält hier (im Prüf-Thread) seine Mindestanzahl Verbindungen.
+        """
+        for backend in self._replicas:
+            ok = backend.pool.probe(self.probe_timeout)
+            with self._lock:
+                was_healthy = backend.healthy
+                self._record(backend, ok, probe=True)
+                readmitted = backend.healthy and not was_healthy
+            if readmitted:
+                self._fill_backend(backend)
+
+    def _probe_loop(self):
+        while not self._stop.wait(self.probe_interval):
+            self.probe()
+
+    def _fill_backend(self, backend):
+        """
+        Öffnet die Mindestanzahl Verbindungen eines Servers; ein Fehler wird nur angerechnet.
+        """
+        try:
+            backend.pool.fill()
+        except CONNECTION_ERRORS:
+            with self._lock:
+                self._record(backend, ok=False)
+
+    def fill(self):
+        """
+        Öffnet die Mindestanzahl Verbindungen auf allen gesunden Servern.
+        Ein nicht erreichbarer Server wird nur angerechnet, nicht gemeldet.
+        Wird nur beim Erstellen aufgerufen (db_pool.get_pool), nie bei einer Abfrage.
+        """
+        for backend in [self._primary] + self._replicas:
+            if backend.healthy:
+                self._fill_backend(backend)
+
+    @property
+    def max_size(self):
+        """
+        Maximale Anzahl gleichzeitig offener Verbindungen über alle Server.
+        """
+        return sum(backend.pool.max_size for backend in [self._primary] + self._replicas)
+
+    def get_stats(self):
+        """
+        Liefert die Kennzahlen aller Server.
+        Returns:
+            dict: Servername -> Poolkennzahlen plus healthy, outstanding, requests, errors,
+            ejections, readmissions.
+        """
+        stats = {}
+        for backend in [self._primary] + self._replicas:
+            pool_stats = backend.pool.get_stats()
+            with self._lock:
+                stats[backend.name] = {**pool_stats, **backend.stats, "healthy": backend.healthy,
+                                       "outstanding": backend.outstanding}
+        return stats
+
+    def close(self):
+        """
+        Beendet die Prüfungen und schließt alle Pools.
+        """
+        self._stop.set()
+        for backend in [self._primary] + self._replicas:
+            backend.pool.close()
+
+
+def create_replica_router(primary_config, replica_configs, pool_settings, connect=None):
+    """
+    Erstellt den Router aus der Konfiguration.
+    Args:
+        primary_config (dict): Verbindungsdaten des Primärservers (MYSQL_CONFIG).
+        replica_configs (list[dict]): Replikate; fehlende Werte werden aus primary_config
+            übernommen, 'name' dient nur der Anzeige.
+        pool_settings (dict): Einstellungen je Pool (MYSQL_POOL_CONFIG).
+        connect (callable, optional): Eigene Verbindungsfunktion, z. B. für Ersatzserver.
+    Returns:
+        ReplicaRouter: Router mit den Einstellungen aus REPLICA_ROUTING_CONFIG.
+    """
+    extra = {} if connect is None else {"connect": connect}
+    replicas = {}
+    for number, replica in enumerate(replica_configs, 1):
+        replica = {**primary_config, **replica}
+        name = replica.pop("name", None) or f"{replica.get('host', 'replica')}:{replica.get('port', 3306)}"
+        if name in replicas:
+            name = f"{name}#{number}"
+        replicas[name] = ConnectionPool(replica, **pool_settings, **extra)
+    settings = {**DEFAULT_REPLICA_ROUTING_CONFIG, **getattr(config, "REPLICA_ROUTING_CONFIG", {})}
+    return ReplicaRouter(ConnectionPool(primary_config, **pool_settings, **extra), replicas, **settings)
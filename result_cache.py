@@ -0,0 +1,238 @@
+# result_cache.py — LRU-Cache mit Ablaufzeit für Suchergebnisse
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+import config
+from actor_index import normalize_name
+
+
+# Standardwerte (können in config.py über RESULT_CACHE_CONFIG überschrieben werden)
+DEFAULT_CACHE_CONFIG = {
+    "max_entries": 256,   # Maximale Anzahl gespeicherter Suchergebnisse (0 = Cache aus)
+    "ttl": 300,           # Gültigkeitsdauer eines Eintrags in Sekunden
+    "max_bytes": 64 * 1024 * 1024,   # Speicherbudget aller Einträge (geschätzt; 0 = unbegrenzt)
+}
+
+
+def normalize_value(value, name=None):
+    """
+    Vereinheitlicht einen Parameterwert für den Cache-Schlüssel.
+    Texte werden kleingeschrieben, da MySQL bei den Sakila-Spalten ohne Beachtung der
+    Groß-/Kleinschreibung vergleicht. Schauspielernamen werden wie im actor_index
+    verglichen (mehrfache Leerzeichen zählen als eines). Beim Stichwort bleiben
+    Leerzeichen erhalten: enthält es zu kurze Wörter, wird das ganze Stichwort per
+    LIKE '%...%' verglichen (keyword_search.py), "a  b" und "a b" liefern dann
+    verschiedene Treffer.
+    Args:
+        value: Parameterwert.
+        name (str, optional): Name des Parameters (z. B. "actor").
+    """
+    if isinstance(value, str):
+        return normalize_name(value) if name == "actor" else value.lower()
+    return value
+
+
+def make_cache_key(search_type, **params):
+    """
+    Erstellt einen hashbaren Schlüssel aus Suchtyp und Suchparametern.
+    Args:
+        search_type (str): Suchtyp (z. B. "keyword", "genre", "actor").
+        **params: Suchparameter.
+    Returns:
+        tuple: (search_type, ((name, wert), ...)) mit sortierten Parametern.
+    """
+    return (search_type, tuple(sorted((k, normalize_value(v, k)) for k, v in params.items())))
+
+
+def estimate_size(value):
+    """
+    Schätzt den Speicherbedarf eines Suchergebnisses in Bytes.
+    Objekte mit memory_size() (PagedQuery, ColumnarResult) schätzen sich selbst,
+    Listen und Tupel werden elementweise gezählt.
+    """
+    if hasattr(value, "memory_size"):
+        return value.memory_size()
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Thread-sicherer LRU-Cache mit Ablaufzeit (TTL) pro Eintrag und Speicherbudget.
+    Die Größe eines Eintrags wird beim Speichern geschätzt (estimate_size).
+    """
+
+    def __init__(self, max_entries=256, ttl=300, max_bytes=0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # Schlüssel -> (Ablaufzeitpunkt, Wert, Größe)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key, default=None):
+        """
+        Liefert den gespeicherten Wert oder default, falls nicht vorhanden bzw. abgelaufen.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                self._remove(key)
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return default
+
+    def _remove(self, key):
+        """
+        Entfernt einen Eintrag und zieht seine Größe ab (Aufrufer hält self._lock).
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+        return entry
+
+    def put(self, key, value, ttl=None):
+        """
+        Speichert einen Wert; bei vollem Cache bzw. überschrittenem Speicherbudget werden
+        die am längsten ungenutzten Einträge entfernt. Ein Wert, der allein größer als das
+        Budget ist, wird nicht gespeichert.
+        Args:
+            key (tuple): Schlüssel aus make_cache_key.
+            value: Zu speichernder Wert.
+            ttl (float, optional): Eigene Gültigkeitsdauer in Sekunden. Standard self.ttl.
+        Returns:
+            int: Geschätzte Größe des Werts in Bytes (0, wenn er nicht gespeichert wurde).
+        """
+        if self.max_entries <= 0:
+            return 0
+        size = estimate_size(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return 0
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+        if self.max_bytes and hasattr(value, "on_page_loaded"):
+            # PagedQuery wächst mit jeder angezeigten Seite: Größe nachträglich anrechnen
+            value.on_page_loaded = partial(self._grow, key, value)
+        return size
+
+    def _grow(self, key, value, added):
+        """
+        Rechnet nachträglich geladene Daten eines Eintrags an (siehe PagedQuery.on_page_loaded).
+        Bei überschrittenem Budget werden zuerst die am längsten ungenutzten anderen
+        Einträge entfernt; passt der Eintrag allein nicht mehr, wird er selbst entfernt.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] is not value:
+                return
+            expires_at, _, size = entry
+            self._entries[key] = (expires_at, value, size + added)
+            self._bytes += added
+            if size + added > self.max_bytes:
+                self._remove(key)
+                self._stats["evictions"] += 1
+                return
+            for other in [k for k in self._entries if k != key]:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._remove(other)
+                self._stats["evictions"] += 1
+
+    def get_or_load(self, key, loader):
+        """
+        Liefert den Wert aus dem Cache oder lädt ihn mit loader() und speichert ihn.
+        Args:
+            key (tuple): Schlüssel aus make_cache_key.
+            loader (callable): Funktion ohne Argumente, die den Wert berechnet.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = loader()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, search_type=None):
+        """
+        Entfernt Einträge aus dem Cache.
+        Args:
+            search_type (str, optional): Nur Einträge dieses Suchtyps entfernen; None entfernt alles.
+        Returns:
+            int: Anzahl der entfernten Einträge.
+        """
+        with self._lock:
+            if search_type is None:
+                keys = list(self._entries)
+            else:
+                keys = [key for key in self._entries if key[0] == search_type]
+            for key in keys:
+                self._remove(key)
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def invalidate_key(self, key):
+        """
+        Entfernt genau einen Eintrag. Returns: True, falls er vorhanden war.
+        """
+        with self._lock:
+            removed = self._remove(key) is not None
+            if removed:
+                self._stats["invalidations"] += 1
+            return removed
+
+    def get_stats(self):
+        """
+        Liefert die Zähler des Caches (hits, misses, evictions, ...) und die aktuelle Größe.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """
+    Liefert den gemeinsamen Ergebnis-Cache (wird beim ersten Aufruf erstellt).
+    Returns:
+        ResultCache: Cache mit den Einstellungen aus RESULT_CACHE_CONFIG.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = {**DEFAULT_CACHE_CONFIG, **getattr(config, "RESULT_CACHE_CONFIG", {})}
+            _cache = ResultCache(**settings)
+    return _cache
+
+
+def set_result_cache(cache):
+    """
+    Ersetzt den gemeinsamen Ergebnis-Cache, z. B. durch ResultCache(max_entries=0),
+    damit Lasttests jede Suche an die Datenbank schicken.
+    Args:
+        cache (ResultCache): Neuer Cache.
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,277 @@
+# sakila_standin.py — Lokale SQLite-Ersatzdatenbank mit dem Sakila-Schema
+#
+# Dient Benchmarks und Lasttests ohne MySQL-Server. Die Verbindung verhält sich wie eine
+# pymysql-Verbindung und übersetzt die von search.py verwendeten MySQL-Besonderheiten
+# (Platzhalter %s, CONCAT, GROUP_CONCAT, MATCH ... AGAINST, @@-Variablen, information_schema).
+
+import os
+import random
+import re
+import sqlite3
+from datetime import datetime, timedelta
+
+import pymysql
+
+# Teilmenge des Sakila-Schemas, die von der Filmsuche verwendet wird
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS category (
+    category_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    last_update TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS actor (
+    actor_id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    last_update TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_actor_last_name ON actor (last_name);
+CREATE TABLE IF NOT EXISTS film (
+    film_id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    release_year INTEGER,
+    rating TEXT,
+    length INTEGER,
+    last_update TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_title ON film (title);
+CREATE TABLE IF NOT EXISTS film_category (
+    film_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    last_update TEXT NOT NULL,
+    PRIMARY KEY (film_id, category_id)
+);
+CREATE INDEX IF NOT EXISTS fk_film_category_category ON film_category (category_id);
+CREATE TABLE IF NOT EXISTS film_actor (
+    actor_id INTEGER NOT NULL,
+    film_id INTEGER NOT NULL,
+    last_update TEXT NOT NULL,
+    PRIMARY KEY (actor_id, film_id)
+);
+CREATE INDEX IF NOT EXISTS idx_fk_film_id ON film_actor (film_id);
+CREATE TABLE IF NOT EXISTS film_text (
+    film_id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT
+);
+"""
+
+GENRES = ["Action", "Animation", "Children", "Classics", "Comedy", "Documentary", "Drama", "Family",
+          "Foreign", "Games", "Horror", "Music", "New", "Sci-Fi", "Sports", "Travel"]
+RATINGS = ["G", "PG", "PG-13", "R", "NC-17"]
+TITLE_WORDS = ["ACADEMY", "DINOSAUR", "ACE", "GOLDFINGER", "ADAPTATION", "HOLES", "AFFAIR", "PREJUDICE",
+               "AGENT", "TRUMAN", "AIRPLANE", "SIERRA", "ALABAMA", "DEVIL", "ALADDIN", "CALENDAR",
+               "ALAMO", "VIDEOTAPE", "ALASKA", "PHANTOM", "ALI", "FOREVER", "ALICE", "FANTASIA",
+               "LOVE", "ROBOT", "MOON", "SHARK", "BOAT", "TEACHER", "EPIC", "GIRL", "DOG", "CHAMBER"]
+DESCRIPTION_WORDS = ["Epic", "Drama", "Feminist", "Mad Scientist", "Teacher", "Canadian Rockies",
+                     "Astounding", "Reflection", "Crocodile", "Squirrel", "Ancient India", "Fateful",
+                     "Moose", "Dentist", "Shark", "Boat", "Robot", "Love", "Moon", "Girl", "Dog"]
+FIRST_NAMES = ["PENELOPE", "NICK", "ED", "JENNIFER", "JOHNNY", "BETTE", "GRACE", "MATTHEW", "JOE",
+               "CHRISTIAN", "ZERO", "KARL", "UMA", "VIVIEN", "CUBA", "FRED", "HELEN", "DAN", "BOB", "LUCILLE"]
+LAST_NAMES = ["GUINESS", "WAHLBERG", "CHASE", "DAVIS", "LOLLOBRIGIDA", "NICHOLSON", "MOSTEL",
+              "JOHANSSON", "SWANK", "GABLE", "CAGE", "BERRY", "WOOD", "BERGEN", "OLIVIER", "COSTNER",
+              "VOIGHT", "TORN", "FAWCETT", "TRACY"]
+
+# Servervariablen, die search.py bzw. keyword_search.py abfragen
+SERVER_VARIABLES = {"innodb_ft_min_token_size": 3, "ft_min_word_len": 4}
+
+_MATCH_RE = re.compile(r"MATCH\s*\(([^)]*)\)\s*AGAINST\s*\(\s*%s\s+IN\s+BOOLEAN\s+MODE\s*\)", re.IGNORECASE)
+_VARIABLE_RE = re.compile(r"@@(\w+)")
+_GROUP_CONCAT_RE = re.compile(r"GROUP_CONCAT\(DISTINCT (.+?) ORDER BY .+? SEPARATOR ('[^']*')\)", re.IGNORECASE)
+_WORD_RE = re.compile(r"\w+")
+
+
+def translate_query(query):
+    """
+    Übersetzt eine MySQL-Abfrage aus search.py in SQLite-Syntax.
+    """
+    query = _MATCH_RE.sub(r"FT_MATCH(\1, %s)", query)
+    query = _VARIABLE_RE.sub(r"SERVER_VARIABLE('\1')", query)
+    query = _GROUP_CONCAT_RE.sub(r"GROUP_CONCAT_SORTED(\1, \2)", query)
+    return query.replace("%s", "?")
+
+
+def _concat(*values):
+    # Wie in MySQL: NULL, sobald ein Argument NULL ist
+    if any(v is None for v in values):
+        return None
+    return "".join(str(v) for v in values)
+
+
+def _ft_match(*args):
+    """
+    Nachbildung von MATCH ... AGAINST (... IN BOOLEAN MODE) für Suchbegriffe der Form +wort*.
+    Liefert die Anzahl der Treffer als Relevanz, 0 wenn ein Pflichtwort fehlt.
+    """
+    *columns, against = args
+    tokens = _WORD_RE.findall(" ".join(c for c in columns if c).lower())
+    score = 0
+    for term in against.split():
+        required = term.startswith("+")
+        word = term.strip("+-*\"").lower()
+        hits = sum(1 for token in tokens if token.startswith(word)) if term.endswith("*") \
+            else tokens.count(word)
+        if required and not hits:
+            return 0
+        score += hits
+    return score
+
+
+class _GroupConcatSorted:
+    """
+    Nachbildung von GROUP_CONCAT(DISTINCT ... ORDER BY ... SEPARATOR ...), sortiert nach dem Wert.
+    """
+
+    def __init__(self):
+        self.values = set()
+        self.separator = ","
+
+    def step(self, value, separator):
+        if value is not None:
+            self.values.add(value)
+        self.separator = separator
+
+    def finalize(self):
+        return self.separator.join(str(v) for v in sorted(self.values)) if self.values else None
+
+
+class StandinCursor:
+    """
+    Cursor mit der Schnittstelle eines pymysql-Cursors (Kontextmanager, execute, fetch*).
+    """
+
+    def __init__(self, connection):
+        self._cursor = connection.cursor()
+
+    def execute(self, query, params=()):
+        self._cursor.execute(translate_query(query), tuple(params or ()))
+        return self._cursor.rowcount
+
+    def fetchall(self):
+        return tuple(self._cursor.fetchall())
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return tuple(self._cursor.fetchmany(size))
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StandinConnection:
+    """
+    SQLite-Verbindung mit der Schnittstelle einer pymysql-Verbindung.
+    """
+
+    def __init__(self, path):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.create_function("CONCAT", -1, _concat)
+        self._connection.create_function("FT_MATCH", -1, _ft_match)
+        self._connection.create_function("SERVER_VARIABLE", 1, SERVER_VARIABLES.get)
+        self._connection.create_function("DATABASE", 0, lambda: "sakila")
+        self._connection.create_aggregate("GROUP_CONCAT_SORTED", 2, _GroupConcatSorted)
+        # information_schema als angehängte In-Memory-Datenbank nachbilden
+        self._connection.execute("ATTACH DATABASE ':memory:' AS information_schema")
+        self._connection.execute(
+            "CREATE TABLE information_schema.TABLES (TABLE_SCHEMA TEXT, TABLE_NAME TEXT, ENGINE TEXT)")
+        self._connection.execute("INSERT INTO information_schema.TABLES VALUES ('sakila', 'film_text', 'InnoDB')")
+        self._connection.execute("CREATE TABLE information_schema.INNODB_FT_DEFAULT_STOPWORD (value TEXT)")
+        self._connection.executemany("INSERT INTO information_schema.INNODB_FT_DEFAULT_STOPWORD VALUES (?)",
+                                     [(w,) for w in ("a", "an", "and", "in", "of", "the", "who")])
+
+    def cursor(self):
+        return StandinCursor(self._connection)
+
+    def ping(self, reconnect=False):
+        self._connection.execute("SELECT 1")
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+
+def connect_standin(path, **_ignored):
+    """
+    Öffnet eine Verbindung zur Ersatzdatenbank (Signatur kompatibel zu pymysql.connect).
+    Fehlt die Datei, gilt der Ersatzserver als nicht erreichbar (wie MySQL-Fehler 2003);
+    so lassen sich Ausfälle z. B. von Replikaten (replica_router.py) nachstellen.
+    """
+    if not os.path.exists(path):
+        raise pymysql.err.OperationalError(2003, f"Can't connect to stand-in server '{path}'")
+    return StandinConnection(path)
+
+
+def create_standin_database(path, films=1000, seed=42, second_genre_share=0.25):
+    """
+    Legt die Ersatzdatenbank an und füllt sie mit synthetischen, reproduzierbaren Daten
+    in den Proportionen von Sakila (16 Genres, ca. 5 Schauspieler pro Film, 1 Schauspieler/in
+    je 5 Filme). Anders als in Sakila hat ein Teil der Filme ein zweites Genre, damit die
+    Sonderfälle mehrerer Genres pro Film (EXISTS-Bedingungen, GROUP_CONCAT) vorkommen.
+    Args:
+        path (str): Pfad der SQLite-Datei.
+        films (int, optional): Anzahl der Filme.
+        seed (int, optional): Startwert des Zufallsgenerators.
+        second_genre_share (float, optional): Anteil der Filme mit zweitem Genre (0 = wie Sakila).
+    """
+    rng = random.Random(seed)
+    # Eigener Generator, damit die übrigen Daten unabhängig vom Anteil gleich bleiben
+    genre_rng = random.Random(seed + 1)
+    now = datetime(2024, 1, 1)
+    stamp = now.strftime("%Y-%m-%d %H:%M:%S")
+    actors = max(films // 5, 20)
+
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    for table in ("film_text", "film_actor", "film_category", "film", "actor", "category"):
+        connection.execute(f"DELETE FROM {table}")
+
+    connection.executemany("INSERT INTO category VALUES (?, ?, ?)",
+                           [(i, name, stamp) for i, name in enumerate(GENRES, 1)])
+    connection.executemany("INSERT INTO actor VALUES (?, ?, ?, ?)", [
+        (i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+         (now - timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"))
+        for i in range(1, actors + 1)
+    ])
+
+    batch_size = 10000
+    for start in range(1, films + 1, batch_size):
+        film_rows, text_rows, category_rows, actor_rows = [], [], [], []
+        for film_id in range(start, min(start + batch_size, films + 1)):
+            title = f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {film_id}"
+            description = (f"A {rng.choice(DESCRIPTION_WORDS)} {rng.choice(DESCRIPTION_WORDS)} of a "
+                           f"{rng.choice(DESCRIPTION_WORDS)} who must meet a {rng.choice(DESCRIPTION_WORDS)}")
+            film_rows.append((film_id, title, description, rng.randint(1990, 2024),
+                              rng.choice(RATINGS), rng.randint(46, 185), stamp))
+            text_rows.append((film_id, title, description))
+            genre = rng.randint(1, len(GENRES))
+            category_rows.append((film_id, genre, stamp))
+            if genre_rng.random() < second_genre_share:
+                second = genre_rng.randint(1, len(GENRES) - 1)
+                category_rows.append((film_id, second + (second >= genre), stamp))
+            for actor_id in rng.sample(range(1, actors + 1), min(5, actors)):
+                actor_rows.append((actor_id, film_id, stamp))
+        connection.executemany("INSERT INTO film VALUES (?, ?, ?, ?, ?, ?, ?)", film_rows)
+        connection.executemany("INSERT INTO film_text VALUES (?, ?, ?)", text_rows)
+        connection.executemany("INSERT INTO film_category VALUES (?, ?, ?)", category_rows)
+        connection.executemany("INSERT INTO film_actor VALUES (?, ?, ?)", actor_rows)
+    connection.commit()
+    connection.execute("ANALYZE")
+    connection.close()
@@ -1,30 +1,180 @@
 # search.py
 
-import pymysql
-from config import MYSQL_CONFIG
-from tabulate import tabulate
-from formatter import *
+import time
+import instrumentation
+from db_pool import get_pool, CONNECTION_ERRORS
+from film_query import build_film_query, DEFAULT_COLUMNS
+from columnar import ColumnarResult
+from async_query import gather_calls, run_blocking
+from result_cache import get_result_cache, make_cache_key
+from reference_cache import get_reference_cache
+from slow_query import current_search, get_slow_query_log
 
 def get_connection():
     """
-    Erstellt und gibt eine Verbindung zur MySQL-Datenbank zurück.
+    Leiht eine Verbindung aus dem gemeinsamen Verbindungspool aus.
+    Verwendung als Kontextmanager: die Verbindung wird danach an den Pool zurückgegeben.
     """
-    return pymysql.connect(**MYSQL_CONFIG)
+    return get_pool().connection()
 
 
 def execute_query(query, params=None):
     """
     Führt eine SQL-Abfrage aus und gibt alle Ergebnisse zurück.
+    Bei einem Verbindungsfehler wird die Abfrage einmal mit einer neuen Verbindung wiederholt.
+    Ist die Messung aktiv (instrumentation), werden die Phasen connect/execute/fetch erfasst;
+    Abfragen über dem Schwellwert aus SLOW_QUERY_CONFIG werden samt EXPLAIN-Plan protokolliert
+    (zugeordnet dem Suchtyp aus slow_query.current_search, sonst der aufrufenden Funktion).
+    Sind Lese-Replikate konfiguriert (MYSQL_REPLICAS), verteilt get_pool() die Abfragen auf
+    sie (replica_router.py); die Wiederholung nach einem Verbindungsfehler kann so auf einem
+    anderen Server laufen.
     Args:
         query (str): SQL-Abfrage mit Platzhaltern (%s).
         params (tuple | list | None, optional): Parameter für Platzhalter. Standard None.
     Returns:
         list[tuple]: Ergebnisliste, wobei jede Zeile ein Tupel von Werten ist.
     """
+    for attempt in range(2):
+        try:
+            started = time.perf_counter()
+            with get_connection() as connection:
+                connected = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params or ())
+                    executed = time.perf_counter()
+                    rows = cursor.fetchall()
+            finished = time.perf_counter()
+            if instrumentation.enabled:
+                instrumentation.record_query(connected - started, executed - connected,
+                                             finished - executed, rows)
+            slow_query_log = get_slow_query_log(explain_query)
+            if slow_query_log.is_slow(finished - started):
+                slow_query_log.capture(query, params, finished - started)
+            return rows
+        except CONNECTION_ERRORS:
+            # Defekte Verbindung wurde vom Pool verworfen; nur lesende Abfragen, daher sicher wiederholbar
+            if attempt == 1:
+                raise
+
+
+async def execute_query_async(query, params=None):
+    """
+    Wie execute_query, aber als Coroutine für asyncio (läuft im Thread-Pool von async_query).
+    Unabhängige Abfragen können so mit asyncio.gather gleichzeitig ausgeführt werden.
+    """
+    return await run_blocking(execute_query, query, params)
+
+
+def explain_query(query, params=None):
+    """
+    Liefert den Ausführungsplan einer Abfrage (EXPLAIN FORMAT=JSON).
+    Args:
+        query (str): SQL-Abfrage mit Platzhaltern (%s).
+        params (tuple | list | None, optional): Parameter für Platzhalter.
+    Returns:
+        str: Plan als JSON-Text.
+    """
     with get_connection() as connection:
         with connection.cursor() as cursor:
-            cursor.execute(query, params or ())
-            return cursor.fetchall()
+            cursor.execute("EXPLAIN FORMAT=JSON " + query, params or ())
+            return cursor.fetchone()[0]
+
+
+def collect_results(query, paged):
+    """
+    Liefert das Suchergebnis je nach Modus seitenweise oder vollständig.
+    Args:
+        query (PagedQuery): Vorbereitete Suchabfrage.
+        paged (bool): True — lazy PagedQuery (lädt nur die angezeigte Seite),
+            False — alle Zeilen spaltenweise und speichersparend (ColumnarResult).
+    Returns:
+        PagedQuery | ColumnarResult: Ergebniszeilen.
+    """
+    if not paged:
+        return ColumnarResult.from_rows(query.fetch_all())
+    # COUNT und erste Seite gleichzeitig laden (eine Latenz statt zwei)
+    query.load_first_page(gather_calls)
+    return query
+
+
+def cached_results(search_type, params, query, paged, refresh=False):
+    """
+    Liefert das Suchergebnis aus dem Ergebnis-Cache oder lädt es aus der Datenbank.
+    Args:
+        search_type (str): Suchtyp (Teil des Cache-Schlüssels).
+        params (dict): Suchparameter (Teil des Cache-Schlüssels).
+        query (PagedQuery): Vorbereitete Suchabfrage.
+        paged (bool): Siehe collect_results.
+        refresh (bool, optional): Immer aus der Datenbank laden und den Cache-Eintrag
+            ersetzen (z. B. beim Vorwärmen, siehe cache_warmer.py).
+    Returns:
+        PagedQuery | ColumnarResult: Ergebniszeilen.
+    """
+    key = make_cache_key(search_type, paged=paged, **params)
+    if refresh:
+        results = collect_results(query, paged)
+        get_result_cache().put(key, results)
+        return results
+    return get_result_cache().get_or_load(key, lambda: collect_results(query, paged))
+
+
+def search_films(filters, columns=DEFAULT_COLUMNS, search_type="films", group_films=False, paged=True,
+                 refresh=False):
+    """
+    Suche von Filmen mit beliebiger Kombination von Filtern in einer einzigen Abfrage.
+    Args:
+        filters (dict): Filter (keyword, genre, actor, year, year_from, year_to, rating,
+            length_min, length_max); Werte None werden ignoriert.
+        columns (tuple[str], optional): Ausgabespalten (siehe film_query.COLUMNS).
+        search_type (str, optional): Suchtyp für den Ergebnis-Cache.
+        group_films (bool, optional): Genau eine Zeile pro Film (Genres zusammengefasst,
+            len() ist die tatsächliche Anzahl der Filme). Standard False.
+        paged (bool, optional): Nur die angezeigte Seite laden. Standard True.
+        refresh (bool, optional): Ergebnis-Cache umgehen und den Eintrag neu laden.
+    Returns:
+        PagedQuery | ColumnarResult: Liste der Filme als Tupel.
+        List[str]: Spaltenüberschriften für die Ausgabe.
+    """
+    # Langsame Abfragen dieser Suche (auch später geladene Seiten) dem Suchtyp zuordnen
+    token = current_search.set(search_type)
+    try:
+        query, headers = build_film_query(execute_query, filters, columns, group_films)
+        if query is None:
+            return [], headers
+
+        params = {**filters, "columns": ",".join(columns), "group_films": group_films}
+        return cached_results(search_type, params, query, paged, refresh), headers
+    finally:
+        current_search.reset(token)
+
+
+# Suchtypen des Menüs: Ausgabespalten und Gruppierung (eine Zeile pro Film) für search_films
+SEARCH_TYPES = {
+    "keyword": (DEFAULT_COLUMNS, True),
+    "genre": (("title", "genre", "year", "rating", "length"), True),
+    "genre_year": (DEFAULT_COLUMNS, True),
+    "genre_year_range": (DEFAULT_COLUMNS, True),
+    "actor": (("actor",) + DEFAULT_COLUMNS, True),
+}
+
+
+def run_search(search_type, params, paged=True, refresh=False):
+    """
+    Führt eine Suche eines Menü-Suchtyps ohne Ein- und Ausgabe aus (z. B. für Stapelverarbeitung).
+    Args:
+        search_type (str): Suchtyp aus SEARCH_TYPES oder "films" (beliebige Filter, Standardspalten).
+        params (dict): Filter wie bei search_films (genre als category_id, year_from/year_to usw.).
+        paged (bool, optional): Nur die angezeigte Seite laden. Standard True.
+        refresh (bool, optional): Ergebnis-Cache umgehen und den Eintrag neu laden.
+    Returns:
+        PagedQuery | ColumnarResult: Liste der Filme als Tupel.
+        List[str]: Spaltenüberschriften für die Ausgabe.
+    """
+    if search_type not in SEARCH_TYPES and search_type != "films":
+        raise ValueError(f"Unbekannter Suchtyp: {search_type}")
+    columns, group_films = SEARCH_TYPES.get(search_type, (DEFAULT_COLUMNS, False))
+    return search_films(params, columns=columns, search_type=search_type, group_films=group_films, paged=paged,
+                        refresh=refresh)
 
 
 def get_search_keyword():
@@ -41,51 +191,39 @@ def get_search_keyword():
     return keyword
 
 
-def search_film_by_title(keyword):
+def search_film_by_title(keyword, paged=True):
     """
     Suche von Filmen nach Schlüsselwort im Titel oder in der Beschreibung.
     Args:
         keyword (str): Schlüsselwort für die Suche
+        paged (bool, optional): Nur die angezeigte Seite laden. Standard True.
     Returns:
-        List[Row]: Liste der Filme, jede Zeile als Tupel.
+        PagedQuery | ColumnarResult: Liste der Filme, jede Zeile als Tupel.
         List[str]: Liste der Spaltenüberschriften für die Ausgabe.
     """
-    # SQL-Abfrage zur Filmsuche nach Schlüsselwort
-    query = """
-        SELECT f.title, f.release_year, c.name, f.rating, f.length
-        FROM film f
-        JOIN film_category fc ON f.film_id = fc.film_id
-        JOIN category c ON fc.category_id = c.category_id
-        WHERE f.title LIKE %s OR f.description LIKE %s
-    """
-    
-    # Alle Ergebnisse der SQL-Abfrage in der Variable results speichern
-    results = execute_query(query, ('%' + keyword + '%', '%' + keyword + '%'))
+    # Ergebnisse (aus dem Cache, seitenweise oder vollständig) in der Variable results speichern
+    results, columns = run_search("keyword", {"keyword": keyword}, paged=paged)
 
     if not results:
         print("Keine Filme gefunden.")
     else:
         print(f"\nGefundene Filme für das Schlüsselwort {keyword}: insgesamt {len(results)}")
 
-    # Spaltenüberschriften für die paginierte Ausgabe
-    columns = ["Titel", "Erscheinungsjahr", "Genre", "Bewertung", "Laufzeit"]
-        
-    return list(results), columns
+    return results, columns
 
 
 def get_all_genres():
     """
-    Suche aller einzigartigen Genres.
+    Suche aller einzigartigen Genres (aus dem Stammdaten-Cache, siehe reference_cache.py).
     Returns:
         List[Row]: Liste der Genres als Tupel.
     """
-    # SQL-Abfrage zur Suche eindeutiger Genres
-    query = """
-        SELECT category_id, name
-        FROM category
-        ORDER BY name
-    """
-    results = execute_query(query)
+    # Abfragen laufen gleichzeitig in Worker-Threads (reference_cache): Zuordnung über den Kontext
+    token = current_search.set("get_all_genres")
+    try:
+        results = get_reference_cache(execute_query).get_genres()
+    finally:
+        current_search.reset(token)
 
     # Ausgabe der Ergebnisse für den Benutzer
     print("\nFolgende Filmgenres stehen zur Suche zur Verfügung:")
@@ -93,34 +231,28 @@ def get_all_genres():
     for row in results:
         print(f"{row[0]}. {row[1]}")
         
-    return list(results)
+    return results
 
 
 def get_year_range():
     """
-    Liefert das minimale und maximale Erscheinungsjahr der Filme.
+    Liefert das minimale und maximale Erscheinungsjahr der Filme (aus dem Stammdaten-Cache).
     Returns:
         tuple: Tupel (min_year, max_year)
     """
-    with pymysql.connect(**MYSQL_CONFIG) as connection:
-        with connection.cursor() as cursor:
-            # SQL-Abfrage zur Suche nach minimalem und maximalem Jahr
-            query = """
-                SELECT MIN(release_year) AS min_year, MAX(release_year) AS max_year
-                FROM film
-            """
-            cursor.execute(query)
-            
-            result = cursor.fetchone()  # Eine Zeile (min_year, max_year)
-
-            # Ausgabe für den Benutzer
-            if result:
-                min_year, max_year = result
-                print(f"\nErscheinungsjahre der Filme: {min_year} — {max_year}")
-                print("_" * 60)
-                return min_year, max_year
-            else:
-                return None, None
+    token = current_search.set("get_year_range")
+    try:
+        min_year, max_year = get_reference_cache(execute_query).get_year_range()
+    finally:
+        current_search.reset(token)
+
+    # Ausgabe für den Benutzer
+    if min_year is not None:
+        print(f"\nErscheinungsjahre der Filme: {min_year} — {max_year}")
+        print("_" * 60)
+        return min_year, max_year
+    else:
+        return None, None
 
 
 def get_valid_genre_num(genres):
@@ -150,34 +282,24 @@ def get_valid_genre_num(genres):
             print("\nUngültige Eingabe. Bitte geben Sie eine ganze Zahl ein.")
 
 
-def search_film_by_genre(genre_num):
+def search_film_by_genre(genre_num, paged=True):
     """
     Suche von Filmen nach Genre-Nummer.
     Args:
         genre_num (int): Genre-Nummer
+        paged (bool, optional): Nur die angezeigte Seite laden. Standard True.
     Returns:
-        List[Row]: Liste der Filme als Tupel.
+        PagedQuery | ColumnarResult: Liste der Filme als Tupel.
         List[str]: Spaltenüberschriften für die Ausgabe.
     """
-    query = """
-        SELECT f.title, c.name AS genre, f.release_year, f.rating, f.length
-        FROM film f
-        JOIN film_category fc ON f.film_id = fc.film_id
-        JOIN category c ON fc.category_id = c.category_id
-        WHERE c.category_id = %s                
-        ORDER BY f.title
-    """
-          
-    results = execute_query(query, (genre_num,))            
+    results, columns = run_search("genre", {"genre": genre_num}, paged=paged)
 
     if not results:
         print("\nKeine Filme gefunden.")
     else:
         print(f"Insgesamt gefundene Filme: {len(results)}")
 
-    columns = ["Titel", "Genre", "Erscheinungsjahr", "Bewertung", "Laufzeit"]        
-        
-    return list(results), columns
+    return results, columns
 
 
 def get_valid_year(min_year, max_year):
@@ -200,33 +322,25 @@ def get_valid_year(min_year, max_year):
             print("\nUngültige Eingabe. Bitte geben Sie eine ganze Zahl ein.")
 
 
-def search_film_by_genre_and_year(genre_num, year):
+def search_film_by_genre_and_year(genre_num, year, paged=True):
     """
     Suche von Filmen nach Genre und spezifischem Erscheinungsjahr.
     Args:
         genre_num (int): Genre-Nummer aus der Tabelle category.
         year (int): Erscheinungsjahr für die Suche.
+        paged (bool, optional): Nur die angezeigte Seite laden. Standard True.
     Returns:
-        List[Row]: Liste der Filme als Tupel.
+        PagedQuery | ColumnarResult: Liste der Filme als Tupel.
         List[str]: Spaltenüberschriften für die Ausgabe.
     """
-    query = """
-        SELECT f.title, f.release_year, c.name, f.rating, f.length
-        FROM film f
-        JOIN film_category fc ON f.film_id = fc.film_id
-        JOIN category c ON fc.category_id = c.category_id
-        WHERE fc.category_id = %s AND f.release_year = %s
-    """
-    results = execute_query(query, (genre_num, year)) 
+    results, columns = run_search("genre_year", {"genre": genre_num, "year": year}, paged=paged)
 
     if not results:
         print("Keine Filme gefunden.")
     else:
         print(f"\nInsgesamt gefundene Filme: {len(results)}")
-        
-    columns = ["Titel", "Erscheinungsjahr", "Genre", "Bewertung", "Laufzeit"]        
-        
-    return list(results), columns
+
+    return results, columns
 
 
 def get_valid_year_range(min_year, max_year):
@@ -256,37 +370,28 @@ def get_valid_year_range(min_year, max_year):
             print("\nUngültige Eingabe. Bitte geben Sie ganze Zahlen ein.")
 
 
-def search_film_by_genre_and_year_range(genre_id, start_year, end_year):
+def search_film_by_genre_and_year_range(genre_id, start_year, end_year, paged=True):
     """
     Suche von Filmen nach Genre und Jahresbereich.
     Args:
         genre_id (int): Genre-Nummer aus der Tabelle category.
         start_year (int): Startjahr des Bereichs.
         end_year (int): Endjahr des Bereichs.
+        paged (bool, optional): Nur die angezeigte Seite laden. Standard True.
     Returns:
-        List[Row]: Liste der Filme als Tupel.
+        PagedQuery | ColumnarResult: Liste der Filme als Tupel.
         List[str]: Liste der Spaltenüberschriften für die Ausgabe.
     """
-    # SQL-Abfrage zur Suche von Filmen nach Genre und Jahresbereich
-    query = """
-        SELECT f.title, f.release_year, c.name, f.rating, f.length
-        FROM film f
-        JOIN film_category fc ON f.film_id = fc.film_id
-        JOIN category c ON fc.category_id = c.category_id
-        WHERE fc.category_id = %s AND f.release_year BETWEEN %s AND %s
-    """
-    # Alle Ergebnisse der SQL-Abfrage in der Variable results speichern
-    results = execute_query(query, (genre_id, start_year, end_year))
+    # Ergebnisse (aus dem Cache, seitenweise oder vollständig) in der Variable results speichern
+    results, columns = run_search("genre_year_range",
+                                  {"genre": genre_id, "year_from": start_year, "year_to": end_year}, paged=paged)
 
     if not results:
         print("Keine Filme gefunden.")
     else:
         print(f"\nInsgesamt gefundene Filme: {len(results)}")
-        
-    # Spaltenüberschriften für die paginierte Ausgabe
-    columns = ["Titel", "Erscheinungsjahr", "Genre", "Bewertung", "Laufzeit"]        
-        
-    return list(results), columns
+
+    return results, columns
 
 
 def get_search_actor():
@@ -303,36 +408,22 @@ def get_search_actor():
     return actor
 
 
-def search_film_by_actor(actor):
+def search_film_by_actor(actor, paged=True):
     """
     Suche von Filmen nach Name eines Schauspielers/einer Schauspielerin (oder einem Teil davon).
     Args:
         actor (str): Schlüsselwort für die Suche
+        paged (bool, optional): Nur die angezeigte Seite laden. Standard True.
     Returns:
-        List[Row]: Liste der Filme als Tupel.
+        PagedQuery | ColumnarResult: Liste der Filme als Tupel.
         List[str]: Liste der Spaltenüberschriften für die Ausgabe.
     """
-    # SQL-Abfrage zur Suche von Filmen nach Name des Schauspielers/der Schauspielerin
-    query = """
-        SELECT CONCAT(a.first_name, ' ', a.last_name), f.title, f.release_year, c.name, f.rating, f.length
-        FROM film f
-        JOIN film_actor fa ON f.film_id = fa.film_id
-        JOIN actor a ON fa.actor_id = a.actor_id
-        JOIN film_category fc ON f.film_id = fc.film_id
-        JOIN category c ON fc.category_id = c.category_id
-        WHERE CONCAT(a.first_name, ' ', a.last_name) LIKE %s
-        ORDER BY a.last_name ASC, a.first_name ASC, f.release_year DESC
-    """
-            
-    # Alle Ergebnisse der SQL-Abfrage in der Variable results speichern
-    results = execute_query(query, ('%' + actor + '%',))
+    # Ergebnisse (seitenweise oder vollständig) in der Variable results speichern
+    results, columns = run_search("actor", {"actor": actor}, paged=paged)
 
     if not results:
         print("Keine Filme gefunden.")
     else:
         print(f"\nInsgesamt gefundene Filme: {len(results)}")
-        
-    # Spaltenüberschriften für die paginierte Ausgabe
-    columns = ["Name des Schauspielers/der Schauspielerin", "Titel", "Erscheinungsjahr", "Genre", "Bewertung", "Laufzeit"]        
-        
-    return list(results), columns
\ No newline at end of file
+
+    return results, columns
\ No newline at end of file
@@ -0,0 +1,233 @@
+# slow_query.py — Erfassung langsamer SQL-Abfragen mit EXPLAIN-Plan
+#
+# Bericht über die erfassten Abfragen:
+#   python slow_query.py report
+
+import atexit
+import contextvars
+import json
+import queue
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+import config
+
+
+# Standardwerte (können in config.py über SLOW_QUERY_CONFIG überschrieben werden)
+DEFAULT_SLOW_QUERY_CONFIG = {
+    "threshold_ms": 500,              # Abfragen ab dieser Dauer werden erfasst (None = aus)
+    "store_path": "slow_queries.jsonl",
+    "queue_size": 100,                # Maximale Anzahl wartender Erfassungen
+}
+
+# Suchtyp der laufenden Suche (gesetzt von search.search_films, für die Stammdaten von
+# search.get_all_genres und search.get_year_range). async_query und
+# pagination.PagedQuery übernehmen den Wert in ihre Worker-Threads, sodass auch
+# gleichzeitig oder erst beim Blättern geladene Seiten der Suche zugeordnet werden.
+current_search = contextvars.ContextVar("current_search", default=None)
+
+# Module, die bei der Zuordnung einer Abfrage zur aufrufenden Funktion übersprungen werden
+INTERNAL_MODULES = ("search", "pagination", "slow_query", "result_cache", "async_query",
+                    "concurrent.futures.thread", "threading")
+
+
+def find_search_function():
+    """
+    Ermittelt die aufrufende Suchfunktion (search_film_by_* bzw. die erste Funktion außerhalb
+    von search.execute_query und pagination), um die Abfragen im Bericht zu gruppieren.
+    Wird nur für langsame Abfragen aufgerufen, für die current_search nicht gesetzt ist,
+    z. B. aus eigenen Skripten; in Worker-Threads ist die aufrufende Funktion nicht mehr im Stack.
+    """
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        name = frame.f_code.co_name
+        module = frame.f_globals.get("__name__", "")
+        if name.startswith("search_film_by_") or name in ("get_all_genres", "get_year_range"):
+            return name
+        if fallback is None and module not in INTERNAL_MODULES and not name.startswith("<"):
+            fallback = f"{module}.{name}"
+        frame = frame.f_back
+    return fallback or "unbekannt"
+
+
+def find_full_scans(plan):
+    """
+    Sucht im Plan von EXPLAIN FORMAT=JSON nach Tabellen mit vollständigem Scan (access_type ALL).
+    Returns:
+        list[str]: Namen der vollständig gelesenen Tabellen.
+    """
+    tables = []
+    if isinstance(plan, dict):
+        if plan.get("access_type") == "ALL":
+            tables.append(plan.get("table_name", "?"))
+        for value in plan.values():
+            tables.extend(find_full_scans(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            tables.extend(find_full_scans(value))
+    return tables
+
+
+class SlowQueryLog:
+    """
+    Erfasst langsame Abfragen asynchron: ein Hintergrund-Thread holt den EXPLAIN-Plan
+    und hängt Abfrage, Parameter, Dauer und Plan an die JSONL-Datei store_path an.
+    """
+
+    def __init__(self, explain, store_path, threshold_ms=500, queue_size=100):
+        """
+        Args:
+            explain (callable): Funktion (query, params) -> Plan als JSON-Text.
+            store_path (str): JSONL-Datei für die erfassten Abfragen.
+            threshold_ms (float): Schwellwert in Millisekunden.
+            queue_size (int): Maximale Anzahl wartender Erfassungen (weitere werden verworfen).
+        """
+        self._explain = explain
+        self.store_path = store_path
+        self.threshold_ms = threshold_ms
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def is_slow(self, duration_seconds):
+        return self.threshold_ms is not None and duration_seconds * 1000 >= self.threshold_ms
+
+    def capture(self, query, params, duration_seconds):
+        """
+        Merkt eine langsame Abfrage zur Erfassung vor, ohne auf EXPLAIN zu warten.
+        """
+        entry = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "function": current_search.get() or find_search_function(),
+            "sql": " ".join(query.split()),
+            "params": [str(p) for p in (params or ())],
+            "duration_ms": round(duration_seconds * 1000, 3),
+        }
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((query, params, entry))
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            query, params, entry = item
+            try:
+                plan = json.loads(self._explain(query, params))
+                entry["plan"] = plan
+                entry["full_scans"] = find_full_scans(plan)
+            except Exception as error:
+                entry["plan_error"] = f"{type(error).__name__}: {error}"
+                entry["full_scans"] = []
+            with open(self.store_path, "a", encoding="utf-8") as store:
+                store.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def close(self, timeout=5.0):
+        """
+        Schreibt noch wartende Erfassungen und beendet den Hintergrund-Thread.
+        """
+        if self._thread is not None:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                return
+            self._thread.join(timeout)
+
+
+def load_slow_queries(store_path):
+    """
+    Liest alle erfassten Abfragen aus der JSONL-Datei.
+    """
+    entries = []
+    try:
+        with open(store_path, encoding="utf-8") as store:
+            for line in store:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def build_report(entries):
+    """
+    Gruppiert die erfassten Abfragen nach Suchtyp bzw. Funktion.
+    Returns:
+        list[list]: Tabellenzeilen (Suchtyp/Funktion, Anzahl, Ø ms, max ms, Tabellen mit Full Scan),
+        sortiert nach Gesamtdauer absteigend.
+    """
+    groups = defaultdict(list)
+    for entry in entries:
+        groups[entry.get("function", "unbekannt")].append(entry)
+
+    rows = []
+    for function, items in groups.items():
+        durations = [item["duration_ms"] for item in items]
+        scans = defaultdict(int)
+        for item in items:
+            for table in set(item.get("full_scans", [])):
+                scans[table] += 1
+        scans_str = ", ".join(f"{table} ({count}x)" for table, count in sorted(scans.items())) or "-"
+        rows.append([function, len(items), round(sum(durations) / len(durations), 1), max(durations),
+                     scans_str, sum(durations)])
+    rows.sort(key=lambda row: row[-1], reverse=True)
+    return [row[:-1] for row in rows]
+
+
+def show_slow_query_report(store_path=None):
+    """
+    Zeigt die erfassten langsamen Abfragen gruppiert nach Suchtyp bzw. Funktion an.
+    """
+    from tabulate import tabulate
+
+    settings = {**DEFAULT_SLOW_QUERY_CONFIG, **getattr(config, "SLOW_QUERY_CONFIG", {})}
+    rows = build_report(load_slow_queries(store_path or settings["store_path"]))
+    if not rows:
+        print("\nEs wurden bisher keine langsamen Abfragen erfasst.")
+        return
+    print("\nLangsame Abfragen nach Suchtyp bzw. Funktion:")
+    print(tabulate(rows, headers=["Suche/Funktion", "Anzahl", "Ø ms", "max ms", "Full Scan (Tabelle)"],
+                   tablefmt="grid"))
+
+
+_slow_query_log = None
+_slow_query_lock = threading.Lock()
+
+
+def get_slow_query_log(explain):
+    """
+    Liefert die gemeinsame Erfassung (wird beim ersten Aufruf erstellt).
+    Args:
+        explain (callable): Funktion (query, params) -> Plan als JSON-Text.
+    """
+    global _slow_query_log
+    if _slow_query_log is None:
+        with _slow_query_lock:
+            if _slow_query_log is None:
+                settings = {**DEFAULT_SLOW_QUERY_CONFIG, **getattr(config, "SLOW_QUERY_CONFIG", {})}
+                _slow_query_log = SlowQueryLog(explain, settings["store_path"],
+                                               settings["threshold_ms"], settings["queue_size"])
+    return _slow_query_log
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["report"]:
+        print("Aufruf: python slow_query.py report [datei.jsonl]")
+        sys.exit(1)
+    show_slow_query_report(sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,93 @@
+# table_renderer.py — Schnelle Ausgabe von Suchergebnissen im tabulate-Format "grid"
+#
+# Die Suchergebnisse bestehen nur aus Ganzzahlen, Texten und NULL-Werten. Für diese Fälle
+# erzeugt render_grid dieselbe Ausgabe wie tabulate(..., tablefmt="grid"), aber in einem
+# einzigen Durchlauf über die Zellen statt mit tabulates allgemeiner Typerkennung.
+# Bei allem anderen (Zahlen oder Wahrheitswerte als Text, Fließkommazahlen,
+# Nicht-ASCII-Zeichen, mehrzeilige Zellen, leere Tabellen) liefert render_grid None, und der Aufrufer
+# verwendet tabulate.
+
+# Mindestabstand zwischen Überschrift und Spaltenrand (wie tabulate.MIN_PADDING)
+MIN_PADDING = 2
+
+# Texte mit diesen Anfangszeichen könnte tabulate als Zahl erkennen
+_NUMBER_START = frozenset("0123456789+-.")
+_SPECIAL_NUMBER_START = frozenset("iInN")    # inf, nan
+
+# Diese Texte behandelt tabulate als Wahrheitswerte (rechtsbündig)
+_BOOL_TEXTS = frozenset(("True", "False"))
+
+
+def _looks_numeric(text):
+    """
+    Prüft, ob tabulate einen Text als Zahl behandeln würde.
+    """
+    first = text[:1]
+    if first in _NUMBER_START:
+        return True
+    if first in _SPECIAL_NUMBER_START:
+        try:
+            float(text)
+            return True
+        except ValueError:
+            return False
+    return False
+
+
+def render_grid(rows, headers):
+    """
+    Erstellt die Tabelle im Format "grid" — zeichengleich mit tabulate.
+    Args:
+        rows (list[tuple]): Zeilen mit Werten vom Typ int, str oder None.
+        headers (list[str]): Spaltenüberschriften.
+    Returns:
+        str | None: Fertige Tabelle; None, wenn die Werte nicht sicher ohne tabulate
+        dargestellt werden können.
+    """
+    if not rows:
+        return None
+    n_columns = len(headers)
+    for header in headers:
+        if not header.isascii() or not header.isprintable():
+            return None
+
+    widths = [len(header) + MIN_PADDING for header in headers]
+    numeric = [True] * n_columns       # Spalte enthält nur Ganzzahlen (rechtsbündig)
+    filled = [False] * n_columns       # Spalte enthält mindestens einen Wert
+    table = []
+    for row in rows:
+        if len(row) != n_columns:
+            return None
+        cells = []
+        for i, value in enumerate(row):
+            if value is None:
+                text = ""
+            elif type(value) is int:
+                text = str(value)
+                filled[i] = True
+            elif type(value) is str:
+                text = value.strip()
+                if (not text or not text.isascii() or not text.isprintable() or _looks_numeric(text)
+                        or text in _BOOL_TEXTS):
+                    return None
+                numeric[i] = False
+                filled[i] = True
+            else:
+                return None
+            if len(text) > widths[i]:
+                widths[i] = len(text)
+            cells.append(text)
+        table.append(cells)
+    if not all(filled):
+        return None
+
+    def line(cells):
+        return "| " + " | ".join(cell.rjust(width) if is_numeric else cell.ljust(width)
+                                 for cell, width, is_numeric in zip(cells, widths, numeric)) + " |"
+
+    separator = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+    lines = [separator, line(headers), "+" + "+".join("=" * (width + 2) for width in widths) + "+"]
+    for cells in table:
+        lines.append(line(cells))
+        lines.append(separator)
+    return "\n".join(lines)
@@ -0,0 +1,46 @@
+# conftest.py — Gemeinsame Einrichtung der Tests
+#
+# Die Module liegen flach im Projektverzeichnis; es wird in den Suchpfad aufgenommen.
+# Fehlt config.py, wird config.example.py verwendet (die Tests nutzen nur lokale
+# Ersatzdatenbanken: SQLite statt MySQL, mongomock statt MongoDB).
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import load_config  # noqa: E402
+
+load_config()
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def standin_path(tmp_path_factory):
+    """
+    SQLite-Ersatzdatenbank mit Sakila-Schema (einmal je Testlauf angelegt).
+    """
+    from sakila_standin import create_standin_database
+
+    path = str(tmp_path_factory.mktemp("standin") / "sakila.sqlite")
+    create_standin_database(path, films=300)
+    return path
+
+
+@pytest.fixture
+def standin_pool(standin_path):
+    """
+    Leitet search.py auf die Ersatzdatenbank um, mit leerem Ergebnis-Cache.
+    """
+    from functools import partial
+
+    from db_pool import ConnectionPool, set_pool
+    from result_cache import ResultCache, set_result_cache
+    from sakila_standin import connect_standin
+
+    pool = ConnectionPool({}, min_size=0, max_size=4, connect=partial(connect_standin, standin_path))
+    set_pool(pool)
+    set_result_cache(ResultCache())
+    yield pool
+    set_pool(None)
@@ -0,0 +1,79 @@
+# test_actor_index.py — Teilnamen, unscharfe Suche und Neuaufbau des Schauspieler-Index
+
+from functools import partial
+
+import actor_index
+import search
+from actor_index import ActorIndex, get_actor_index, normalize_name
+from db_pool import ConnectionPool, set_pool
+from sakila_standin import connect_standin, create_standin_database
+
+
+class ActorTable:
+    """
+    Tabelle actor als Liste; execute beantwortet die beiden Abfragen des Index.
+    """
+
+    def __init__(self, names):
+        self.rows = [(i, first, last) for i, (first, last) in enumerate(names, 1)]
+        self.version = 1
+        self.queries = 0
+
+    def execute(self, query, params=None):
+        self.queries += 1
+        if query.startswith("SELECT COUNT(*)"):
+            return [(len(self.rows), self.version)]
+        return list(self.rows)
+
+
+def test_partial_names_match_substrings():
+    table = ActorTable([("PENELOPE", "GUINESS"), ("NICK", "WAHLBERG"), ("ED", "CHASE"), ("JENNIFER", "DAVIS")])
+    index = ActorIndex(table.execute)
+    assert index.lookup("penelope") == [1]
+    assert index.lookup("  Nick   WAHL") == [2]
+    assert index.lookup("ch") == [3]            # kürzer als ein Trigramm
+    assert index.lookup("e") == [1, 2, 3, 4]
+
+
+def test_misspelled_names_match_fuzzy():
+    table = ActorTable([("PENELOPE", "GUINESS"), ("NICK", "WAHLBERG"), ("JENNIFER", "DAVIS")])
+    index = ActorIndex(table.execute)
+    assert index.lookup("guiness penelope") == [1]
+    assert index.lookup("walberg") == [2]
+    assert index.lookup("walberg", fuzzy=False) == []
+    assert index.lookup("xyzzy") == []
+
+
+def test_index_is_rebuilt_when_the_table_changes():
+    table = ActorTable([("PENELOPE", "GUINESS")])
+    index = ActorIndex(table.execute, refresh_check_interval=0)
+    assert index.lookup("davis") == []
+    table.rows.append((2, "JENNIFER", "DAVIS"))
+    table.version = 2
+    assert index.lookup("davis") == [2]
+
+    # Ohne Änderung nur die Versionsabfrage, kein erneutes Laden
+    queries = table.queries
+    index.lookup("davis")
+    assert table.queries == queries + 1
+
+
+def test_lookup_on_standin_matches_actor_table(standin_pool):
+    names = {actor_id: normalize_name(f"{first} {last}")
+             for actor_id, first, last in search.execute_query("SELECT actor_id, first_name, last_name FROM actor")}
+    part = next(iter(names.values())).split()[1][:4]
+    assert get_actor_index(search.execute_query).lookup(part) == sorted(i for i, n in names.items() if part in n)
+
+
+def test_set_pool_discards_the_index(standin_pool, tmp_path):
+    index = get_actor_index(search.execute_query)
+    index.lookup("a")
+
+    path = str(tmp_path / "other.sqlite")
+    create_standin_database(path, films=100, seed=7)
+    set_pool(ConnectionPool({}, min_size=0, max_size=2, connect=partial(connect_standin, path)))
+    assert actor_index._index is None
+    rebuilt = get_actor_index(search.execute_query)
+    assert rebuilt is not index
+    assert rebuilt.lookup("a") == [actor_id for (actor_id,) in search.execute_query(
+        "SELECT actor_id FROM actor WHERE LOWER(first_name || ' ' || last_name) LIKE '%a%' ORDER BY actor_id")]
@@ -0,0 +1,66 @@
+# test_batch_search.py — Suchaufträge aus JSONL parallel ausführen
+
+import io
+import json
+
+import pytest
+
+import search
+from batch_search import main, percentile, read_specs, run_batch
+from db_pool import set_pool
+
+SPECS = [
+    {"id": "a", "type": "genre_year_range", "params": {"genre": "Drama", "year_from": 2000, "year_to": 2010}},
+    {"id": "b", "type": "keyword", "params": {"keyword": "drama"}},
+    {"id": "c", "type": "actor", "params": {"actor": "NICK"}},
+    {"id": "d", "type": "genre", "params": {"genre": "No Such Genre"}},
+    {"id": "e", "type": "unknown", "params": {}},
+]
+
+
+@pytest.fixture
+def batch_pool():
+    yield
+    set_pool(None)
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert [percentile(values, p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert percentile([], 50) is None
+
+
+def test_read_specs_numbers_lines_without_id(tmp_path):
+    path = tmp_path / "specs.jsonl"
+    path.write_text('{"type": "genre", "params": {"genre": 1}}\n\n{"id": "x", "type": "keyword"}\n', encoding="utf-8")
+    assert [spec["id"] for spec in read_specs(str(path))] == [1, "x"]
+
+
+def test_thread_batch_matches_interactive_search(standin_path, batch_pool):
+    output = io.StringIO()
+    summary = run_batch(SPECS, output, workers=3, standin=standin_path)
+    records = {record["id"]: record for record in map(json.loads, output.getvalue().splitlines())}
+
+    assert summary["queries"] == 5 and summary["errors"] == 2
+    assert set(summary["latency_by_type"]) == {"genre_year_range", "keyword", "actor"}
+    assert records["d"]["error"] == "ValueError: Unbekanntes Genre: No Such Genre"
+    assert records["e"]["error"].startswith("ValueError: Unbekannter Suchtyp")
+
+    # Dieselben Zeilen wie die Suche des Menüs (Genre-Name über die Stammdaten aufgelöst)
+    genres = {name: genre_id for genre_id, name in search.execute_query("SELECT category_id, name FROM category")}
+    rows, columns = search.run_search("genre_year_range", {"genre": genres["Drama"], "year_from": 2000,
+                                                           "year_to": 2010}, paged=False)
+    assert records["a"]["columns"] == columns
+    assert records["a"]["rows"] == [list(row) for row in rows] and records["a"]["count"] == len(rows) > 0
+
+
+def test_process_batch_from_command_line(standin_path, tmp_path, batch_pool, capsys):
+    specs, output = tmp_path / "specs.jsonl", tmp_path / "results.jsonl"
+    specs.write_text("".join(json.dumps(spec) + "\n" for spec in SPECS[:3]), encoding="utf-8")
+    assert main([str(specs), "--output", str(output), "--workers", "2", "--mode", "process", "--no-rows",
+                 "--standin", standin_path]) == 0
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(record["id"] for record in records) == ["a", "b", "c"]
+    assert all(record["count"] > 0 and "rows" not in record for record in records)
+    assert json.loads(capsys.readouterr().err)["mode"] == "process"
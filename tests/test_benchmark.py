@@ -0,0 +1,30 @@
+# test_benchmark.py — Benchmarks verändern die gemessenen Daten nicht
+
+import os
+import subprocess
+import sys
+
+import mongomock
+
+import benchmark
+import log_writer
+from log_writer import get_log_collection, get_rollup_collection
+
+
+def test_import_does_not_load_pymongo():
+    # tests/conftest.py importiert benchmark für load_config
+    code = "import sys, benchmark; print('pymongo' in sys.modules)"
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                               cwd=os.path.dirname(benchmark.__file__))
+    assert completed.stdout.strip() == "False"
+
+
+def test_log_writer_benchmark_leaves_report_data_alone(monkeypatch):
+    monkeypatch.setattr(log_writer, "_mongo_client", mongomock.MongoClient())
+    benchmark.seed_search_log(get_log_collection(), 100)
+    rollups = list(get_rollup_collection().find({}, {"_id": 0}))
+
+    result = benchmark.bench_log_writer(repeat=2, entries=50)
+    assert "log_search_query.x50" in result
+    assert get_log_collection().count_documents({}) == 100
+    assert list(get_rollup_collection().find({}, {"_id": 0})) == rollups
@@ -0,0 +1,55 @@
+# test_cache_warmer.py — Häufigste Suchen aus dem Protokoll in den Ergebnis-Cache laden
+
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from cache_warmer import CacheWarmer, find_top_searches
+from result_cache import get_result_cache
+from search import run_search
+
+
+def log(collection, search_type, params, times, age=timedelta(0)):
+    collection.insert_many([{"timestamp": datetime.now() - age, "search_type": search_type, "params": params}
+                            for _ in range(times)])
+
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient().db.final_project
+    log(collection, "genre_year", {"genre": 1, "year": 2000}, 5)
+    log(collection, "keyword", {"keyword": "drama"}, 3)
+    log(collection, "genre", {"genre": 2}, 2)
+    log(collection, "genre", {"genre": 3}, 9, age=timedelta(days=30))
+    return collection
+
+
+def test_top_searches_within_window(collection):
+    assert find_top_searches(collection, limit=2, window_days=7) == [
+        ("genre_year", {"genre": 1, "year": 2000}, 5), ("keyword", {"keyword": "drama"}, 3)]
+    assert find_top_searches(collection, limit=1)[0] == ("genre", {"genre": 3}, 9)
+
+
+def test_warmed_searches_are_cache_hits(collection, standin_pool):
+    run = CacheWarmer(lambda: collection, top_n=3).warm_once()
+    assert run["warmed"] == 3 and run["errors"] == 0 and run["bytes"] > 0
+
+    hits = get_result_cache().get_stats()["hits"]
+    rows, _ = run_search("genre_year", {"genre": 1, "year": 2000})
+    assert get_result_cache().get_stats()["hits"] == hits + 1
+    # Trefferanzahl und erste Seite sind schon geladen
+    assert rows._count is not None and rows._pages
+
+
+def test_budget_stops_warming(collection, standin_pool):
+    run = CacheWarmer(lambda: collection, top_n=3, max_bytes=1).warm_once()
+    assert run["warmed"] == 1 and run["skipped_budget"] == 2
+
+
+def test_failed_search_is_counted(collection, standin_pool):
+    log(collection, "genre", {"genre": "No Such Genre"}, 20)
+    warmer = CacheWarmer(lambda: collection, top_n=2)
+    run = warmer.warm_once()
+    assert run["errors"] == 1 and run["warmed"] == 1
+    assert warmer.stats["runs"] == 1 and warmer.stats["errors"] == 1
@@ -0,0 +1,23 @@
+# test_columnar.py — Spaltenweise Ablage liefert dieselben Zeilen wie die Liste
+
+import pytest
+
+from columnar import ColumnarResult
+
+ROWS = [("ACADEMY DINOSAUR", 2006, "Documentary", "PG", 86), ("ACE GOLDFINGER", 2006, "Horror", "G", 48),
+        ("ADAPTATION HOLES", None, "Documentary", "NC-17", 50), ("AFFAIR PREJUDICE", 2006, "Horror", "G", 117)]
+
+
+def test_rows_round_trip():
+    result = ColumnarResult.from_rows(ROWS)
+    assert len(result) == 4 and result == ROWS
+    assert result[1] == ROWS[1] and result[-1] == ROWS[-1]
+    assert result[1:3] == ROWS[1:3] and result[::2] == ROWS[::2]
+    assert result.memory_size() > 0
+    with pytest.raises(IndexError):
+        result[4]
+
+
+def test_not_hashable():
+    with pytest.raises(TypeError):
+        hash(ColumnarResult.from_rows(ROWS))
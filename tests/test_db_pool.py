@@ -0,0 +1,106 @@
+# test_db_pool.py — Verbindungspool
+
+import threading
+import time
+from functools import partial
+
+import pymysql
+import pytest
+
+import config
+import db_pool
+from sakila_standin import connect_standin
+
+
+class CountingPool:
+    def __init__(self, *args, **kwargs):
+        self.fills = 0
+
+    def fill(self):
+        self.fills += 1
+
+    def close(self):
+        pass
+
+
+def test_get_pool_fills_only_on_creation(monkeypatch):
+    monkeypatch.setattr(db_pool, "ConnectionPool", CountingPool)
+    monkeypatch.setattr(config, "MYSQL_REPLICAS", None, raising=False)
+    monkeypatch.setattr(db_pool, "_pool", None)
+    pool = db_pool.get_pool()
+    for _ in range(3):
+        assert db_pool.get_pool() is pool
+    assert pool.fills == 1
+
+
+def make_pool(standin_path, **settings):
+    return db_pool.ConnectionPool({}, connect=partial(connect_standin, standin_path), **settings)
+
+
+def test_checkout_timeout(standin_path):
+    pool = make_pool(standin_path, min_size=0, max_size=1, checkout_timeout=0.1)
+    connection = pool.acquire()
+    with pytest.raises(db_pool.PoolTimeout):
+        pool.acquire()
+    assert pool.get_stats()["waits"] == 1
+    pool.release(connection)
+    assert pool.acquire() is connection
+    pool.close()
+
+
+def test_health_check_replaces_broken_connection(standin_path):
+    pool = make_pool(standin_path, min_size=0, max_size=1, health_check_after=0)
+    connection = pool.acquire()
+    pool.release(connection)
+    # Verbindung bricht im Leerlauf ab: ping schlägt fehl, der Pool öffnet eine neue
+    connection.close()
+    with pool.connection() as replacement:
+        assert replacement is not connection
+        with replacement.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            assert cursor.fetchall()[0][0] == 1
+    stats = pool.get_stats()
+    assert stats["health_check_failures"] == 1 and stats["reconnects"] == 1
+    assert stats["size"] == 1
+    pool.close()
+
+
+def test_connection_error_discards_connection(standin_path):
+    pool = make_pool(standin_path, min_size=0, max_size=2)
+    with pytest.raises(pymysql.err.OperationalError):
+        with pool.connection():
+            raise pymysql.err.OperationalError(2013, "Lost connection")
+    stats = pool.get_stats()
+    assert stats["size"] == 0 and stats["closed"] == 1
+    pool.close()
+
+
+class SlowCloseConnection:
+    def __init__(self, closing, release):
+        self._closing = closing
+        self._release = release
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self._closing.set()
+        self._release.wait(5)
+
+
+def test_slow_close_does_not_block_checkouts():
+    closing, release = threading.Event(), threading.Event()
+    pool = db_pool.ConnectionPool({}, min_size=0, max_size=2, checkout_timeout=1,
+                                  connect=lambda **kwargs: SlowCloseConnection(closing, release))
+    broken = pool.acquire()
+    closer = threading.Thread(target=pool.release, args=(broken,), kwargs={"discard": True})
+    closer.start()
+    assert closing.wait(5)
+    # Während close() hängt, muss der Pool weiter Verbindungen ausgeben
+    started = time.monotonic()
+    connection = pool.acquire()
+    assert time.monotonic() - started < 0.5
+    pool.release(connection)
+    release.set()
+    closer.join(5)
+    assert pool.get_stats()["closed"] == 1
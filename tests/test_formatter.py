@@ -0,0 +1,88 @@
+# test_formatter.py — Seitenweise Ausgabe mit Vorladen der nächsten Seite und Abbruch mit 'q'
+
+import builtins
+import threading
+import time
+
+import formatter
+import search
+from pagination import PAGE_SIZE
+
+COLUMNS = ["Titel", "Erscheinungsjahr"]
+ROWS = [(f"FILM {n:03d}", 2000 + n % 20) for n in range(25)]
+
+
+class SlowRows(list):
+    """
+    Ergebnisliste, deren Seiten ab start_blocking erst nach release geladen werden.
+    """
+
+    def __init__(self, rows, start_blocking):
+        super().__init__(rows)
+        self.start_blocking = start_blocking
+        self.requested = threading.Event()
+        self.release = threading.Event()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) and index.start >= self.start_blocking:
+            self.requested.set()
+            self.release.wait(5)
+        return super().__getitem__(index)
+
+
+def paginate(monkeypatch, capsys, rows, answers, prefetch=True, columns=COLUMNS):
+    answers = iter(answers)
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers))
+    formatter.print_rows_paginated(rows, columns, prefetch=prefetch)
+    return capsys.readouterr().out
+
+
+def test_prefetch_gives_the_same_output(monkeypatch, capsys):
+    with_prefetch = paginate(monkeypatch, capsys, ROWS, ["", ""])
+    without_prefetch = paginate(monkeypatch, capsys, ROWS, ["", ""], prefetch=False)
+    assert with_prefetch == without_prefetch
+    assert "Filme 21 bis 25 von 25:" in with_prefetch
+
+
+def test_next_page_loads_while_waiting_for_input(monkeypatch, capsys):
+    rows = SlowRows(ROWS, PAGE_SIZE)
+    rows.release.set()
+
+    def answer(prompt=""):
+        # Die nächste Seite wird angefordert, bevor der Benutzer antwortet
+        assert rows.requested.wait(5)
+        return "q"
+    monkeypatch.setattr(builtins, "input", answer)
+    formatter.print_rows_paginated(rows, COLUMNS)
+    assert "Ausgabe gestoppt." in capsys.readouterr().out
+
+
+def test_quit_does_not_wait_for_prefetch(monkeypatch, capsys):
+    rows = SlowRows(ROWS, PAGE_SIZE)
+    rendered = []
+    render_table = formatter.render_table
+    monkeypatch.setattr(formatter, "render_table", lambda batch, columns: rendered.append(batch[0])
+                        or render_table(batch, columns))
+
+    def answer(prompt=""):
+        assert rows.requested.wait(5)
+        return "q"
+    monkeypatch.setattr(builtins, "input", answer)
+
+    started = time.perf_counter()
+    formatter.print_rows_paginated(rows, COLUMNS)
+    assert time.perf_counter() - started < 2      # Seite 2 lädt noch (bis zu 5 s)
+    rows.release.set()
+    time.sleep(0.1)
+    # Die abgebrochene Vorarbeit rendert die geladene Seite nicht mehr
+    assert rendered == [ROWS[0]]
+    assert "Filme 11" not in capsys.readouterr().out
+
+
+def test_paged_query_output_matches_list(standin_pool, monkeypatch, capsys):
+    rows, columns = search.run_search("genre", {"genre": 3})
+    assert len(rows) > 2 * PAGE_SIZE
+    answers = [""] * (len(rows) // PAGE_SIZE)
+    paged = paginate(monkeypatch, capsys, rows, answers, columns=columns)
+    complete = paginate(monkeypatch, capsys, rows.fetch_all(), answers, prefetch=False, columns=columns)
+    assert paged == complete
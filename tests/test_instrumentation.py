@@ -0,0 +1,65 @@
+# test_instrumentation.py — Histogramme der Suchphasen und Ausgabe als Prometheus/JSON
+
+import json
+
+import pytest
+
+import instrumentation
+import search
+from instrumentation import Histogram, Metrics
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = Metrics()
+    monkeypatch.setattr(instrumentation, "metrics", metrics)
+    monkeypatch.setattr(instrumentation, "enabled", True)
+    return metrics
+
+
+def test_histogram_counts_are_cumulative():
+    histogram = Histogram((1, 10))
+    for value in (0.5, 1, 3, 10, 11):
+        histogram.observe(value)
+    # Obergrenzen gelten einschließlich (le wie bei Prometheus)
+    assert histogram.snapshot() == {"buckets": [(1, 2), (10, 4), (float("inf"), 5)], "sum": 25.5, "count": 5}
+
+
+def test_prometheus_text_format(metrics):
+    metrics.observe("search_rows_fetched", "execute_query", 5)
+    metrics.observe("search_rows_fetched", "execute_query", 500)
+    lines = metrics.to_prometheus().splitlines()
+    assert lines[:2] == ["# HELP search_rows_fetched Anzahl der gelesenen Zeilen pro SQL-Abfrage",
+                         "# TYPE search_rows_fetched histogram"]
+    assert 'search_rows_fetched_bucket{source="execute_query",le="1"} 0' in lines
+    assert 'search_rows_fetched_bucket{source="execute_query",le="10"} 1' in lines
+    assert 'search_rows_fetched_bucket{source="execute_query",le="1000"} 2' in lines
+    assert 'search_rows_fetched_bucket{source="execute_query",le="+Inf"} 2' in lines
+    assert lines[-2:] == ['search_rows_fetched_sum{source="execute_query"} 505.0',
+                          'search_rows_fetched_count{source="execute_query"} 2']
+
+
+def test_timed_records_only_when_enabled(metrics, monkeypatch):
+    @instrumentation.timed("render")
+    def render():
+        return "table"
+
+    monkeypatch.setattr(instrumentation, "enabled", False)
+    assert render() == "table"
+    assert metrics.to_dict() == {}
+
+    monkeypatch.setattr(instrumentation, "enabled", True)
+    render()
+    assert metrics.to_dict()["search_phase_seconds"]["render"]["count"] == 1
+
+
+def test_search_records_query_phases(metrics, standin_pool, tmp_path):
+    rows, _ = search.run_search("genre", {"genre": 3}, paged=False)
+    result = json.loads(instrumentation.dump(str(tmp_path / "metrics.json"), fmt="json"))
+    assert json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8")) == result
+
+    phases = result["search_phase_seconds"]
+    assert set(phases) == {"connect", "execute", "fetch"}
+    assert phases["execute"]["count"] == phases["fetch"]["count"] >= 1
+    fetched = result["search_rows_fetched"]["execute_query"]
+    assert fetched["sum"] >= len(rows) and fetched["buckets"]["+Inf"] == fetched["count"]
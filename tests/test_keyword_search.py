@@ -0,0 +1,57 @@
+# test_keyword_search.py — Stichwortsuche: FULLTEXT (Wortanfang) und LIKE-Rückfall
+
+import re
+
+import pytest
+
+import search
+from keyword_search import build_keyword_search, split_keyword
+
+WORD_RE = re.compile(r"\w+")
+
+
+@pytest.fixture
+def films(standin_pool):
+    return search.execute_query("SELECT title, description FROM film")
+
+
+def found_titles(keyword):
+    rows, _ = search.run_search("keyword", {"keyword": keyword}, paged=False)
+    return sorted(row[0] for row in rows)
+
+
+def titles_where(films, predicate):
+    return sorted(title for title, description in films if predicate(f"{title} {description}".lower()))
+
+
+def starts_a_word(text, word):
+    return any(token.startswith(word) for token in WORD_RE.findall(text))
+
+
+def test_split_keyword():
+    assert split_keyword("The Drama of AI", 3, frozenset({"the", "of"})) == (["drama"], ["the", "of", "ai"])
+
+
+def test_fulltext_matches_word_starts(films):
+    expected = titles_where(films, lambda text: starts_a_word(text, "drama"))
+    assert expected and found_titles("Drama") == expected
+
+
+def test_fulltext_no_longer_matches_inside_words(films):
+    # Die frühere LIKE-Suche fand "rama" auch in "Drama"
+    assert titles_where(films, lambda text: "rama" in text)
+    assert found_titles("rama") == titles_where(films, lambda text: starts_a_word(text, "rama"))
+
+
+def test_short_keyword_falls_back_to_like(films, standin_pool):
+    parts = build_keyword_search("ac", search.execute_query)
+    assert parts["join_sql"] == "" and parts["params"] == ("%ac%", "%ac%")
+    expected = titles_where(films, lambda text: "ac" in text)
+    assert expected and found_titles("ac") == expected
+
+
+def test_short_words_require_the_whole_keyword(films, standin_pool):
+    parts = build_keyword_search("drama in", search.execute_query)
+    assert parts["params"] == ("+drama*", "+drama*", "%drama in%", "%drama in%")
+    expected = titles_where(films, lambda text: starts_a_word(text, "drama") and "drama in" in text)
+    assert found_titles("drama in") == expected
@@ -0,0 +1,54 @@
+# test_load_replay.py — Gleichzeitige virtuelle Benutzer und Größe des Thread-Pools
+
+import threading
+from functools import partial
+
+import async_query
+from db_pool import ConnectionPool, set_pool
+from load_replay import parse_speed, run_replay
+from replica_router import ReplicaRouter
+from result_cache import ResultCache, set_result_cache
+from sakila_standin import connect_standin
+
+USERS = 4
+
+
+def test_parse_speed():
+    assert parse_speed("10x") == 10.0
+    assert parse_speed("max") is None
+
+
+def test_executor_follows_installed_pool(standin_pool, standin_path):
+    assert async_query.get_executor()._max_workers == standin_pool.max_size
+
+    def pool():
+        return ConnectionPool({}, min_size=0, max_size=3, connect=partial(connect_standin, standin_path))
+    set_pool(ReplicaRouter(pool(), {"r1": pool(), "r2": pool()}, probe_interval=None))
+    assert async_query.get_executor()._max_workers == 9
+
+
+def test_users_run_searches_at_the_same_time(standin_path):
+    # Jede Suche lädt COUNT und erste Seite gleichzeitig: USERS Suchen brauchen also
+    # 2 × USERS Verbindungen auf einmal. Die ersten Verbindungen öffnen erst, wenn alle
+    # gleichzeitig angefordert wurden; sonst bricht die Barriere und die Suchen schlagen fehl.
+    barrier = threading.Barrier(2 * USERS, timeout=5)
+    opened = []
+
+    def connect(**kwargs):
+        opened.append(1)
+        if len(opened) <= barrier.parties:
+            barrier.wait()
+        return connect_standin(standin_path, **kwargs)
+
+    set_pool(ConnectionPool({}, min_size=0, max_size=2 * USERS, connect=connect))
+    set_result_cache(ResultCache())
+    try:
+        entries = [{"search_type": "genre_year", "params": {"genre": genre, "year": 2000}}
+                   for genre in range(1, USERS + 1)]
+        report = run_replay(entries, users=USERS, speed=None)
+    finally:
+        set_pool(None)
+
+    assert report["errors"] == 0, report["error_messages"]
+    assert report["queries"] == USERS
+    assert not barrier.broken
@@ -0,0 +1,67 @@
+# test_log_reader.py — Suchstatistik aus dem Roh-Log
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from benchmark import seed_search_log
+from log_reader import aggregate_popular_queries, find_last_unique_queries, find_last_unique_queries_aggregated
+from log_rollup import read_popular_queries, update_rollups
+
+START = datetime(2026, 3, 1, 9, 0)
+
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient().db.search_log
+    searches = [("genre", {"genre": "Action"}), ("actor", {"actor": "NICK"}), ("genre", {"genre": "Action"}),
+                ("keyword", {"keyword": "love"}), ("genre", {"genre": "Drama"}), ("genre", {"genre": "Action"})]
+    collection.insert_many([{"timestamp": START + timedelta(minutes=n), "search_type": search_type,
+                             "params": params} for n, (search_type, params) in enumerate(searches)])
+    return collection
+
+
+@pytest.mark.parametrize("find", [find_last_unique_queries, find_last_unique_queries_aggregated])
+def test_last_unique_queries(collection, find):
+    assert find(collection, limit=3) == [
+        ("genre", {"genre": "Action"}, START + timedelta(minutes=5)),
+        ("genre", {"genre": "Drama"}, START + timedelta(minutes=4)),
+        ("keyword", {"keyword": "love"}, START + timedelta(minutes=3)),
+    ]
+
+
+def expected_popular_queries(entries, limit, top_values):
+    types = Counter(entry["search_type"] for entry in entries)
+    top = sorted(types.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    params_by_type = {}
+    for search_type, _ in top:
+        values = {}
+        for entry in entries:
+            if entry["search_type"] == search_type:
+                for key, value in entry["params"].items():
+                    values.setdefault(key, Counter())[value] += 1
+        params_by_type[search_type] = [
+            (key, sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top_values])
+            for key, counts in values.items()]
+    return top, params_by_type
+
+
+def test_popular_queries_from_log_and_rollups():
+    database = mongomock.MongoClient().db
+    seed_search_log(database.search_log, 3000, on_batch=lambda batch: update_rollups(database.rollup, batch))
+    entries = list(database.search_log.find({}, {"_id": 0}))
+    expected = expected_popular_queries(entries, limit=4, top_values=3)
+
+    assert aggregate_popular_queries(database.search_log, limit=4, top_values=3) == expected
+    assert read_popular_queries(database.rollup, limit=4, top_values=3) == expected
+
+
+def test_top_values_are_bounded_per_parameter():
+    collection = mongomock.MongoClient().db.search_log
+    collection.insert_many([{"search_type": "keyword", "params": {"keyword": f"word{n % 50}"}} for n in range(200)]
+                           + [{"search_type": "keyword", "params": {"keyword": "love"}} for _ in range(10)])
+    top, params_by_type = aggregate_popular_queries(collection, top_values=2)
+    assert top == [("keyword", 210)]
+    assert params_by_type["keyword"] == [("keyword", [("love", 10), ("word0", 4)])]
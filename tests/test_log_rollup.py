@@ -0,0 +1,105 @@
+# test_log_rollup.py — Rollup-Zähler, Neuaufbau und Schreibvorgänge während des Neuaufbaus
+
+import time
+from datetime import datetime, timedelta
+
+import mongomock
+from bson import ObjectId
+
+from log_rollup import (log_write_gate, read_popular_queries, rebuild_rollups, rollups_complete,
+                        update_rollups)
+from log_spool import LogSpool
+from log_writer import AsyncLogSink
+
+START = datetime(2026, 3, 1, 9, 30)
+
+
+def make_entries(count, search_type="genre", params=None, start=START):
+    return [{"_id": ObjectId(), "search_type": search_type, "params": params or {"genre": "Action"},
+             "timestamp": start + timedelta(minutes=20 * n)} for n in range(count)]
+
+
+def counts(rollup_collection, kind, **fields):
+    return {tuple(doc.get(name) for name in ("search_type", "key", "value", "bucket")): doc["count"]
+            for doc in rollup_collection.find({"kind": kind, **fields})}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Zeitüberschreitung"
+        time.sleep(0.01)
+
+
+def test_update_counts_types_params_and_buckets():
+    rollups = mongomock.MongoClient().db.rollup
+    update_rollups(rollups, make_entries(4) + make_entries(2, "year", {"year": 2006}))
+    update_rollups(rollups, make_entries(1, params={"genre": "Comedy"}))
+
+    top, params = read_popular_queries(rollups)
+    assert top == [("genre", 5), ("year", 2)]
+    assert params["genre"] == [("genre", [("Action", 4), ("Comedy", 1)])]
+    # 09:30, 09:50 -> 09:00; 10:10, 10:30 -> 10:00
+    assert counts(rollups, "hour", search_type="genre") == {
+        ("genre", None, None, datetime(2026, 3, 1, 9)): 3, ("genre", None, None, datetime(2026, 3, 1, 10)): 2}
+    assert counts(rollups, "day", search_type="genre") == {("genre", None, None, datetime(2026, 3, 1)): 5}
+
+
+def test_rebuild_matches_incremental_counts():
+    database = mongomock.MongoClient().db
+    entries = make_entries(7) + make_entries(3, "year", {"year": 2006, "rating": "PG"}) + [{"search_type": ""}]
+    database.log.insert_many(entries)
+    update_rollups(database.incremental, entries)
+
+    assert not rollups_complete(database.rollup)
+    rebuild_rollups(database.log, database.rollup, batch_size=2)
+    assert rollups_complete(database.rollup)
+    for kind in ("type", "param", "hour", "day"):
+        assert counts(database.rollup, kind) == counts(database.incremental, kind)
+
+
+class WritesDuringRebuild:
+    """
+    Log-Collection, bei deren zweiter Aggregation (der Zähler je Suchtyp steht dann schon fest)
+    die Log-Senke weitere Einträge schreiben soll.
+    """
+
+    def __init__(self, collection, during):
+        self.collection = collection
+        self.during = during
+        self.calls = 0
+
+    def aggregate(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls == 2:
+            self.during()
+        return self.collection.aggregate(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+def test_writes_during_rebuild_are_counted(tmp_path):
+    database = mongomock.MongoClient().db
+    database.log.insert_many(make_entries(5))
+    sink = AsyncLogSink(lambda: database.log, batch_size=1, flush_interval=0.01,
+                        spool=LogSpool(str(tmp_path)), replay_interval=0,
+                        on_written=lambda entries: update_rollups(database.rollup, entries),
+                        write_gate=log_write_gate)
+
+    def during():
+        # Neue Suchen und verspätete Einträge mit altem Zeitstempel (wie aus dem Spool)
+        late = make_entries(3, start=START - timedelta(days=1)) + make_entries(2, "year", {"year": 2006})
+        for entry in late:
+            sink.submit(entry)
+        wait_for(lambda: sink.get_stats()["written"] + sink.get_stats()["spooled"] == len(late))
+
+    try:
+        rebuild_rollups(WritesDuringRebuild(database.log, during), database.rollup)
+        wait_for(lambda: database.log.count_documents({}) == 10 and not sink._spool.has_pending())
+        wait_for(lambda: counts(database.rollup, "type") == {("genre", None, None, None): 8,
+                                                              ("year", None, None, None): 2})
+    finally:
+        sink.close()
+    assert counts(database.rollup, "day", search_type="genre") == {
+        ("genre", None, None, datetime(2026, 2, 28)): 3, ("genre", None, None, datetime(2026, 3, 1)): 5}
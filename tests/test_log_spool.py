@@ -0,0 +1,101 @@
+# test_log_spool.py — Spool: Nachladen in Reihenfolge, keine Duplikate, beschädigte Zeilen
+
+from datetime import datetime
+
+import mongomock
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+
+from log_spool import LogSpool, encode_entry
+
+
+class FlakyCollection:
+    """
+    mongomock-Collection, deren insert_many fehlschlägt, solange down gesetzt ist.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.down = False
+
+    def insert_many(self, documents, ordered=True):
+        if self.down:
+            raise AutoReconnect("connection refused")
+        return self.collection.insert_many(documents, ordered=ordered)
+
+
+def make_entries(first, count):
+    return [{"_id": ObjectId(), "n": n, "search_type": "genre", "params": {"genre": "Action"},
+             "timestamp": datetime(2026, 1, 1, 12, 0, n % 60)} for n in range(first, first + count)]
+
+
+def test_replay_keeps_segment_order(tmp_path):
+    collection = mongomock.MongoClient().db.search_log
+    spool = LogSpool(str(tmp_path), segment_max_bytes=300)
+    for first in range(0, 50, 5):
+        spool.append(make_entries(first, 5))
+    assert len(spool._segment_numbers()) > 1
+
+    assert spool.replay(collection, batch_size=7) == 50
+    docs = list(collection.find())
+    assert [doc["n"] for doc in docs] == list(range(50))
+    assert docs[0]["timestamp"] == datetime(2026, 1, 1, 12, 0, 0)
+    assert not spool.has_pending()
+
+
+def test_replay_ignores_duplicate_keys(tmp_path):
+    collection = mongomock.MongoClient().db.search_log
+    entries = make_entries(0, 10)
+    spool = LogSpool(str(tmp_path))
+    spool.append(entries)
+    # Absturz mitten im Hochladen: ein Teil der Einträge ist schon in MongoDB
+    collection.insert_many([dict(entry) for entry in entries[2:6]])
+
+    inserted = []
+    assert spool.replay(collection, on_inserted=inserted.extend) == 6
+    assert sorted(entry["n"] for entry in inserted) == [0, 1, 6, 7, 8, 9]
+    assert collection.count_documents({}) == 10
+    assert spool.replay(collection) == 0
+
+
+def test_failed_replay_keeps_segments(tmp_path):
+    target = FlakyCollection(mongomock.MongoClient().db.search_log)
+    spool = LogSpool(str(tmp_path))
+    spool.append(make_entries(0, 3))
+    target.down = True
+    with pytest.raises(AutoReconnect):
+        spool.replay(target)
+    assert spool.has_pending()
+    target.down = False
+    assert spool.replay(target) == 3
+
+
+def test_corrupt_lines_keep_the_segment(tmp_path):
+    collection = mongomock.MongoClient().db.search_log
+    spool = LogSpool(str(tmp_path))
+    entries = make_entries(0, 4)
+    segment = tmp_path / "segment-00000001.jsonl"
+    lines = [encode_entry(entry) for entry in entries]
+    # Beschädigte Zeile mitten im Segment, abgeschnittene letzte Zeile (Absturz beim Schreiben)
+    segment.write_text("\n".join(lines[:2] + ['{"_id": kaputt'] + lines[2:]) + "\n" + lines[0][:10],
+                       encoding="utf-8")
+
+    assert spool.replay(collection) == 4
+    assert spool.corrupt_lines == 1
+    assert not segment.exists()
+    assert spool.corrupt_segments == [str(segment) + ".bad"]
+    assert (tmp_path / "segment-00000001.jsonl.bad").exists()
+    # Beiseitegelegte Segmente werden nicht erneut hochgeladen
+    assert not spool.has_pending()
+    assert spool.replay(collection) == 0
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    collection = mongomock.MongoClient().db.search_log
+    spool = LogSpool(str(tmp_path))
+    lines = [encode_entry(entry) for entry in make_entries(0, 3)]
+    (tmp_path / "segment-00000001.jsonl").write_text("\n".join(lines) + "\n" + lines[0][:15], encoding="utf-8")
+    assert spool.replay(collection) == 3
+    assert spool.corrupt_lines == 0
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,137 @@
+# test_log_writer.py — Nicht blockierende Protokollierung: volle Warteschlange, Spool, Fehler
+
+import threading
+import time
+from datetime import datetime
+
+import mongomock
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+
+from log_spool import LogSpool
+from log_writer import AsyncLogSink
+
+
+class FlakyCollection:
+    """
+    mongomock-Collection, deren insert_many fehlschlägt, solange down gesetzt ist,
+    und wartet, solange blocked nicht freigegeben ist.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.down = False
+        self.blocked = threading.Event()
+        self.blocked.set()
+
+    def insert_many(self, documents, ordered=True):
+        self.blocked.wait(5)
+        if self.down:
+            raise AutoReconnect("connection refused")
+        return self.collection.insert_many(documents, ordered=ordered)
+
+
+def make_entries(first, count):
+    return [{"_id": ObjectId(), "n": n, "search_type": "genre", "params": {"genre": "Action"},
+             "timestamp": datetime(2026, 1, 1, 12, 0, n % 60)} for n in range(first, first + count)]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Zeitüberschreitung"
+        time.sleep(0.01)
+
+
+def test_batches_are_written():
+    target = mongomock.MongoClient().db.search_log
+    sink = AsyncLogSink(lambda: target, batch_size=10, flush_interval=0.02)
+    for entry in make_entries(0, 25):
+        assert sink.submit(entry)
+    sink.close()
+    stats = sink.get_stats()
+    assert target.count_documents({}) == 25
+    assert stats["written"] == 25 and stats["batches"] >= 3 and stats["queued"] == 0
+
+
+def test_full_queue_drops_without_blocking():
+    target = FlakyCollection(mongomock.MongoClient().db.search_log)
+    target.blocked.clear()
+    sink = AsyncLogSink(lambda: target, queue_size=2, batch_size=1, flush_interval=0.01, enqueue_timeout=0.01)
+    entries = make_entries(0, 10)
+    sink.submit(entries[0])
+    wait_for(lambda: sink.get_stats()["queued"] == 0)      # Flusher hängt in insert_many
+
+    started = time.monotonic()
+    results = [sink.submit(entry) for entry in entries[1:]]
+    assert time.monotonic() - started < 1
+    assert results[:2] == [True, True] and not any(results[2:])
+    stats = sink.get_stats()
+    assert stats["dropped"] == 7 and stats["backpressured"] == 7
+
+    target.blocked.set()
+    sink.close()
+    assert target.collection.count_documents({}) == 3
+
+
+def test_full_queue_falls_back_to_spool(tmp_path):
+    target = FlakyCollection(mongomock.MongoClient().db.search_log)
+    target.blocked.clear()
+    spool = LogSpool(str(tmp_path))
+    sink = AsyncLogSink(lambda: target, queue_size=2, batch_size=1, flush_interval=0.01, enqueue_timeout=0.01,
+                        spool=spool, replay_interval=0)
+    entries = make_entries(0, 10)
+    sink.submit(entries[0])
+    wait_for(lambda: sink.get_stats()["queued"] == 0)
+    assert all(sink.submit(entry) for entry in entries[1:])
+    stats = sink.get_stats()
+    assert stats["dropped"] == 0 and stats["spooled"] == 7
+
+    # Nach der Freigabe wird auch der Spool nachgeladen: kein Eintrag geht verloren
+    target.blocked.set()
+    wait_for(lambda: target.collection.count_documents({}) == 10)
+    sink.close()
+    assert sorted(doc["n"] for doc in target.collection.find()) == list(range(10))
+
+
+def test_sink_spools_while_down_and_replays_in_order(tmp_path):
+    target = FlakyCollection(mongomock.MongoClient().db.search_log)
+    written = []
+    spool = LogSpool(str(tmp_path / "spool"), segment_max_bytes=500)
+    sink = AsyncLogSink(lambda: target, batch_size=5, flush_interval=0.02, spool=spool,
+                        replay_interval=0, on_written=written.extend)
+
+    target.down = True
+    for entry in make_entries(0, 20):
+        sink.submit(entry)
+    wait_for(lambda: sink.get_stats()["spooled"] == 20)
+    assert target.collection.count_documents({}) == 0
+    assert spool.has_pending()
+
+    # Solange der Spool nicht leer ist, werden neue Einträge hinten angehängt
+    target.down = False
+    for entry in make_entries(20, 10):
+        sink.submit(entry)
+    wait_for(lambda: target.collection.count_documents({}) == 30)
+    sink.close()
+
+    assert [doc["n"] for doc in target.collection.find()] == list(range(30))
+    assert [entry["n"] for entry in written] == list(range(30))
+    assert not spool.has_pending()
+    assert sink.get_stats()["failed"] == 0
+
+
+def test_flusher_survives_bad_entries_and_callback_errors():
+    target = mongomock.MongoClient().db.search_log
+
+    def failing_callback(entries):
+        raise RuntimeError("Rollup nicht erreichbar")
+
+    sink = AsyncLogSink(lambda: target, batch_size=1, flush_interval=0.01, on_written=failing_callback)
+    sink.submit({"_id": ObjectId(), "params": {"value": object()}})     # nicht als BSON kodierbar
+    for entry in make_entries(0, 3):
+        sink.submit(entry)
+    wait_for(lambda: target.count_documents({}) == 3)
+    sink.close()
+    stats = sink.get_stats()
+    assert stats["failed"] == 1 and stats["callback_errors"] == 3
@@ -0,0 +1,60 @@
+# test_pagination.py — Keyset-Seiten stimmen mit OFFSET-Seiten und dem Gesamtergebnis überein
+
+import pytest
+
+import search
+from film_query import DEFAULT_COLUMNS, build_film_query
+from pagination import PAGE_SIZE
+
+SEARCHES = [
+    ({"genre": 3}, DEFAULT_COLUMNS, True),
+    ({"genre": 3}, ("title", "genre", "year", "rating", "length"), False),
+    ({"genre": 5, "year_from": 1995, "year_to": 2020}, DEFAULT_COLUMNS, True),
+    ({"keyword": "drama"}, DEFAULT_COLUMNS, True),
+    ({"rating": "PG"}, DEFAULT_COLUMNS, False),
+    ({"actor": "NICK"}, ("actor",) + DEFAULT_COLUMNS, False),
+    ({"actor": "a"}, ("actor",) + DEFAULT_COLUMNS, True),
+]
+
+
+def recording(queries):
+    def execute(query, params=None):
+        queries.append(query)
+        return search.execute_query(query, params)
+    return execute
+
+
+@pytest.mark.parametrize("filters, columns, group_films", SEARCHES)
+def test_keyset_pages_match_offset_pages(standin_pool, filters, columns, group_films):
+    keyset_queries, offset_queries = [], []
+    keyset, _ = build_film_query(recording(keyset_queries), filters, columns, group_films)
+    offset, _ = build_film_query(recording(offset_queries), filters, columns, group_films)
+    total = len(keyset)
+    assert total == len(offset) > PAGE_SIZE
+
+    starts = list(range(0, total, PAGE_SIZE))
+    # Seiten nacheinander: Keyset; rückwärts und ohne vorherige Seite: OFFSET-Fallback
+    keyset_pages = [keyset.fetch(start, min(start + PAGE_SIZE, total)) for start in starts]
+    offset_pages = {start: offset.fetch(start, min(start + PAGE_SIZE, total)) for start in reversed(starts)}
+
+    for start, page in zip(starts, keyset_pages):
+        assert page == offset_pages[start]
+    assert [row for page in keyset_pages for row in page] == keyset.fetch_all()
+    assert not any("OFFSET" in query for query in keyset_queries)
+    assert any("OFFSET" in query for query in offset_queries)
+
+
+
+@pytest.mark.parametrize("search_type, params", [("genre_year_range", {"genre": 3, "year_from": 1990, "year_to": 2024}),
+                                                 ("actor", {"actor": "NICK"})])
+def test_grouped_search_has_one_row_per_film(standin_pool, search_type, params):
+    rows, headers = search.run_search(search_type, params, paged=False)
+    titles = [row[headers.index("Titel")] for row in rows]
+    assert len(titles) == len(set(titles)) == len(rows) > 0
+
+
+def test_actor_search_combines_genres_of_a_film(standin_pool):
+    rows, headers = search.run_search("actor", {"actor": "NICK"}, paged=False)
+    genres = [row[headers.index("Genre")] for row in rows]
+    assert any(", " in genre for genre in genres)
+    assert all("nick" in row[0].lower() for row in rows)
@@ -0,0 +1,58 @@
+# test_reference_cache.py — Stammdaten aus Datei und Datenbank, keine Datei für Ersatzdatenbanken
+
+import os
+
+import search
+from reference_cache import ReferenceCache, get_reference_cache
+
+
+class CategoryTable:
+    """
+    Beantwortet die Abfragen des Stammdaten-Cache; failing simuliert eine nicht erreichbare Datenbank.
+    """
+
+    def __init__(self):
+        self.genres = [(1, "Action"), (2, "Comedy")]
+        self.version = "2024-01-01 00:00:00"
+        self.failing = False
+
+    def execute(self, query, params=None):
+        if self.failing:
+            raise ConnectionError("database unavailable")
+        if "COUNT(*)" in query:
+            return [(len(self.genres), self.version, self.version)]
+        if "FROM category" in query:
+            return list(self.genres)
+        return [(1990, 2024)]
+
+
+def test_data_is_kept_in_the_file(standin_pool, tmp_path):
+    path = str(tmp_path / "reference.json")
+    table = CategoryTable()
+    assert ReferenceCache(table.execute, path).get_genres() == [(1, "Action"), (2, "Comedy")]
+    assert os.path.exists(path)
+
+    # Neuer Prozess: die Datei genügt, auch wenn die Datenbank nicht erreichbar ist
+    table.failing = True
+    cache = ReferenceCache(table.execute, path)
+    assert cache.get_year_range() == (1990, 2024)
+    assert cache.stats["loads"] == 0
+
+
+def test_changed_tables_are_reloaded(standin_pool, tmp_path):
+    table = CategoryTable()
+    cache = ReferenceCache(table.execute, str(tmp_path / "reference.json"), check_interval=0)
+    cache.get_genres()
+    table.genres.append((3, "Drama"))
+    table.version = "2024-02-01 00:00:00"
+    cache.refresh_if_stale()
+    assert cache.get_genres()[-1] == (3, "Drama")
+    assert cache.stats["loads"] == 2
+
+
+def test_standin_pool_writes_no_file(standin_pool, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = get_reference_cache(search.execute_query)
+    assert cache.path is None
+    assert cache.get_genres() == list(search.execute_query("SELECT category_id, name FROM category ORDER BY name"))
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,107 @@
+# test_replica_router.py — Ausschluss, Wiederaufnahme und Rückfall auf den Primärserver
+
+import os
+import shutil
+from functools import partial
+
+import pytest
+
+from db_pool import ConnectionPool
+from replica_router import ReplicaRouter
+from sakila_standin import connect_standin
+
+
+@pytest.fixture
+def servers(standin_path, tmp_path):
+    """
+    Primärserver und zwei Replikate als Kopien der Ersatzdatenbank.
+    """
+    paths = {}
+    for name in ("primary", "r1", "r2"):
+        paths[name] = str(tmp_path / f"{name}.sqlite")
+        shutil.copyfile(standin_path, paths[name])
+    return paths
+
+
+def make_router(paths, min_size=1, **settings):
+    def pool(name):
+        return ConnectionPool({}, min_size=min_size, max_size=2, connect=partial(connect_standin, paths[name]))
+    settings = {"probe_interval": None, "eject_after": 3, "readmit_after": 2, **settings}
+    return ReplicaRouter(pool("primary"), {"r1": pool("r1"), "r2": pool("r2")}, **settings)
+
+
+def take_down(paths, name):
+    # Ersatzserver gilt als nicht erreichbar, solange die Datei fehlt (Fehler 2003)
+    os.rename(paths[name], paths[name] + ".down")
+
+
+def bring_up(paths, name):
+    os.rename(paths[name] + ".down", paths[name])
+
+
+def count_films(router):
+    with router.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM film")
+            return cursor.fetchall()[0][0]
+
+
+def test_eject_after_failed_probes_and_readmit_after_good_ones(servers):
+    router = make_router(servers)
+    take_down(servers, "r1")
+    for _ in range(2):
+        router.probe()
+    assert router.get_stats()["r1"]["healthy"]
+    router.probe()
+    stats = router.get_stats()
+    assert not stats["r1"]["healthy"] and stats["r1"]["ejections"] == 1
+    assert stats["r2"]["healthy"]
+
+    bring_up(servers, "r1")
+    router.probe()
+    assert not router.get_stats()["r1"]["healthy"]
+    router.probe()
+    stats = router.get_stats()
+    assert stats["r1"]["healthy"] and stats["r1"]["readmissions"] == 1
+    # Wieder aufgenommenes Replikat wird im Prüf-Thread auf min_size aufgefüllt
+    assert stats["r1"]["size"] >= 1
+    router.close()
+
+
+def test_failed_connects_on_queries_eject_replica(servers):
+    router = make_router(servers, min_size=0)
+    take_down(servers, "r1")
+    for _ in range(6):
+        assert count_films(router) == 300
+    stats = router.get_stats()
+    assert not stats["r1"]["healthy"]
+    assert stats["r1"]["errors"] == 3
+    router.close()
+
+
+def test_fallback_to_primary_when_all_replicas_are_ejected(servers):
+    router = make_router(servers)
+    take_down(servers, "r1")
+    take_down(servers, "r2")
+    for _ in range(3):
+        router.probe()
+    before = router.get_stats()
+    assert not before["r1"]["healthy"] and not before["r2"]["healthy"]
+
+    for _ in range(4):
+        assert count_films(router) == 300
+    after = router.get_stats()
+    assert after["primary"]["requests"] - before["primary"]["requests"] == 4
+    assert after["r1"]["requests"] == before["r1"]["requests"]
+    assert after["r2"]["requests"] == before["r2"]["requests"]
+    router.close()
+
+
+def test_queries_prefer_replicas(servers):
+    router = make_router(servers)
+    for _ in range(4):
+        count_films(router)
+    stats = router.get_stats()
+    assert stats["primary"]["requests"] == 0
+    assert stats["r1"]["requests"] == stats["r2"]["requests"] == 2
+    router.close()
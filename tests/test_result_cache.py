@@ -0,0 +1,126 @@
+# test_result_cache.py — Ablaufzeit, Speicherbudget und Invalidierung des Ergebnis-Caches
+
+import result_cache
+import search
+from film_query import DEFAULT_COLUMNS, build_film_query
+from pagination import PAGE_SIZE
+from result_cache import ResultCache, estimate_size, make_cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_cache, "time", clock)
+    cache = ResultCache(ttl=10)
+    cache.put("a", [1])
+    cache.put("b", [2], ttl=30)
+    clock.now += 9.9
+    assert cache.get("a") == [1]
+    clock.now += 0.2
+    assert cache.get("a") is None
+    assert cache.get("b") == [2]
+    stats = cache.get_stats()
+    assert stats["expirations"] == 1 and stats["size"] == 1
+
+
+def test_get_or_load_loads_once_until_expiry(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_cache, "time", clock)
+    cache = ResultCache(ttl=5)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return len(loads)
+
+    assert cache.get_or_load("key", loader) == 1
+    assert cache.get_or_load("key", loader) == 1
+    clock.now += 6
+    assert cache.get_or_load("key", loader) == 2
+
+
+def test_byte_budget_evicts_least_recently_used():
+    rows = [(i, "ACADEMY DINOSAUR", 2006) for i in range(50)]
+    size = estimate_size(rows)
+    cache = ResultCache(max_bytes=int(size * 2.5))
+    cache.put("a", rows)
+    cache.put("b", list(rows))
+    cache.get("a")                      # a zuletzt benutzt, b wird verdrängt
+    cache.put("c", list(rows))
+    assert cache.get("b") is None
+    assert cache.get("a") is rows and cache.get("c") is not None
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1 and stats["bytes"] <= cache.max_bytes
+
+
+def test_value_larger_than_budget_is_not_stored():
+    cache = ResultCache(max_bytes=100)
+    assert cache.put("big", list(range(1000))) == 0
+    assert cache.get("big") is None
+    assert cache.get_stats()["bytes"] == 0
+
+
+def test_max_entries():
+    cache = ResultCache(max_entries=2)
+    for key in "abc":
+        cache.put(key, key)
+    assert cache.get("a") is None and cache.get("c") == "c"
+    assert ResultCache(max_entries=0).put("a", 1) == 0
+
+
+def test_invalidate_by_search_type_and_key():
+    cache = ResultCache()
+    genre = make_cache_key("genre", genre=3)
+    genre_other = make_cache_key("genre", genre=4)
+    actor = make_cache_key("actor", actor="NICK")
+    for key in (genre, genre_other, actor):
+        cache.put(key, [key])
+    assert cache.invalidate("genre") == 2
+    assert cache.get(genre) is None and cache.get(actor) == [actor]
+    assert cache.invalidate_key(actor) is True
+    assert cache.invalidate_key(actor) is False
+    cache.put(genre, [1])
+    assert cache.invalidate() == 1
+    assert cache.get_stats()["size"] == 0
+
+
+def test_cache_key_normalization_per_parameter():
+    assert make_cache_key("keyword", keyword="Love") == make_cache_key("keyword", keyword="love")
+    # Stichwort mit zu kurzen Wörtern wird als Ganzes per LIKE verglichen
+    assert make_cache_key("keyword", keyword="a  b") != make_cache_key("keyword", keyword="a b")
+    # Schauspielernamen vergleicht actor_index ohne mehrfache Leerzeichen
+    assert make_cache_key("actor", actor=" Tom  Hanks") == make_cache_key("actor", actor="tom hanks")
+
+
+def test_pages_loaded_later_count_against_the_budget(standin_pool):
+    query, _ = build_film_query(search.execute_query, {"rating": "PG"}, DEFAULT_COLUMNS, True)
+    query.load_first_page()
+    first_page = query.memory_size()
+    other = [(i, "ACADEMY DINOSAUR", 2006) for i in range(20)]
+    cache = ResultCache(max_bytes=first_page * 3 + estimate_size(other))
+    cache.put("other", other)
+    cache.put("paged", query)
+    assert cache.get_stats()["evictions"] == 0
+
+    # Weitere Seiten anzeigen: der Cache rechnet sie an und verdrängt zuerst den anderen Eintrag
+    starts = iter(range(PAGE_SIZE, len(query), PAGE_SIZE))
+    while cache.get("other") is not None:
+        start = next(starts)
+        query.fetch(start, start + PAGE_SIZE)
+    assert cache.get("paged") is query
+    assert cache.get_stats()["bytes"] == query.memory_size() <= cache.max_bytes
+
+    # Passt die Suche allein nicht mehr ins Budget, wird sie selbst entfernt
+    for start in starts:
+        query.fetch(start, start + PAGE_SIZE)
+    assert query.memory_size() > cache.max_bytes
+    assert cache.get("paged") is None
+    stats = cache.get_stats()
+    assert stats["evictions"] == 2 and stats["bytes"] == 0
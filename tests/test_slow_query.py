@@ -0,0 +1,55 @@
+# test_slow_query.py — Zuordnung langsamer Abfragen zur Suche
+
+import builtins
+import json
+
+import formatter
+import search
+import slow_query
+
+
+def test_paged_queries_are_attributed_to_search_type(standin_pool, tmp_path, monkeypatch, capsys):
+    store = tmp_path / "slow.jsonl"
+    log = slow_query.SlowQueryLog(lambda query, params: "{}", str(store), threshold_ms=0)
+    monkeypatch.setattr(slow_query, "_slow_query_log", log)
+    monkeypatch.setattr(builtins, "input", lambda prompt="": "")
+
+    # COUNT und erste Seite laufen gleichzeitig (async_query), weitere Seiten im Vorlade-Thread
+    rows, columns = search.search_film_by_genre(3)
+    formatter.print_rows_paginated(rows, columns)
+    log.close()
+
+    functions = [json.loads(line)["function"] for line in store.read_text(encoding="utf-8").splitlines()]
+    assert len(functions) > 2
+    assert set(functions) == {"genre"}
+
+
+def test_reference_data_queries_are_attributed(standin_pool, tmp_path, monkeypatch):
+    # Genres, Stand und Jahresbereich werden gleichzeitig in Worker-Threads geladen
+    store = tmp_path / "slow.jsonl"
+    log = slow_query.SlowQueryLog(lambda query, params: "{}", str(store), threshold_ms=0)
+    monkeypatch.setattr(slow_query, "_slow_query_log", log)
+
+    search.get_all_genres()
+    log.close()
+
+    functions = [json.loads(line)["function"] for line in store.read_text(encoding="utf-8").splitlines()]
+    assert functions and set(functions) == {"get_all_genres"}
+
+
+def capture_without_search(log):
+    log.capture("SELECT 1", (), 1.0)
+    return log._queue.get_nowait()[2]["function"]
+
+
+def get_all_genres(log):
+    return capture_without_search(log)
+
+
+def test_stack_walk_outside_search(tmp_path, monkeypatch):
+    assert slow_query.current_search.get() is None
+    log = slow_query.SlowQueryLog(lambda query, params: "{}", str(tmp_path / "slow.jsonl"), threshold_ms=0)
+    monkeypatch.setattr(log, "_ensure_thread", lambda: None)
+    # Bekannte Funktion irgendwo im Stack, sonst die erste Funktion außerhalb der Suchschicht
+    assert get_all_genres(log) == "get_all_genres"
+    assert capture_without_search(log) == "test_slow_query.capture_without_search"
@@ -0,0 +1,17 @@
+# test_startup.py — Kaltstart des Menüs ohne pymysql, pymongo und tabulate
+
+import os
+
+from benchmark import bench_startup
+
+# Großzügige Obergrenze für den Median (ms); auf langsamen Rechnern über STARTUP_MAX_MS anpassbar.
+# Schon der Import von pymysql, pymongo oder tabulate allein dauert deutlich länger.
+MAX_MS = float(os.environ.get("STARTUP_MAX_MS", 50))
+
+
+def test_menu_exit_loads_no_heavy_modules():
+    report = bench_startup(repeat=3)
+    assert report["loaded_too_early"] == []
+    assert report["median_ms"] <= MAX_MS, report["slowest"]
+    # Aufschlüsselung aus python -X importtime
+    assert "formatter" in report["slowest"]
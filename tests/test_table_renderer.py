@@ -0,0 +1,48 @@
+# test_table_renderer.py — render_grid muss zeichengleich mit tabulate sein
+
+import random
+
+from tabulate import tabulate
+
+from table_renderer import render_grid
+
+HEADERS = ["Titel", "Jahr", "Genre", "Sprache", "Länge", "a", "Schauspieler und Rollen"]
+TEXTS = ["ACADEMY DINOSAUR", "ACE GOLDFINGER", "Action", "Sci-Fi", "NC-17", "PG-13", "Deleted Scenes",
+         "English", "x", "a b", " padded ", "True", "False", "true", "None", "12", "-3", "1.5", "1e5",
+         "inf", "nan", "Infinity", "info", "Nick", "$5", "5%", "(1)", "1,000", "", "Müller",
+         "tab\there", "two\nlines", "-", "."]
+
+
+def random_cell(rng, kind):
+    if rng.random() < 0.05:
+        return None
+    if kind == "int":
+        return rng.choice([0, 1, -1, 2006, 10 ** 12, -(10 ** 6), rng.randint(-999, 99999)])
+    if kind == "text":
+        return rng.choice(TEXTS[:10])
+    if kind == "tricky":
+        return rng.choice(TEXTS)
+    return rng.choice([rng.randint(-50, 50), rng.choice(TEXTS), 1.5, True, None])
+
+
+def test_render_grid_matches_tabulate():
+    rng = random.Random(18)
+    fast = 0
+    for _ in range(20000):
+        n_columns = rng.randint(1, 5)
+        kinds = [rng.choice(["int", "text", "text", "tricky", "mixed"]) for _ in range(n_columns)]
+        headers = [rng.choice(HEADERS) for _ in range(n_columns)]
+        rows = [tuple(random_cell(rng, kind) for kind in kinds) for _ in range(rng.randint(0, 6))]
+        rendered = render_grid(rows, headers)
+        if rendered is None:
+            continue
+        fast += 1
+        assert rendered == tabulate(rows, headers=headers, tablefmt="grid"), (rows, headers)
+    # Der schnelle Weg muss auch tatsächlich genommen werden
+    assert fast > 1000
+
+
+def test_bool_texts_fall_back_to_tabulate():
+    assert render_grid([("False",), (16,)], ["Titel"]) is None
+    assert render_grid([("True", 1)], ["Titel", "Jahr"]) is None
+    assert render_grid([("true", 1)], ["Titel", "Jahr"]) is not None